@@ -0,0 +1,434 @@
+import argparse
+import gzip
+import os
+import random
+import re
+import string
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from itertools import islice, product
+from multiprocessing import Pool
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+
+AIRDATA = 'http://airdata.org/ontology#'
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+RDF_TYPE = '<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>'
+
+PREFIXES = f"""@prefix : <{AIRDATA}> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+"""
+
+# Classes e propriedades da ontologia usadas pelas consultas teste_select_*
+CLASSES = ('Aerodrome', 'AerodromeCondition', 'DateTime', 'Visibility', 'Wind', 'ArrivalOperations', 'Landing')
+PROPERTIES = (
+    'WeatherCondition-aerodrome', 'WeatherCondition-time', 'WeatherCondition-visibility',
+    'WeatherCondition-wind', 'AerodromeCondition-qnhHpa', 'WeatherCondition-airTemperatureC',
+    'DateTime-value', 'Visibility-prevailingVisibilityMeters', 'Wind-windSpeedKt',
+    'Wind-windDirectionDegrees', 'ArrivalOperations-landing', 'Landing-time',
+    'Flight-destinationAerodrome', 'Flight-departureAerodrome', 'Flight-aircraftIdentification',
+)
+
+AERODROMOS = ('SBGR', 'SBSP', 'SBRJ', 'SBGL', 'SBBR', 'SBAF', 'SBKP', 'SBCF', 'SBPA', 'SBSV',
+              'SBRF', 'SBFZ', 'SBCT', 'SBFL', 'SBBE', 'SBEG', 'SBGO', 'SBVT', 'SBMO', 'SBNT')
+OPERADORES = ('TAM', 'GLO', 'AZU', 'PTB', 'ONE')
+# Todos os códigos S??? (os reais de AERODROMOS mais os sintéticos de codigos_icao)
+MAX_AERODROMOS = 26 ** 3
+
+FORMATS = {
+    'ttl': 'text/turtle; charset=utf-8',
+    'nt': 'application/n-triples',
+}
+
+# Entidade: (nome local do sujeito, nome local da classe, [(propriedade, objeto em Turtle)])
+Entity = Tuple[str, str, List[Tuple[str, str]]]
+
+
+def ontology_terms(ontology_path: str) -> Set[str]:
+    """Retorna os nomes locais (ad:Nome) declarados no arquivo da ontologia."""
+    with open(ontology_path, 'r', encoding='utf-8') as file:
+        return set(re.findall(r'^ad:([\w-]+) rdf:type', file.read(), re.MULTILINE))
+
+
+def codigos_icao(n: int) -> List[str]:
+    """
+    Retorna n códigos ICAO: os aeródromos reais de AERODROMOS seguidos de códigos sintéticos
+    SXAA, SXAB... SXZZ, SYAA... e assim por diante por todos os códigos S??? que não são reais.
+
+    Raises:
+        ValueError: se n for negativo ou maior que MAX_AERODROMOS
+    """
+    if not 0 <= n <= MAX_AERODROMOS:
+        raise ValueError(f'Número de aeródromos deve estar entre 0 e {MAX_AERODROMOS}: {n}')
+    letters = string.ascii_uppercase
+    reais = set(AERODROMOS)
+    # SX vem primeiro para manter os códigos já gerados por versões anteriores
+    segundas = 'XYZ' + letters[:-3]
+    extras = (code for code in (f'S{a}{b}{c}' for a in segundas for b, c in product(letters, repeat=2))
+              if code not in reais)
+    return [*AERODROMOS[:n], *islice(extras, max(0, n - len(AERODROMOS)))]
+
+
+def _turtle_entity(subject: str, cls: str, props: List[Tuple[str, str]]) -> str:
+    lines = [f':{subject} a :{cls}']
+    lines.extend(f'    :{prop} {obj}' for prop, obj in props)
+    return ' ;\n'.join(lines) + ' .\n'
+
+
+def _nt_term(term: str) -> str:
+    if term[0] == ':':
+        return f'<{AIRDATA}{term[1:]}>'
+    if term[0] == '"':
+        return term.replace('^^xsd:', f'^^<{XSD}') + '>' if '^^xsd:' in term else term
+    return f'"{term}"^^<{XSD}{"decimal" if "." in term else "integer"}>'
+
+
+def _ntriples_entity(subject: str, cls: str, props: List[Tuple[str, str]]) -> str:
+    iri = f'<{AIRDATA}{subject}>'
+    lines = [f'{iri} {RDF_TYPE} <{AIRDATA}{cls}> .\n']
+    lines.extend(f'{iri} <{AIRDATA}{prop}> {_nt_term(obj)} .\n' for prop, obj in props)
+    return ''.join(lines)
+
+
+def _write_shard(args: Tuple['AirdataGenerator', str, datetime, str, str, bool]) -> Dict[str, Any]:
+    gerador, icao, day, fmt, out_dir, compress = args
+    name = f'airdata_{icao}_{day:%Y%m%d}.{fmt}' + ('.gz' if compress else '')
+    file_path = os.path.join(out_dir, name)
+    start = time.perf_counter()
+    size = gerador.write(file_path, icao=icao, day=day, fmt=fmt)
+    return {
+        "file": file_path,
+        "bytes": os.path.getsize(file_path) if compress else size,
+        "triples": gerador.shard_triples(day),
+        "seconds": time.perf_counter() - start
+    }
+
+
+def _render_shard(args: Tuple['AirdataGenerator', str, datetime, str]) -> bytes:
+    gerador, icao, day, fmt = args
+    return ''.join(gerador.iter_rdf(icao=icao, day=day, fmt=fmt)).encode('utf-8')
+
+
+class AirdataGenerator:
+    """
+    Gerador determinístico de dados sintéticos da ontologia airdata (METARs, pousos e aeródromos)
+
+    Os dados são divididos em pedaços (aeródromo, dia), cada um com sua própria semente: um
+    pedaço gera sempre o mesmo conteúdo, independentemente de quais outros pedaços são gerados
+    ou em que processo. Isso permite gerar volumes grandes em paralelo e com memória limitada.
+    """
+
+    def __init__(self, seed: int = 42, aerodromos: Optional[List[str]] = None,
+                 start: datetime = datetime(2025, 7, 1), days: int = 1,
+                 metars_per_hour: int = 2, flights_per_day: int = 48,
+                 ontology_path: Optional[str] = None):
+        """
+        Inicializa o gerador.
+
+        Args:
+            seed: Semente do gerador aleatório (mesma semente = mesmos dados)
+            aerodromos: Códigos ICAO dos aeródromos (padrão: 20 aeródromos brasileiros)
+            start: Primeiro dia gerado
+            days: Número de dias gerados
+            metars_per_hour: METARs por aeródromo por hora
+            flights_per_day: Pousos por aeródromo por dia
+            ontology_path: Se informado, valida que as classes/propriedades usadas existem na ontologia
+        """
+        self.seed = seed
+        self.aerodromos = list(aerodromos or AERODROMOS)
+        self.start = start
+        self.days = days
+        self.metars_per_hour = metars_per_hour
+        self.flights_per_day = flights_per_day
+        if ontology_path:
+            missing = set(CLASSES + PROPERTIES) - ontology_terms(ontology_path)
+            if missing:
+                raise ValueError(f'Termos ausentes na ontologia: {", ".join(sorted(missing))}')
+
+    def triples_per_day(self) -> int:
+        """Número de triplas geradas por aeródromo por dia."""
+        per_metar = 14
+        per_flight = 9
+        return 24 * self.metars_per_hour * per_metar + self.flights_per_day * per_flight
+
+    def shard_triples(self, day: datetime) -> int:
+        """Número de triplas de um pedaço (aeródromo, dia): o primeiro dia traz também a tripla de tipo do aeródromo."""
+        return self.triples_per_day() + (1 if day == self.start else 0)
+
+    def total_triples(self) -> int:
+        """Número total de triplas da configuração atual (inclui uma tripla de tipo por aeródromo)."""
+        return sum(self.shard_triples(day) for _, day in self.shards())
+
+    def shards(self) -> List[Tuple[str, datetime]]:
+        """Lista os pedaços (aeródromo, dia) da configuração atual, em ordem de dia."""
+        days = [self.start + timedelta(days=i) for i in range(self.days)]
+        return [(codigo, day) for day in days for codigo in self.aerodromos]
+
+    def _metars(self, rng: random.Random, icao: str, day: datetime) -> Iterator[Entity]:
+        step = 60 // self.metars_per_hour
+        for minute in range(0, 24 * 60, step):
+            hora = day + timedelta(minutes=minute)
+            key = f'{icao}_{hora:%Y%m%dT%H%M}'
+            yield f'Metar_{key}', 'AerodromeCondition', [
+                ('WeatherCondition-aerodrome', f':Aerodrome_{icao}'),
+                ('WeatherCondition-time', f':DateTime_Metar_{key}'),
+                ('WeatherCondition-visibility', f':Visibility_{key}'),
+                ('WeatherCondition-wind', f':Wind_{key}'),
+                ('WeatherCondition-airTemperatureC', f'{rng.uniform(5, 35):.1f}'),
+                ('AerodromeCondition-qnhHpa', f'{rng.uniform(995, 1030):.1f}'),
+            ]
+            yield f'DateTime_Metar_{key}', 'DateTime', [
+                ('DateTime-value', f'"{hora:%Y-%m-%dT%H:%M:%S}"^^xsd:dateTime'),
+            ]
+            yield f'Visibility_{key}', 'Visibility', [
+                ('Visibility-prevailingVisibilityMeters', str(rng.choice((800, 1500, 3000, 5000, 8000, 9999)))),
+            ]
+            yield f'Wind_{key}', 'Wind', [
+                ('Wind-windSpeedKt', f'{rng.uniform(0, 35):.1f}'),
+                ('Wind-windDirectionDegrees', str(rng.randrange(0, 360, 10))),
+            ]
+
+    def _flights(self, rng: random.Random, icao: str, day: datetime) -> Iterator[Entity]:
+        origens = [codigo for codigo in self.aerodromos if codigo != icao] or [icao]
+        for i in range(self.flights_per_day):
+            hora = day + timedelta(seconds=rng.randrange(24 * 3600))
+            key = f'{icao}_{day:%Y%m%d}_{i:04d}'
+            yield f'Flight_{key}', 'ArrivalOperations', [
+                ('ArrivalOperations-landing', f':Landing_{key}'),
+                ('Flight-destinationAerodrome', f':Aerodrome_{icao}'),
+                ('Flight-departureAerodrome', f':Aerodrome_{rng.choice(origens)}'),
+                ('Flight-aircraftIdentification', f'"{rng.choice(OPERADORES)}{rng.randrange(1000, 9999)}"'),
+            ]
+            yield f'Landing_{key}', 'Landing', [
+                ('Landing-time', f':DateTime_Landing_{key}'),
+            ]
+            yield f'DateTime_Landing_{key}', 'DateTime', [
+                ('DateTime-value', f'"{hora:%Y-%m-%dT%H:%M:%S}"^^xsd:dateTime'),
+            ]
+
+    def iter_rdf(self, icao: Optional[str] = None, day: Optional[datetime] = None,
+                 fmt: str = 'ttl') -> Iterator[str]:
+        """
+        Gera os dados em Turtle ou N-Triples, um bloco de texto por entidade.
+
+        A tripla de tipo de cada aeródromo sai uma vez só: com day, apenas no primeiro dia
+        configurado (start), de modo que os pedaços (aeródromo, dia) juntos não a repetem.
+
+        Args:
+            icao: Gera apenas este aeródromo (padrão: todos)
+            day: Gera apenas este dia (padrão: todos os dias configurados)
+            fmt: 'ttl' (Turtle) ou 'nt' (N-Triples)
+
+        Returns:
+            Iterador de trechos de texto; em Turtle, o primeiro contém os prefixos
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f'Formato não suportado: {fmt} (use {", ".join(FORMATS)})')
+        render = _turtle_entity if fmt == 'ttl' else _ntriples_entity
+        if fmt == 'ttl':
+            yield PREFIXES
+        aerodromos = [icao] if icao else self.aerodromos
+        days = [day] if day else [self.start + timedelta(days=i) for i in range(self.days)]
+        if day is None or day == self.start:
+            for codigo in aerodromos:
+                yield render(f'Aerodrome_{codigo}', 'Aerodrome', [])
+        for current in days:
+            for codigo in aerodromos:
+                # Uma semente por (aeródromo, dia): cada pedaço é reproduzível isoladamente
+                rng = random.Random(f'{self.seed}-{codigo}-{current:%Y%m%d}')
+                for entity in self._metars(rng, codigo, current):
+                    yield render(*entity)
+                for entity in self._flights(rng, codigo, current):
+                    yield render(*entity)
+
+    def iter_turtle(self, icao: Optional[str] = None, day: Optional[datetime] = None) -> Iterator[str]:
+        """Gera os dados em Turtle (equivale a iter_rdf(fmt='ttl'))."""
+        return self.iter_rdf(icao=icao, day=day, fmt='ttl')
+
+    def to_string(self, **kwargs) -> str:
+        """Gera os dados em uma única string (use apenas para volumes pequenos)."""
+        return ''.join(self.iter_rdf(**kwargs))
+
+    def write(self, file_path: str, **kwargs) -> int:
+        """
+        Grava os dados em um arquivo (comprimido com gzip se o nome terminar em .gz).
+
+        Args:
+            file_path: Caminho do arquivo
+            **kwargs: Argumentos de iter_rdf (icao, day, fmt)
+
+        Returns:
+            Número de bytes gravados (antes da compressão)
+        """
+        size = 0
+        opener = gzip.open if file_path.endswith('.gz') else open
+        with opener(file_path, 'wt', encoding='utf-8') as file:
+            for block in self.iter_rdf(**kwargs):
+                size += file.write(block)
+        return size
+
+    def write_shards(self, out_dir: str, fmt: str = 'ttl', processes: Optional[int] = None,
+                     compress: bool = False) -> Dict[str, Any]:
+        """
+        Grava um arquivo por pedaço (aeródromo, dia), em paralelo com vários processos.
+
+        Cada processo grava seu arquivo em streaming, então a memória usada não depende do
+        volume total. Os arquivos podem ser carregados depois com TurtleLoader.bulk_load_directory.
+
+        Args:
+            out_dir: Diretório de saída (criado se não existir)
+            fmt: 'ttl' ou 'nt'
+            processes: Número de processos (padrão: número de CPUs)
+            compress: Grava arquivos .gz
+
+        Returns:
+            dict com os arquivos gerados, totais e vazão
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        tasks = [(self, icao, day, fmt, out_dir, compress) for icao, day in self.shards()]
+        start = time.perf_counter()
+        with Pool(processes) as pool:
+            files = list(pool.imap_unordered(_write_shard, tasks))
+        elapsed = time.perf_counter() - start
+        files.sort(key=lambda item: item['file'])
+        total_triples = sum(item['triples'] for item in files)
+        return {
+            "success": True,
+            "files": files,
+            "total_files": len(files),
+            "total_bytes": sum(item['bytes'] for item in files),
+            "total_triples": total_triples,
+            "elapsed_seconds": elapsed,
+            "triples_per_second": total_triples / elapsed if elapsed else 0.0
+        }
+
+    def iter_shards(self, fmt: str = 'ttl', processes: Optional[int] = None,
+                    prefetch: Optional[int] = None) -> Iterator[bytes]:
+        """
+        Gera os pedaços (aeródromo, dia) em paralelo e os devolve em ordem, já codificados.
+
+        No máximo prefetch pedaços ficam prontos aguardando consumo: se o consumidor (ex.: o
+        upload) for mais lento que os processos, a geração espera, e a memória fica limitada.
+
+        Args:
+            fmt: 'ttl' ou 'nt'
+            processes: Número de processos (padrão: número de CPUs)
+            prefetch: Máximo de pedaços gerados à frente do consumo (padrão: 2 por processo)
+
+        Returns:
+            Iterador de bytes, um item por pedaço
+        """
+        shards = iter(self.shards())
+        prefetch = prefetch or 2 * (processes or os.cpu_count() or 1)
+        with Pool(processes) as pool:
+            pending = deque()
+            for icao, day in shards:
+                pending.append(pool.apply_async(_render_shard, ((self, icao, day, fmt),)))
+                if len(pending) >= prefetch:
+                    break
+            while pending:
+                data = pending.popleft().get()
+                next_shard = next(shards, None)
+                if next_shard is not None:
+                    pending.append(pool.apply_async(_render_shard, ((self, *next_shard, fmt),)))
+                yield data
+
+    def load_into(self, loader, graph_uri: Optional[str] = None, fmt: str = 'nt',
+                  processes: Optional[int] = None, batch_bytes: int = 64 * 1024 * 1024) -> Dict[str, Any]:
+        """
+        Gera os dados e os envia direto para o Fuseki, sem arquivos intermediários.
+
+        Os pedaços são gerados em paralelo (iter_shards) e enviados em streaming por
+        TurtleLoader.load_from_stream, uma requisição a cada ~batch_bytes.
+
+        Args:
+            loader: Instância de TurtleLoader
+            graph_uri: URI do grafo nomeado (opcional)
+            fmt: 'nt' (padrão, mais barato para o parser do Fuseki) ou 'ttl'
+            processes: Número de processos de geração
+            batch_bytes: Tamanho aproximado de cada requisição
+
+        Returns:
+            dict com o status de cada requisição, totais e vazão
+        """
+        shards = self.iter_shards(fmt=fmt, processes=processes)
+        sent = {"bytes": 0, "shards": 0}
+        pending = next(shards, None)
+
+        def batch() -> Iterator[bytes]:
+            nonlocal pending
+            size = 0
+            while pending is not None and size < batch_bytes:
+                data = pending
+                size += len(data)
+                sent["bytes"] += len(data)
+                sent["shards"] += 1
+                yield data
+                pending = next(shards, None)
+
+        results = []
+        start = time.perf_counter()
+        try:
+            while pending is not None:
+                result = loader.load_from_stream(batch(), graph_uri, content_type=FORMATS[fmt])
+                results.append(result)
+                if not result['success']:
+                    break
+        finally:
+            shards.close()
+        elapsed = time.perf_counter() - start
+
+        # Os pedaços são enviados na ordem de shards()
+        total_triples = sum(self.shard_triples(day) for _, day in self.shards()[:sent["shards"]])
+        total_shards = len(self.aerodromos) * self.days
+        return {
+            "success": pending is None and all(result['success'] for result in results),
+            "message": f"{sent['shards']}/{total_shards} pedaços enviados em {len(results)} requisições",
+            "requests": results,
+            "total_bytes": sent["bytes"],
+            "total_triples": total_triples,
+            "elapsed_seconds": elapsed,
+            "triples_per_second": total_triples / elapsed if elapsed else 0.0
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Gerador de dados sintéticos da ontologia airdata')
+    parser.add_argument('--aerodromes', type=int, default=len(AERODROMOS), help='Número de aeródromos')
+    parser.add_argument('--days', type=int, default=1, help='Número de dias')
+    parser.add_argument('--start', type=datetime.fromisoformat, default=datetime(2025, 7, 1), help='Primeiro dia (AAAA-MM-DD)')
+    parser.add_argument('--metars-per-hour', type=int, default=2)
+    parser.add_argument('--flights-per-day', type=int, default=48)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--format', dest='fmt', choices=sorted(FORMATS), default='ttl')
+    parser.add_argument('--processes', type=int, default=None, help='Processos de geração (padrão: CPUs)')
+    parser.add_argument('--out', help='Diretório de saída (um arquivo por aeródromo/dia)')
+    parser.add_argument('--gzip', action='store_true', help='Comprime os arquivos gerados')
+    parser.add_argument('--load', action='store_true', help='Envia os dados direto para o Fuseki')
+    parser.add_argument('--fuseki-url', default='http://localhost:3030')
+    parser.add_argument('--dataset', default='airdata')
+    parser.add_argument('--graph', default=None, help='Grafo nomeado de destino')
+    args = parser.parse_args(argv)
+
+    gerador = AirdataGenerator(seed=args.seed, aerodromos=codigos_icao(args.aerodromes), start=args.start,
+                               days=args.days, metars_per_hour=args.metars_per_hour,
+                               flights_per_day=args.flights_per_day)
+    print(f'Gerando {gerador.total_triples()} triplas em {len(gerador.shards())} pedaços')
+    if args.out:
+        result = gerador.write_shards(args.out, fmt=args.fmt, processes=args.processes, compress=args.gzip)
+    elif args.load:
+        from TurtleLoader import TurtleLoader
+        with TurtleLoader(args.fuseki_url, args.dataset, verbose=False) as loader:
+            result = gerador.load_into(loader, args.graph, fmt=args.fmt, processes=args.processes)
+    else:
+        parser.error('informe --out ou --load')
+    print(f"{result['total_triples']} triplas, {result['total_bytes'] / 1e6:.1f} MB em "
+          f"{result['elapsed_seconds']:.1f}s ({result['triples_per_second']:.0f} triplas/s)")
+    return result
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    main()
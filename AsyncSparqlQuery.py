@@ -0,0 +1,315 @@
+import asyncio
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+from FusekiLogging import instance_logger
+from QueryTemplate import aerodrome
+from SparqlQuery import CONDICAO_AERODROMO
+
+
+class AsyncSparqlQuery:
+    """
+    Versão asyncio da classe SparqlQuery, para executar consultas SPARQL no Apache Jena Fuseki
+    a partir de um event loop
+    """
+
+    def __init__(self, fuseki_url: str = "http://localhost:3030", dataset: str = "airdata",
+                 auth_user: str = "admin", auth_pass: str = "admin123",
+                 max_concurrency: int = 32, pool_size: int = 100, timeout: float = 300,
+                 verbose: bool = False):
+        """
+        Inicializa o executor de queries assíncrono.
+
+        A sessão HTTP é criada na primeira chamada (dentro do event loop) e deve ser fechada com
+        close() ou usando o objeto com "async with".
+
+        Args:
+            fuseki_url: URL base do servidor Fuseki (padrão: http://localhost:3030)
+            dataset: Nome do dataset no Fuseki (padrão: ds)
+            max_concurrency: Número máximo de requisições simultâneas ao Fuseki
+            pool_size: Número máximo de conexões abertas no pool
+            timeout: Timeout total de cada requisição em segundos
+            verbose: Mostra no stdout cada operação e query executada por esta instância
+                (logger "fuseki.async" em nível DEBUG)
+        """
+        self.fuseki_url = fuseki_url.rstrip('/')
+        self.dataset = dataset
+        self.query_endpoint = f"{self.fuseki_url}/{dataset}/query"
+        self.update_endpoint = f"{self.fuseki_url}/{dataset}/update"
+        self.auth = aiohttp.BasicAuth(auth_user, auth_pass) if auth_user and auth_pass else None
+        self.max_concurrency = max_concurrency
+        self.pool_size = pool_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.log = instance_logger('async', verbose)
+        self.log.debug('Instância de AsyncSparqlQuery criada: fuseki_url=%s dataset=%s query_endpoint=%s '
+                       'update_endpoint=%s max_concurrency=%d', self.fuseki_url, self.dataset,
+                       self.query_endpoint, self.update_endpoint, self.max_concurrency)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    async def close(self):
+        """Fecha a sessão HTTP e as conexões do pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self):
+        self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def select(self, query: str) -> Dict[str, Any]:
+        """
+        Executa uma query SELECT SPARQL.
+
+        Args:
+            query: Query SPARQL SELECT
+
+        Returns:
+            dict com resultados e metadados (mesmo formato de SparqlQuery.select)
+        """
+        headers = {
+            'Accept': 'application/sparql-results+json'
+        }
+
+        params = {
+            'query': query
+        }
+
+        try:
+            self.log.debug('Fazendo a operação SELECT. Query utilizada:\n%s', query)
+            session = self._get_session()
+            async with self._semaphore:
+                async with session.get(self.query_endpoint, params=params, headers=headers) as response:
+                    if response.status == 200:
+                        data = await response.json(content_type=None)
+                        return {
+                            "success": True,
+                            "results": data.get('results', {}).get('bindings', []),
+                            "variables": data.get('head', {}).get('vars', []),
+                            "count": len(data.get('results', {}).get('bindings', []))
+                        }
+                    else:
+                        return {
+                            "success": False,
+                            "message": f"Erro na query: {await response.text()}",
+                            "status_code": response.status
+                        }
+
+        except aiohttp.ClientConnectionError as e:
+            return {
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            }
+        except Exception as e:
+            import traceback
+            return {
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    async def ask(self, query: str) -> Dict[str, Any]:
+        """
+        Executa uma query ASK SPARQL (retorna booleano).
+
+        Args:
+            query: Query SPARQL ASK
+
+        Returns:
+            dict com resultado booleano
+        """
+        headers = {
+            'Accept': 'application/sparql-results+json'
+        }
+
+        params = {
+            'query': query
+        }
+
+        try:
+            self.log.debug('Fazendo a operação ASK. Query utilizada:\n%s', query)
+            session = self._get_session()
+            async with self._semaphore:
+                async with session.get(self.query_endpoint, params=params, headers=headers) as response:
+                    if response.status == 200:
+                        data = await response.json(content_type=None)
+                        return {
+                            "success": True,
+                            "result": data.get('boolean', False)
+                        }
+                    else:
+                        return {
+                            "success": False,
+                            "message": f"Erro na query: {await response.text()}",
+                            "status_code": response.status
+                        }
+
+        except aiohttp.ClientConnectionError as e:
+            return {
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            }
+        except Exception as e:
+            import traceback
+            return {
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    async def construct(self, query: str) -> Dict[str, Any]:
+        """
+        Executa uma query CONSTRUCT SPARQL (retorna grafo RDF).
+
+        Args:
+            query: Query SPARQL CONSTRUCT
+
+        Returns:
+            dict com grafo resultante em formato Turtle
+        """
+        headers = {
+            'Accept': 'text/turtle'
+        }
+
+        params = {
+            'query': query
+        }
+
+        try:
+            self.log.debug('Fazendo a operação CONSTRUCT. Query utilizada:\n%s', query)
+            session = self._get_session()
+            async with self._semaphore:
+                async with session.get(self.query_endpoint, params=params, headers=headers) as response:
+                    if response.status == 200:
+                        return {
+                            "success": True,
+                            "graph": await response.text(),
+                            "format": "turtle"
+                        }
+                    else:
+                        return {
+                            "success": False,
+                            "message": f"Erro na query: {await response.text()}",
+                            "status_code": response.status
+                        }
+
+        except aiohttp.ClientConnectionError as e:
+            return {
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            }
+        except Exception as e:
+            import traceback
+            return {
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    async def update(self, query: str) -> Dict[str, Any]:
+        """
+        Executa uma operação SPARQL UPDATE (INSERT, DELETE, etc).
+
+        Args:
+            query: Query SPARQL UPDATE
+
+        Returns:
+            dict com status da operação
+        """
+        headers = {
+            'Content-Type': 'application/sparql-update'
+        }
+
+        try:
+            self.log.debug('Fazendo a operação UPDATE. Query utilizada:\n%s', query)
+            session = self._get_session()
+            async with self._semaphore:
+                async with session.post(self.update_endpoint, data=query.encode('utf-8'),
+                                        headers=headers, auth=self.auth) as response:
+                    if response.status in [200, 204]:
+                        return {
+                            "success": True,
+                            "message": "Update executado com sucesso"
+                        }
+                    else:
+                        return {
+                            "success": False,
+                            "message": f"Erro no update: {await response.text()}",
+                            "status_code": response.status
+                        }
+
+        except aiohttp.ClientConnectionError as e:
+            return {
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            }
+        except Exception as e:
+            import traceback
+            return {
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    async def get_all_triples(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Recupera todas as triplas do dataset (útil para testes).
+
+        Args:
+            limit: Número máximo de resultados (opcional)
+
+        Returns:
+            dict com todas as triplas
+        """
+        limit_clause = f"LIMIT {limit}" if limit else ""
+
+        query = f"""
+        SELECT ?subject ?predicate ?object
+        WHERE {{
+            ?subject ?predicate ?object .
+        }}
+        {limit_clause}
+        """
+
+        self.log.debug('Obtendo todas as triplas')
+
+        return await self.select(query)
+
+
+async def teste_select_aerodromos(obj: AsyncSparqlQuery, codigos_icao: list):
+    print('-'*60)
+    print(f'SELECT CONCORRENTE DAS CONDIÇÕES METEOROLÓGICAS EM {len(codigos_icao)} AERÓDROMOS')
+    print('-'*60)
+
+    queries = [CONDICAO_AERODROMO.bind(aerodromo=aerodrome(codigo), prefixo_hora="2025-07-01T10")
+               for codigo in codigos_icao]
+    results = await asyncio.gather(*(obj.select(query) for query in queries))
+    for codigo, result in zip(codigos_icao, results):
+        print(f"{codigo}: {result.get('count', result.get('message'))}")
+
+
+# Exemplo de uso
+if __name__ == "__main__":
+    async def main():
+        async with AsyncSparqlQuery(max_concurrency=16) as sparql:
+            await teste_select_aerodromos(sparql, ["SBGR", "SBSP", "SBRJ", "SBGL", "SBBR", "SBAF"])
+
+    asyncio.run(main())
@@ -0,0 +1,164 @@
+import re
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+AIRDATA = 'http://airdata.org/ontology#'
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Lexical de xsd:dateTime: data, hora, fração de segundo e fuso opcionais
+_DATETIME_RE = re.compile(r'(\d{4,}-\d\d-\d\d)T((\d\d):\d\d:\d\d)(?:\.\d+)?(Z|[+-]\d\d:\d\d)?')
+
+
+def utc_parts(value: str) -> Optional[Tuple[str, str]]:
+    """
+    Data (AAAA-MM-DD) e hora (HH) em UTC de um lexical de xsd:dateTime.
+
+    Valores com fuso são convertidos; sem fuso o valor já é considerado UTC.
+
+    Returns:
+        (data, hora), ou None se o valor não for uma data/hora válida
+    """
+    match = _DATETIME_RE.fullmatch(value.strip())
+    if match is None:
+        return None
+    date, time_of_day, hour, zone = match.groups()
+    if not zone:
+        return date, hour
+    try:
+        utc = datetime.fromisoformat(f'{date}T{time_of_day}{"+00:00" if zone == "Z" else zone}')
+    except ValueError:
+        return None
+    utc = utc.astimezone(timezone.utc)
+    return utc.date().isoformat(), f'{utc.hour:02d}'
+
+
+class DateTimeEnricher:
+    """
+    Acrescenta triplas derivadas aos valores de data/hora durante a carga
+
+    Para cada tripla "?t :DateTime-value ?hora" são geradas:
+
+        ?t :DateTime-date "2025-07-01"^^xsd:date
+        ?t :DateTime-hourBucket "2025-07-01T10:00:00"^^xsd:dateTime
+        ?t :DateTime-dateTime "2025-07-01T10:25:00"^^xsd:dateTime   (só se ?hora não for tipado)
+
+    A data e a hora cheia são sempre em UTC e sem fuso: valores com fuso são convertidos, para
+    que batam com os literais sem fuso usados nas consultas (ex.: a partição de
+    MaterializedViews.VOOS_POR_DIA e o "hora" de CONDICAO_AERODROMO_HORA). Ver utc_parts.
+
+    Assim as consultas podem comparar termos indexados, como
+    "?t :DateTime-hourBucket "2025-07-01T10:00:00"^^xsd:dateTime", em vez de
+    FILTER(STRSTARTS(STR(?hora), ...)) ou BIND(SUBSTR(STR(?hora), 1, 10) AS ?data), que
+    convertem cada valor para string.
+
+    Trabalha sobre blocos N-Triples/N-Quads (bytes), um de cada vez, então pode ser aplicado a
+    uploads em streaming sem carregar o arquivo na memória. Um mesmo objeto pode ser usado por
+    várias threads.
+    """
+
+    def __init__(self, source_property: str = AIRDATA + 'DateTime-value',
+                 date_property: str = AIRDATA + 'DateTime-date',
+                 hour_property: str = AIRDATA + 'DateTime-hourBucket',
+                 datetime_property: str = AIRDATA + 'DateTime-dateTime'):
+        """
+        Args:
+            source_property: IRI da propriedade com o valor de data/hora
+            date_property: IRI da propriedade gerada com a data (xsd:date), None para não gerar
+            hour_property: IRI da propriedade gerada com a hora cheia (xsd:dateTime), None para não gerar
+            datetime_property: IRI da propriedade gerada com o valor tipado como xsd:dateTime
+                quando o original é uma string, None para não gerar
+        """
+        self.source_property = source_property
+        self.date_property = date_property
+        self.hour_property = hour_property
+        self.datetime_property = datetime_property
+        self.values = 0
+        self.added = 0
+        self.invalid = 0
+        self._predicate = f'<{source_property}>'.encode('utf-8')
+        # Sujeito, literal (lexical e tipo) e grafo opcional (N-Quads)
+        self._line_re = re.compile(
+            rb'^\s*(<[^<>\s]*>|_:\S+)\s+' + re.escape(self._predicate) +
+            rb'\s+"((?:[^"\\]|\\.)*)"(?:\^\^<([^<>\s]*)>)?\s*(<[^<>\s]*>|_:\S+)?\s*\.\s*$')
+        self._lock = threading.Lock()
+
+    def derive(self, value: str, typed: bool = True) -> Dict[str, str]:
+        """
+        Calcula os valores derivados de um lexical de xsd:dateTime.
+
+        Args:
+            value: Lexical (ex.: "2025-07-01T10:25:00Z")
+            typed: Se o literal original já é um xsd:dateTime
+
+        Returns:
+            dict propriedade -> literal em N-Triples (vazio se o valor não for uma data/hora);
+            a data e a hora cheia vêm em UTC, sem fuso
+        """
+        parts = utc_parts(value)
+        if parts is None:
+            return {}
+        date, hour = parts
+        derived = {}
+        if self.date_property:
+            derived[self.date_property] = f'"{date}"^^<{XSD}date>'
+        if self.hour_property:
+            derived[self.hour_property] = f'"{date}T{hour}:00:00"^^<{XSD}dateTime>'
+        if self.datetime_property and not typed:
+            derived[self.datetime_property] = f'"{value.strip()}"^^<{XSD}dateTime>'
+        return derived
+
+    def enrich(self, block: bytes) -> bytes:
+        """
+        Acrescenta as triplas derivadas a um bloco N-Triples/N-Quads.
+
+        As triplas novas vêm logo após a original, com o mesmo sujeito e grafo, então blank
+        nodes continuam no mesmo bloco (e na mesma requisição).
+
+        Args:
+            block: Linhas completas N-Triples ou N-Quads (bytes em UTF-8)
+
+        Returns:
+            O bloco com as triplas derivadas
+        """
+        if self._predicate not in block:
+            return block
+        out = []
+        values = added = invalid = 0
+        for line in block.split(b'\n'):
+            out.append(line)
+            if self._predicate not in line:
+                continue
+            match = self._line_re.match(line)
+            if match is None:
+                continue
+            subject, lexical, datatype, graph = match.groups()
+            values += 1
+            typed = datatype is not None and datatype.decode('utf-8') != XSD + 'string'
+            if typed and datatype.decode('utf-8') != XSD + 'dateTime':
+                invalid += 1
+                continue
+            derived = self.derive(lexical.decode('utf-8'), typed)
+            if not derived:
+                invalid += 1
+                continue
+            suffix = b' ' + graph + b' .' if graph else b' .'
+            for prop, literal in derived.items():
+                out.append(subject + f' <{prop}> {literal}'.encode('utf-8') + suffix)
+            added += len(derived)
+        with self._lock:
+            self.values += values
+            self.added += added
+            self.invalid += invalid
+        return b'\n'.join(out)
+
+    def __call__(self, blocks: Iterable[bytes]) -> Iterator[bytes]:
+        """Enriquece uma sequência de blocos N-Triples/N-Quads sob demanda."""
+        for block in blocks:
+            yield self.enrich(block)
+
+    def stats(self) -> Dict[str, Any]:
+        """Valores encontrados, triplas acrescentadas e valores que não são data/hora."""
+        with self._lock:
+            return {"values": self.values, "added": self.added, "invalid": self.invalid}
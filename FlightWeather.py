@@ -0,0 +1,311 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from QueryTemplate import QueryTemplate, aerodrome
+
+
+METAR_SERIE = QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT ?metar ?hora ?ventoKt ?vis ?qnh
+    WHERE {
+      ?metar a :AerodromeCondition ;
+             :WeatherCondition-aerodrome %{aerodromo} ;
+             :WeatherCondition-time ?t ;
+             :WeatherCondition-visibility ?v ;
+             :WeatherCondition-wind ?w ;
+             :AerodromeCondition-qnhHpa ?qnh .
+
+      ?t :DateTime-value ?hora .
+      ?v :Visibility-prevailingVisibilityMeters ?vis .
+      ?w :Wind-windSpeedKt ?ventoKt .
+
+      FILTER(?hora >= %{inicio} && ?hora < %{fim})
+    }
+    ORDER BY ?hora
+    """, name='metar_serie')
+
+POUSOS_SERIE = QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT ?flight ?hora
+    WHERE {
+      ?flight a :ArrivalOperations ;
+              :Flight-destinationAerodrome %{aerodromo} ;
+              :ArrivalOperations-landing ?landing .
+      ?landing :Landing-time ?t .
+      ?t :DateTime-value ?hora .
+
+      FILTER(?hora >= %{inicio} && ?hora < %{fim})
+    }
+    ORDER BY ?hora
+    """, name='pousos_serie')
+
+POUSOS_INTERVALO = QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT (MIN(?hora) AS ?inicio) (MAX(?hora) AS ?fim)
+    WHERE {
+      ?flight a :ArrivalOperations ;
+              :Flight-destinationAerodrome %{aerodromo} ;
+              :ArrivalOperations-landing ?landing .
+      ?landing :Landing-time ?t .
+      ?t :DateTime-value ?hora .
+    }
+    """, name='pousos_intervalo')
+
+JOIN_MODES = ('previous', 'nearest', 'same_hour')
+
+
+def _utc(value: datetime) -> datetime:
+    # Convenção do módulo: horários em UTC sem fuso (datetime "naive"); sem fuso já é UTC
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo is not None else value
+
+
+def _parse_time(value: str) -> datetime:
+    # Fuseki devolve xsd:dateTime no formato ISO 8601; "Z" só é aceito pelo fromisoformat a partir do 3.11
+    return _utc(datetime.fromisoformat(value[:-1] + '+00:00' if value.endswith('Z') else value))
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def asof_join(left: Sequence[Dict[str, Any]], right: Sequence[Dict[str, Any]], key: str = 'time',
+              tolerance: Optional[timedelta] = None,
+              direction: str = 'backward') -> Iterator[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+    """
+    Junta cada item de left ao item de right mais próximo no tempo (merge "as-of").
+
+    As duas sequências devem estar ordenadas por key; o custo é O(len(left) + len(right)).
+
+    Args:
+        left: Itens a completar (ex.: pousos)
+        right: Itens procurados (ex.: METARs)
+        key: Campo de tempo (datetime) dos itens, todos com fuso ou todos sem (ver _parse_time)
+        tolerance: Maior distância aceita (se None, qualquer distância)
+        direction: 'backward' (último de right com tempo <= ao de left), 'forward' (primeiro
+            com tempo >=) ou 'nearest' (o mais próximo em qualquer sentido)
+
+    Returns:
+        Iterador de pares (item de left, item de right ou None)
+    """
+    if direction not in ('backward', 'forward', 'nearest'):
+        raise ValueError(f'Direção inválida: {direction}')
+    j = 0
+    n = len(right)
+    for item in left:
+        t = item[key]
+        # Avança j até o primeiro item de right com tempo > t
+        while j < n and right[j][key] <= t:
+            j += 1
+        before = right[j - 1] if j > 0 else None
+        after = None
+        if direction != 'backward':
+            k = j - 1 if before is not None and before[key] == t else j
+            after = right[k] if k < n else None
+
+        if direction == 'backward':
+            match = before
+        elif direction == 'forward':
+            match = after
+        elif before is None or (after is not None and after[key] - t < t - before[key]):
+            match = after
+        else:
+            match = before
+
+        if match is not None and tolerance is not None and abs(match[key] - t) > tolerance:
+            match = None
+        yield item, match
+
+
+def hour_join(left: Sequence[Dict[str, Any]], right: Sequence[Dict[str, Any]],
+              key: str = 'time') -> Iterator[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Junta os itens de left e right que caem na mesma hora (ano-mês-dia-hora), por merge.
+
+    Equivale ao antigo FILTER(SUBSTR(STR(?a), 1, 13) = SUBSTR(STR(?b), 1, 13)), mas sem o
+    produto cartesiano: as duas sequências devem estar ordenadas por key.
+
+    Returns:
+        Iterador de pares (item de left, item de right), um por combinação na mesma hora
+    """
+    j = 0
+    n = len(right)
+    for item in left:
+        hour = item[key].replace(minute=0, second=0, microsecond=0)
+        while j < n and right[j][key] < hour:
+            j += 1
+        k = j
+        end = hour + timedelta(hours=1)
+        while k < n and right[k][key] < end:
+            yield item, right[k]
+            k += 1
+
+
+class FlightWeather:
+    """
+    Correlação entre pousos e condições meteorológicas (METAR) de um aeródromo
+
+    Em vez de uma única query que compara os horários de todos os pousos com todos os METARs
+    (produto cartesiano filtrado por substring), cada lado é buscado como uma série temporal
+    ordenada, com uma query por aeródromo e intervalo de tempo, e a junção é feita no cliente
+    por merge, em tempo linear.
+
+    Todos os horários devolvidos estão em UTC sem fuso (datetime "naive"). Os argumentos start/end
+    podem ter fuso (são convertidos para UTC) ou não (já são UTC).
+    """
+
+    def __init__(self, sparql, window: Optional[timedelta] = timedelta(days=7), workers: int = 4,
+                 zoned_times: bool = False):
+        """
+        Args:
+            sparql: SparqlQuery usado nas consultas
+            window: Intervalos longos são divididos em janelas desse tamanho, buscadas em
+                paralelo (None busca o intervalo inteiro em uma query)
+            workers: Número de queries simultâneas
+            zoned_times: Os horários do dataset são gravados com fuso (ex.: "...Z"). Os limites dos
+                intervalos são gerados no mesmo formato que os dados (com ou sem fuso), pois no
+                SPARQL a comparação entre um xsd:dateTime com fuso e outro sem é indeterminada
+        """
+        self.sparql = sparql
+        self.window = window
+        self.workers = workers
+        self.zoned_times = zoned_times
+
+    def _literal(self, value: datetime) -> datetime:
+        # Limite de um intervalo no formato dos dados do dataset (UTC com ou sem fuso)
+        return value.replace(tzinfo=timezone.utc) if self.zoned_times else value
+
+    def _windows(self, start: datetime, end: datetime) -> List[Tuple[datetime, datetime]]:
+        if self.window is None:
+            return [(start, end)]
+        windows = []
+        while start < end:
+            windows.append((start, min(start + self.window, end)))
+            start += self.window
+        return windows
+
+    def _series(self, template: QueryTemplate, icao: str, start: datetime,
+                end: datetime) -> Tuple[Optional[str], List[Dict[str, str]]]:
+        queries = [template.bind(aerodromo=aerodrome(icao), inicio=self._literal(inicio), fim=self._literal(fim))
+                   for inicio, fim in self._windows(_utc(start), _utc(end))]
+        rows: List[Dict[str, str]] = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # map devolve as janelas na ordem, então a série continua ordenada
+            for result in executor.map(lambda query: self.sparql.select(query, result_format='json'), queries):
+                if not result['success']:
+                    return result.get('message') or 'Erro na query', []
+                rows.extend({var: term['value'] for var, term in row.items()} for row in result['results'])
+        return None, rows
+
+    def metar_series(self, icao: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Busca os METARs de um aeródromo no intervalo [start, end), ordenados pelo horário.
+
+        Returns:
+            dict com "results": lista de {time, metar, ventoKt, vis, qnh}
+        """
+        error, rows = self._series(METAR_SERIE, icao, start, end)
+        if error is not None:
+            return {"success": False, "message": error}
+        series = [{
+            "time": _parse_time(row['hora']),
+            "metar": row['metar'],
+            "ventoKt": _number(row.get('ventoKt')),
+            "vis": _number(row.get('vis')),
+            "qnh": _number(row.get('qnh'))
+        } for row in rows]
+        return {"success": True, "results": series, "count": len(series)}
+
+    def landing_series(self, icao: str, start: datetime, end: datetime) -> Dict[str, Any]:
+        """
+        Busca os pousos em um aeródromo no intervalo [start, end), ordenados pelo horário.
+
+        Returns:
+            dict com "results": lista de {time, flight}
+        """
+        error, rows = self._series(POUSOS_SERIE, icao, start, end)
+        if error is not None:
+            return {"success": False, "message": error}
+        series = [{"time": _parse_time(row['hora']), "flight": row['flight']} for row in rows]
+        return {"success": True, "results": series, "count": len(series)}
+
+    def landing_range(self, icao: str) -> Dict[str, Any]:
+        """
+        Busca o intervalo coberto pelos pousos de um aeródromo (MIN/MAX do horário).
+
+        Returns:
+            dict com "start" (primeiro pouso) e "end" (um segundo depois do último, para usar
+            como fim exclusivo em correlate); ambos None se não houver pousos
+        """
+        result = self.sparql.select(POUSOS_INTERVALO.bind(aerodromo=aerodrome(icao)))
+        if not result['success']:
+            return {"success": False, "message": result.get('message') or 'Erro na query'}
+        row = result['results'][0] if result['results'] else {}
+        if not row.get('inicio') or not row.get('fim'):
+            return {"success": True, "start": None, "end": None}
+        return {"success": True, "start": _parse_time(row['inicio']['value']),
+                "end": _parse_time(row['fim']['value']) + timedelta(seconds=1)}
+
+    def correlate(self, icao: str, start: datetime, end: datetime, mode: str = 'previous',
+                  tolerance: Optional[timedelta] = timedelta(hours=1)) -> Dict[str, Any]:
+        """
+        Associa cada pouso no aeródromo às condições meteorológicas do momento.
+
+        Args:
+            icao: Código ICAO do aeródromo
+            start: Início do intervalo (inclusive; sem fuso é UTC)
+            end: Fim do intervalo (exclusivo; sem fuso é UTC)
+            mode: 'previous' (último METAR emitido até o pouso), 'nearest' (METAR mais próximo)
+                ou 'same_hour' (todos os METARs da mesma hora, como a antiga query)
+            tolerance: Maior distância entre pouso e METAR nos modos previous/nearest;
+                pousos sem METAR nessa distância vêm com os campos do METAR em None
+
+        Returns:
+            dict com "results": lista de {flight, horaVoo, metar, horaMetar, ventoKt, qnh, vis}
+            ordenada pelo horário do pouso, com horários em UTC sem fuso
+        """
+        if mode not in JOIN_MODES:
+            return {"success": False, "message": f"Modo de junção inválido: {mode} (use {', '.join(JOIN_MODES)})"}
+        start, end = _utc(start), _utc(end)
+
+        # METARs um pouco antes/depois do intervalo também podem ser os mais próximos de um pouso
+        margin = tolerance if tolerance is not None and mode != 'same_hour' else timedelta(hours=1)
+        metar_start = start.replace(minute=0, second=0, microsecond=0) if mode == 'same_hour' else start - margin
+        metar_end = end + margin
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            landings_future = executor.submit(self.landing_series, icao, start, end)
+            metars_future = executor.submit(self.metar_series, icao, metar_start, metar_end)
+            landings, metars = landings_future.result(), metars_future.result()
+        for series in (landings, metars):
+            if not series['success']:
+                return series
+
+        if mode == 'same_hour':
+            pairs = hour_join(landings['results'], metars['results'])
+        else:
+            pairs = asof_join(landings['results'], metars['results'], tolerance=tolerance,
+                              direction='backward' if mode == 'previous' else 'nearest')
+
+        results = []
+        for landing, metar in pairs:
+            metar = metar or {}
+            results.append({
+                "flight": landing['flight'],
+                "horaVoo": landing['time'],
+                "metar": metar.get('metar'),
+                "horaMetar": metar.get('time'),
+                "ventoKt": metar.get('ventoKt'),
+                "qnh": metar.get('qnh'),
+                "vis": metar.get('vis')
+            })
+        return {
+            "success": True,
+            "results": results,
+            "count": len(results),
+            "landings": landings['count'],
+            "metars": metars['count']
+        }
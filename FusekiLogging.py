@@ -0,0 +1,131 @@
+import itertools
+import json
+import logging
+import sys
+from typing import Optional, TextIO
+
+
+# Logger pai de todas as classes (fuseki.query, fuseki.loader, fuseki.async)
+LOGGER_NAME = 'fuseki'
+
+# Atributos padrão de um LogRecord; os demais vieram de extra= e entram no JSON
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger de uma classe, filho de "fuseki" (ex.: get_logger('query') -> fuseki.query)."""
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Deixa passar apenas 1 a cada N registros de nível até max_level
+
+    Registros acima de max_level (por padrão WARNING e ERROR, como consultas lentas e falhas)
+    sempre passam. Útil para manter o nível DEBUG ligado em produção com volume controlado.
+    """
+
+    def __init__(self, rate: float = 0.01, max_level: int = logging.INFO):
+        """
+        Args:
+            rate: Fração dos registros mantida (ex.: 0.01 = 1 a cada 100)
+            max_level: Maior nível sujeito à amostragem
+        """
+        super().__init__()
+        self.every = max(1, round(1 / rate)) if rate > 0 else 0
+        self.max_level = max_level
+        self._counter = itertools.count()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        if not self.every:
+            return False
+        return next(self._counter) % self.every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formata cada registro como um objeto JSON por linha, incluindo os campos passados em extra=
+    (operation, query_name, seconds...)
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def configure_logging(level: int = logging.INFO, sample_rate: Optional[float] = None,
+                      json_format: bool = False, stream: Optional[TextIO] = None,
+                      fmt: str = '%(asctime)s %(levelname)s %(name)s: %(message)s') -> logging.Handler:
+    """
+    Configura a saída dos logs das classes do Fuseki (logger "fuseki").
+
+    Substitui o handler instalado por uma chamada anterior desta função, então pode ser chamada
+    de novo para mudar nível, formato ou amostragem.
+
+    Args:
+        level: Nível mínimo (logging.DEBUG mostra cada query executada)
+        sample_rate: Se informado, mantém só essa fração dos registros até INFO (ver SamplingFilter)
+        json_format: Um objeto JSON por linha em vez de texto
+        stream: Destino (padrão: sys.stderr)
+        fmt: Formato do texto (ignorado com json_format)
+
+    Returns:
+        O handler instalado
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if getattr(handler, '_fuseki_handler', False):
+            logger.removeHandler(handler)
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler._fuseki_handler = True
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(fmt))
+    if sample_rate is not None:
+        handler.addFilter(SamplingFilter(sample_rate))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return handler
+
+
+def instance_logger(name: str, verbose: bool = False) -> logging.Logger:
+    """
+    Logger de uma instância de classe (usado pelo argumento verbose).
+
+    Sem verbose devolve o logger compartilhado da classe (get_logger). Com verbose devolve um
+    logger só da instância, com o mesmo nome e filho do da classe, em nível DEBUG: as mensagens
+    dessa instância aparecem no stdout como os antigos print, ou no handler de
+    configure_logging se ele já tiver sido instalado; as demais instâncias não são afetadas.
+
+    Args:
+        name: Nome da classe no logger (ex.: 'query' -> fuseki.query)
+        verbose: Mostra todas as mensagens da instância
+
+    Returns:
+        O logger a usar em self.log
+    """
+    parent = get_logger(name)
+    if not verbose:
+        return parent
+
+    # Criado fora do logging.getLogger para não ficar registrado (e retido) para sempre
+    logger = logging.Logger(parent.name, logging.DEBUG)
+    logger.parent = parent
+    if not any(getattr(handler, '_fuseki_handler', False) for handler in logging.getLogger(LOGGER_NAME).handlers):
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.propagate = False
+    return logger
@@ -0,0 +1,150 @@
+import time
+from typing import Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from Resilience import CircuitBreaker, RetryPolicy, never_sent
+
+
+class FusekiSession:
+    """
+    Sessão HTTP compartilhada (pool de conexões keep-alive) para o Apache Jena Fuseki
+
+    As novas tentativas (RetryPolicy) e o circuit breaker (CircuitBreaker) são aplicados a
+    cada requisição feita por request()/get()/post()/put()/delete().
+    """
+
+    # Métodos que podem ser repetidos com segurança pelo retry automático
+    IDEMPOTENT_METHODS = RetryPolicy.IDEMPOTENT_METHODS
+
+    def __init__(self, pool_size: int = 10, timeout: Union[float, Tuple[float, float]] = (5, 300),
+                 retries: int = 3, backoff_factor: float = 0.5,
+                 status_forcelist: Tuple[int, ...] = (429, 502, 503, 504),
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Union[CircuitBreaker, bool] = True):
+        """
+        Inicializa a sessão com um pool de conexões reutilizáveis.
+
+        Args:
+            pool_size: Número máximo de conexões mantidas abertas por host
+            timeout: Timeout padrão por requisição em segundos, ou (conexão, leitura)
+            retries: Número máximo de novas tentativas em falhas de conexão/5xx
+            backoff_factor: Fator do backoff exponencial entre tentativas
+            status_forcelist: Códigos HTTP que disparam uma nova tentativa
+            retry_policy: Política de novas tentativas completa (substitui retries,
+                backoff_factor e status_forcelist)
+            circuit_breaker: CircuitBreaker a usar (pode ser compartilhado entre sessões);
+                True cria um com os valores padrão e False desativa
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy(retries=retries, backoff_factor=backoff_factor,
+                                                        status_forcelist=status_forcelist)
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker: Optional[CircuitBreaker] = circuit_breaker or None
+        # As novas tentativas são feitas por request(), não pelo urllib3
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, timeout: Optional[Union[float, Tuple[float, float]]] = None,
+                idempotent: Optional[bool] = None, retry: bool = True,
+                circuit_breaker: Union[CircuitBreaker, bool, None] = None, **kwargs) -> requests.Response:
+        """
+        Executa uma requisição reaproveitando as conexões do pool.
+
+        Falhas temporárias (conexão, timeout, status de status_forcelist) são repetidas conforme
+        a retry_policy, se a requisição puder ser repetida: método idempotente (ou
+        idempotent=True) e corpo que possa ser reenviado (bytes ou arquivo; corpos gerados sob
+        demanda não são repetidos). Com o circuit breaker aberto, levanta CircuitOpenError
+        sem acessar a rede.
+
+        Args:
+            method: Método HTTP (GET, POST, PUT, DELETE...)
+            url: URL da requisição
+            timeout: Timeout desta requisição (se None usa o padrão da sessão)
+            idempotent: Força (True) ou impede (False) novas tentativas depois do envio; se
+                None decide pelo método
+            retry: Se False, não faz novas tentativas (ex.: quando quem chama vai tentar outra réplica)
+            circuit_breaker: CircuitBreaker desta requisição (ex.: o de uma réplica); False
+                desativa e None usa o da sessão
+            **kwargs: Demais argumentos repassados para requests.Session.request
+
+        Returns:
+            requests.Response (com o número de novas tentativas em response.retries)
+        """
+        policy = self.retry_policy
+        breaker = self.circuit_breaker if circuit_breaker is None else circuit_breaker or None
+        data = kwargs.get('data')
+        rewind = None
+        if hasattr(data, 'seek') and hasattr(data, 'tell'):
+            position = data.tell()
+            rewind = lambda: data.seek(position)
+        replayable = data is None or isinstance(data, (bytes, str, dict)) or rewind is not None
+        retry_sent = retry and replayable and policy.is_idempotent(method, idempotent)
+
+        policy.on_request()
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before_request()
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if breaker is not None:
+                    breaker.record_failure()
+                if (not retry or attempt >= policy.retries or not (retry_sent or (replayable and never_sent(e)))
+                        or not policy.acquire_retry()):
+                    raise
+                time.sleep(policy.delay(attempt))
+            except requests.exceptions.RequestException:
+                # Ex.: ChunkedEncodingError/ContentDecodingError ao ler a resposta
+                if breaker is not None:
+                    breaker.record_failure()
+                raise
+            except BaseException:
+                # Erro do lado do cliente (ex.: no gerador do corpo): não diz nada sobre o servidor
+                if breaker is not None:
+                    breaker.release()
+                raise
+            else:
+                if response.status_code not in policy.status_forcelist:
+                    if breaker is not None:
+                        breaker.record_success()
+                    response.retries = attempt
+                    return response
+                if breaker is not None:
+                    breaker.record_failure()
+                if attempt >= policy.retries or not retry_sent or not policy.acquire_retry():
+                    response.retries = attempt
+                    return response
+                response.close()
+                time.sleep(policy.delay(attempt, response))
+            if rewind is not None:
+                rewind()
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request('DELETE', url, **kwargs)
+
+    def close(self):
+        """Fecha todas as conexões do pool."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
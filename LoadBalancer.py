@@ -0,0 +1,208 @@
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import requests
+
+from Resilience import CircuitBreaker
+
+
+BALANCING_STRATEGIES = ('least_outstanding', 'ewma')
+# Status de um proxy ou de um servidor sobrecarregado, que não chegou a executar a query
+FAILOVER_STATUS = frozenset([429, 502, 503, 504])
+
+
+def replica_unavailable(response: requests.Response) -> bool:
+    """
+    Indica se a resposta veio de uma réplica indisponível, e não da execução da query.
+
+    O Fuseki põe o cabeçalho Fuseki-Request-Id em tudo que ele mesmo responde, inclusive nos
+    erros da query (400, 500 e o 503 de timeout da query); repetir essas queries em outra
+    réplica só multiplica o custo. Já um 429/502/503/504 sem esse cabeçalho vem de um proxy ou
+    do Jetty sem threads livres, e vale tentar outra réplica.
+    """
+    return response.status_code in FAILOVER_STATUS and 'Fuseki-Request-Id' not in response.headers
+
+
+class Replica:
+    """Uma réplica de leitura do Fuseki, com seu estado de carga e saúde"""
+
+    def __init__(self, fuseki_url: str, dataset: str, circuit_breaker: CircuitBreaker):
+        self.fuseki_url = fuseki_url.rstrip('/')
+        self.query_endpoint = f"{self.fuseki_url}/{dataset}/query"
+        self.ping_endpoint = f"{self.fuseki_url}/$/ping"
+        self.circuit_breaker = circuit_breaker
+        self.outstanding = 0
+        self.ewma_seconds: Optional[float] = None
+        self.healthy = True
+        self.requests = 0
+        self.errors = 0
+
+    def available(self) -> bool:
+        """Réplica saudável e com o circuito fechado (ou pronto para a requisição de teste)."""
+        return self.healthy and not self.circuit_breaker.is_open()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "url": self.fuseki_url,
+            "healthy": self.healthy,
+            "circuit": self.circuit_breaker.state,
+            "outstanding": self.outstanding,
+            "ewma_seconds": self.ewma_seconds,
+            "requests": self.requests,
+            "errors": self.errors
+        }
+
+
+class ReplicaPool:
+    """
+    Distribui as queries de leitura entre várias réplicas do Fuseki
+
+    Estratégias:
+        least_outstanding: a réplica com menos requisições em andamento (empate: a mais rápida)
+        ewma: a réplica com menor latência média móvel (EWMA do TTFB) ponderada pelas
+            requisições em andamento, que se adapta a réplicas lentas ou sobrecarregadas
+
+    Cada réplica tem o próprio CircuitBreaker: erros seguidos a tiram da rotação até o circuito
+    voltar a fechar. Health checks periódicos (GET /$/ping) também tiram e devolvem réplicas.
+    Só contam como erro as falhas da réplica (conexão, replica_unavailable), nunca os erros
+    da query.
+
+    Cada réplica é um Fuseki com o mesmo dataset do primário, montado a partir de
+    fuseki-data/templates/config-tdb2-dir-readonly (ou config-tdb-dir-readonly, para TDB1):
+    {NAME} é o nome do dataset e {DIR} uma cópia do diretório TDB2 do primário (ou um backup
+    restaurado). Esses templates só expõem os endpoints query, sparql e get (GSP leitura);
+    a URL base de cada servidor (ex.: http://replica1:3030) vai em read_urls, e as consultas
+    usam <URL>/<dataset>/query. As réplicas não recebem as cargas e updates feitos no primário:
+    elas precisam ser recopiadas para ver dados novos.
+    """
+
+    def __init__(self, fuseki_urls: Sequence[str], dataset: str, strategy: str = 'least_outstanding',
+                 ewma_alpha: float = 0.3, failure_threshold: int = 3, reset_timeout: float = 10.0):
+        """
+        Args:
+            fuseki_urls: URLs base das réplicas (ex.: ['http://replica1:3030', 'http://replica2:3030'])
+            dataset: Nome do dataset, o mesmo em todas as réplicas
+            strategy: 'least_outstanding' ou 'ewma'
+            ewma_alpha: Peso da última medida na média móvel de latência (0 a 1)
+            failure_threshold: Falhas seguidas que tiram uma réplica da rotação
+            reset_timeout: Tempo em segundos até uma réplica fora da rotação ser testada de novo
+        """
+        if strategy not in BALANCING_STRATEGIES:
+            raise ValueError(f'Estratégia de balanceamento inválida: {strategy} '
+                             f'(use {", ".join(BALANCING_STRATEGIES)})')
+        if not fuseki_urls:
+            raise ValueError('Informe ao menos uma réplica')
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.replicas: List[Replica] = [
+            Replica(url, dataset, CircuitBreaker(failure_threshold=failure_threshold, reset_timeout=reset_timeout))
+            for url in fuseki_urls
+        ]
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def _score(self, replica: Replica):
+        latency = replica.ewma_seconds or 0.0
+        if self.strategy == 'ewma':
+            return latency * (replica.outstanding + 1), replica.outstanding
+        return replica.outstanding, latency
+
+    def acquire(self, exclude: Iterable[Replica] = ()) -> Optional[Replica]:
+        """
+        Escolhe a réplica da próxima requisição e conta a requisição como em andamento.
+
+        Se nenhuma réplica estiver disponível, escolhe entre todas (melhor tentar do que falhar
+        sem tentar).
+
+        Args:
+            exclude: Réplicas já tentadas nesta requisição
+
+        Returns:
+            Replica escolhida, ou None se todas já foram tentadas
+        """
+        excluded = set(map(id, exclude))
+        with self._lock:
+            candidates = [replica for replica in self.replicas if id(replica) not in excluded]
+            if not candidates:
+                return None
+            candidates = [replica for replica in candidates if replica.available()] or candidates
+            # Embaralha para desempatar sem favorecer sempre a primeira réplica da lista
+            random.shuffle(candidates)
+            replica = min(candidates, key=self._score)
+            replica.outstanding += 1
+            replica.requests += 1
+            return replica
+
+    def release(self, replica: Replica, seconds: Optional[float] = None, failed: bool = False):
+        """
+        Registra o fim de uma requisição.
+
+        Args:
+            replica: Réplica devolvida por acquire()
+            seconds: Latência medida (TTFB), usada na média móvel
+            failed: A réplica falhou (erro de conexão ou replica_unavailable)
+        """
+        with self._lock:
+            replica.outstanding -= 1
+            if failed:
+                replica.errors += 1
+            elif seconds is not None:
+                if replica.ewma_seconds is None:
+                    replica.ewma_seconds = seconds
+                else:
+                    replica.ewma_seconds += self.ewma_alpha * (seconds - replica.ewma_seconds)
+
+    def check_health(self, session, timeout: float = 2.0) -> Dict[str, bool]:
+        """
+        Faz um GET /$/ping em cada réplica e atualiza quais estão saudáveis.
+
+        Args:
+            session: FusekiSession usada nos pings
+            timeout: Timeout de cada ping em segundos
+
+        Returns:
+            dict URL -> saudável
+        """
+        health = {}
+        for replica in self.replicas:
+            try:
+                response = session.get(replica.ping_endpoint, timeout=timeout, retry=False, circuit_breaker=False)
+                healthy = response.status_code == 200
+                response.close()
+            except Exception:
+                healthy = False
+            if healthy and not replica.healthy:
+                # Volta à rotação já com o circuito fechado
+                replica.circuit_breaker.record_success()
+            replica.healthy = healthy
+            health[replica.fuseki_url] = healthy
+        return health
+
+    def start_health_checks(self, session, interval: float = 10.0):
+        """Inicia uma thread que chama check_health a cada interval segundos."""
+        if self._health_thread is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                self.check_health(session)
+
+        self._stop.clear()
+        self._health_thread = threading.Thread(target=run, name='fuseki-health-check', daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        if self._health_thread is not None:
+            self._stop.set()
+            self._health_thread.join()
+            self._health_thread = None
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Estado de cada réplica."""
+        with self._lock:
+            return [replica.stats() for replica in self.replicas]
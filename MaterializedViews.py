@@ -0,0 +1,553 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from Enrichment import utc_parts
+from QueryTemplate import IRI, XSD, Literal, QueryTemplate, Values, aerodrome, render_term
+from RdfFormats import iter_line_blocks, open_rdf
+
+
+def _utc_date(lexical: str) -> str:
+    # Mesma data (UTC, sem fuso) que o DateTimeEnricher grava em :DateTime-date
+    parts = utc_parts(lexical)
+    return parts[0] if parts is not None else lexical.split('T', 1)[0]
+
+
+# Dimensões em que uma carga pode mudar os dados: nome -> regex (bytes) cujo grupo 1 é a chave
+# alterada, ou (regex, função que converte o texto capturado na chave). Funcionam sobre
+# Turtle, TriG, N-Triples e N-Quads, linha a linha
+Dimension = Union['re.Pattern', Tuple['re.Pattern', Callable[[str], str]]]
+DIMENSIONS: Dict[str, Dimension] = {
+    'date': (re.compile(rb'DateTime-value>?\s+"(\d{4,}-\d\d-\d\d[^"]*)"'), _utc_date),
+    'aerodrome': re.compile(rb'[#:]Aerodrome_([\w-]+)'),
+}
+
+# Content-Types em que as dimensões podem ser procuradas; cargas em outros formatos recalculam tudo
+_SCANNABLE_TYPES = ('text/turtle', 'application/trig', 'application/n-triples', 'application/n-quads')
+_VIEW_NAME_RE = re.compile(r'^[\w-]+$')
+_SCAN_BLOCK_BYTES = 1024 * 1024
+
+# Vocabulário usado para guardar as visões em um grafo nomeado
+VIEW_NS = 'urn:x-fuseki-client:view#'
+
+
+class _NoFilter:
+    """Termo vazio ligado ao parâmetro de partições quando a visão é recalculada inteira."""
+
+    def n3(self) -> str:
+        return ''
+
+
+def term_n3(term: Optional[Dict[str, str]]) -> str:
+    """
+    Converte um termo no formato de binding do JSON para a sintaxe N-Triples/SPARQL.
+
+    Usado como chave das partições, então um mesmo termo sempre gera o mesmo texto (literais
+    xsd:string são escritos como literais simples).
+    """
+    if term is None:
+        return ''
+    if term['type'] == 'uri':
+        return IRI(term['value']).n3()
+    if term['type'] == 'bnode':
+        return Literal(term['value'], VIEW_NS + 'bnode').n3()
+    datatype = term.get('datatype')
+    if datatype == XSD + 'string':
+        datatype = None
+    return Literal(term['value'], datatype, term.get('xml:lang')).n3()
+
+
+def scan_changes(event: Dict[str, Any], dimensions: Dict[str, Dimension]) -> Optional[Dict[str, Set[str]]]:
+    """
+    Descobre, a partir de um evento de escrita do TurtleLoader, as chaves de cada dimensão alteradas.
+
+    Args:
+        event: Evento recebido por um listener do TurtleLoader
+        dimensions: Dimensões a procurar (ver DIMENSIONS)
+
+    Returns:
+        dict dimensão -> chaves encontradas, ou None se não for possível saber o que mudou
+        (remoções, updates, substituição de grafo, formatos não textuais ou dados em streaming)
+    """
+    if event.get('operation') != 'load':
+        return None
+    if (event.get('content_type') or '').split(';')[0].strip() not in _SCANNABLE_TYPES:
+        return None
+
+    if event.get('data') is not None:
+        blocks: Iterable[bytes] = [event['data']]
+        file = None
+    elif event.get('source'):
+        file = open_rdf(event['source'])
+        blocks = iter_line_blocks(file, _SCAN_BLOCK_BYTES)
+    else:
+        return None
+
+    found: Dict[str, Set[bytes]] = {name: set() for name in dimensions}
+    try:
+        for block in blocks:
+            for name, dimension in dimensions.items():
+                regex = dimension[0] if isinstance(dimension, tuple) else dimension
+                found[name].update(regex.findall(block))
+    finally:
+        if file is not None:
+            file.close()
+    changes: Dict[str, Set[str]] = {}
+    for name, dimension in dimensions.items():
+        keys = (key.decode('utf-8') for key in found[name])
+        changes[name] = set(map(dimension[1], keys) if isinstance(dimension, tuple) else keys)
+    return changes
+
+
+class MaterializedView:
+    """
+    Query de agregação cujo resultado é guardado e atualizado por partição
+
+    A query deve ter o parâmetro %{particoes} (ou o nome passado em param) no ponto em que a
+    variável de partição já está ligada. Em uma atualização incremental ele recebe um bloco
+    VALUES com as partições alteradas; no recálculo completo, nada.
+    """
+
+    def __init__(self, name: str, query: QueryTemplate, partition: Optional[str] = None,
+                 dimension: Optional[str] = None, partition_term: Callable[[str], Any] = str,
+                 param: str = 'particoes'):
+        """
+        Args:
+            name: Nome da visão (letras, números, "_" e "-")
+            query: Template da query de agregação
+            partition: Variável do resultado que identifica a partição (ex.: 'data'). Se None,
+                a visão é sempre recalculada inteira
+            dimension: Dimensão de mudança que afeta cada partição (chave de DIMENSIONS)
+            partition_term: Converte a chave alterada (ex.: '2025-07-01' ou 'SBGR') no valor da
+                variável de partição (ex.: str, date.fromisoformat ou aerodrome). Deve gerar o
+                mesmo termo que a query devolve nessa variável
+            param: Nome do parâmetro do template que recebe o bloco VALUES
+        """
+        if not _VIEW_NAME_RE.match(name):
+            raise ValueError(f'Nome de visão inválido: {name!r}')
+        if dimension is not None and partition is None:
+            raise ValueError('Uma visão com dimension precisa de partition')
+        if partition is not None and param not in query.params:
+            raise ValueError(f'O template da visão {name} não tem o parâmetro %{{{param}}}')
+        self.name = name
+        self.query = query
+        self.partition = partition
+        self.dimension = dimension
+        self.partition_term = partition_term
+        self.param = param
+
+    def queries(self, keys: Optional[Iterable[str]] = None, batch_size: int = 200) -> Iterator[str]:
+        """
+        Gera as queries de atualização.
+
+        Args:
+            keys: Chaves alteradas (se None, uma única query para a visão inteira)
+            batch_size: Número máximo de partições por query
+
+        Returns:
+            Iterador de queries
+        """
+        params = {self.param: _NoFilter()} if self.param in self.query.params else {}
+        if keys is None or self.partition is None:
+            yield self.query.bind(**params)
+            return
+        yield from self.query.bind_batches(self.param, self.partition,
+                                           [self.partition_term(key) for key in keys], batch_size)
+
+    def partition_keys(self, keys: Iterable[str]) -> List[str]:
+        """Texto das partições (como em term_n3) correspondentes às chaves alteradas."""
+        return [render_term(self.partition_term(key)) for key in keys]
+
+
+class FileViewStore:
+    """
+    Guarda as visões em um arquivo JSON local
+
+    O arquivo inteiro é mantido em memória e regravado de forma atômica a cada atualização;
+    adequado para visões de agregação, que são pequenas.
+    """
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Caminho do arquivo (criado na primeira atualização)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._views: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as file:
+                self._views = json.load(file)
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Lê uma visão guardada.
+
+        Returns:
+            dict com "variables", "partitions" (chave -> linhas) e "refreshed_at" (epoch), ou
+            None se a visão nunca foi calculada
+        """
+        with self._lock:
+            return self._views.get(name)
+
+    def save(self, name: str, variables: List[str], partitions: Dict[str, List[Dict[str, Any]]],
+             removed: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """
+        Grava o resultado de uma atualização.
+
+        Args:
+            name: Nome da visão
+            variables: Variáveis do resultado
+            partitions: Partições recalculadas (chave -> linhas)
+            removed: Partições a descartar antes de gravar (se None, substitui a visão inteira)
+
+        Returns:
+            dict com status da operação
+        """
+        with self._lock:
+            current = self._views.get(name)
+            if removed is None or current is None:
+                merged = {}
+            else:
+                merged = dict(current['partitions'])
+                for key in removed:
+                    merged.pop(key, None)
+            merged.update(partitions)
+            self._views[name] = {
+                "variables": variables,
+                "partitions": dict(sorted(merged.items())),
+                "refreshed_at": time.time()
+            }
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(self._views, file, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        return {"success": True, "message": f"Visão {name} gravada em {self.path}"}
+
+
+class GraphViewStore:
+    """
+    Guarda as visões em um grafo nomeado do próprio Fuseki
+
+    Cada linha vira um recurso com a visão, a partição, a posição e um valor por coluna. As
+    partições alteradas são trocadas em um único SPARQL UPDATE (DELETE + INSERT DATA), então
+    leitores nunca veem uma visão pela metade. Se o dataset usar o grafo padrão como união dos
+    grafos nomeados, prefira FileViewStore, para que as visões não entrem nas agregações.
+    """
+
+    def __init__(self, sparql, graph_uri: str = 'urn:x-fuseki-client:views'):
+        """
+        Args:
+            sparql: SparqlQuery usado para ler e gravar o grafo
+            graph_uri: URI do grafo das visões
+        """
+        self.sparql = sparql
+        self.graph = IRI(graph_uri).n3()
+
+    def load(self, name: str) -> Optional[Dict[str, Any]]:
+        """Lê uma visão guardada (mesmo formato de FileViewStore.load)."""
+        view = Literal(name).n3()
+        query = f"""
+            SELECT ?row ?key ?index ?column ?value ?variables ?refreshed
+            WHERE {{
+              GRAPH {self.graph} {{
+                {{
+                  ?view <{VIEW_NS}name> {view} ;
+                        <{VIEW_NS}variables> ?variables ;
+                        <{VIEW_NS}refreshedAt> ?refreshed .
+                }} UNION {{
+                  ?row <{VIEW_NS}view> {view} ;
+                       <{VIEW_NS}partition> ?key ;
+                       <{VIEW_NS}index> ?index ;
+                       ?column ?value .
+                  FILTER(STRSTARTS(STR(?column), "{VIEW_NS}column-"))
+                }}
+              }}
+            }}
+            """
+        result = self.sparql.select(query, use_cache=False, query_name=f'view_load:{name}')
+        if not result['success']:
+            raise RuntimeError(f"Erro ao ler a visão {name}: {result.get('message')}")
+
+        meta = None
+        rows: Dict[str, Dict[str, Any]] = {}
+        for binding in result['results']:
+            if 'variables' in binding:
+                meta = binding
+                continue
+            row = rows.setdefault(binding['row']['value'], {
+                "key": binding['key']['value'],
+                "index": int(binding['index']['value']),
+                "values": {}
+            })
+            value = binding['value']
+            if value.get('datatype') == VIEW_NS + 'bnode':
+                value = {'type': 'bnode', 'value': value['value']}
+            row['values'][binding['column']['value'][len(VIEW_NS + 'column-'):]] = value
+        if meta is None:
+            return None
+
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for row in sorted(rows.values(), key=lambda row: (row['key'], row['index'])):
+            partitions.setdefault(row['key'], []).append(row['values'])
+        return {
+            "variables": meta['variables']['value'].split(),
+            "partitions": partitions,
+            "refreshed_at": float(meta['refreshed']['value'])
+        }
+
+    def save(self, name: str, variables: List[str], partitions: Dict[str, List[Dict[str, Any]]],
+             removed: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Grava o resultado de uma atualização (mesmos argumentos de FileViewStore.save)."""
+        view = Literal(name).n3()
+        view_iri = IRI(f'urn:x-fuseki-client:view:{name}').n3()
+        if removed is None:
+            # Apaga todas as linhas da visão
+            keys_filter = ''
+        else:
+            keys = sorted(set(removed) | set(partitions))
+            keys_filter = Values('key', [Literal(key) for key in keys]).n3()
+
+        triples = [
+            f'{view_iri} <{VIEW_NS}name> {view} ; '
+            f'<{VIEW_NS}variables> {Literal(" ".join(variables)).n3()} ; '
+            f'<{VIEW_NS}refreshedAt> {Literal(repr(time.time()), XSD + "double").n3()} .'
+        ]
+        for key, rows in partitions.items():
+            row_prefix = f'urn:x-fuseki-client:view:{name}:{hashlib.sha1(key.encode("utf-8")).hexdigest()}'
+            for index, row in enumerate(rows):
+                row_iri = IRI(f'{row_prefix}:{index}').n3()
+                columns = ' ; '.join(f'<{VIEW_NS}column-{var}> {term_n3(term)}'
+                                     for var, term in row.items() if term is not None)
+                triples.append(f'{row_iri} <{VIEW_NS}view> {view} ; <{VIEW_NS}partition> {Literal(key).n3()} ; '
+                               f'<{VIEW_NS}index> {index}' + (f' ; {columns}' if columns else '') + ' .')
+
+        update = f"""
+            DELETE {{ GRAPH {self.graph} {{ ?s ?p ?o }} }}
+            WHERE {{
+              GRAPH {self.graph} {{
+                {{ ?s <{VIEW_NS}name> {view} ; ?p ?o }}
+                UNION
+                {{ ?s <{VIEW_NS}view> {view} ; <{VIEW_NS}partition> ?key ; ?p ?o . {keys_filter} }}
+              }}
+            }} ;
+            INSERT DATA {{ GRAPH {self.graph} {{
+            {chr(10).join(triples)}
+            }} }}
+            """
+        return self.sparql.update(update, query_name=f'view_save:{name}')
+
+
+class MaterializedViews:
+    """
+    Visões materializadas de queries de agregação, atualizadas de forma incremental
+
+    Ligado a um TurtleLoader (attach), cada carga informa as datas e aeródromos que trouxe; só
+    as partições afetadas são recalculadas, na próxima leitura (ou em refresh()). Leituras
+    custam O(resultado) em vez de O(dataset). Escritas que não dizem o que mudou (remoções,
+    updates, PUT de um grafo, formatos não textuais) levam a um recálculo completo.
+
+    Escritas feitas por outros processos não são vistas: depois delas use refresh(full=True).
+    """
+
+    def __init__(self, sparql, store: Union[str, FileViewStore, GraphViewStore],
+                 views: Iterable[MaterializedView] = (), dimensions: Optional[Dict[str, Dimension]] = None,
+                 auto_refresh: bool = True):
+        """
+        Args:
+            sparql: SparqlQuery usado nas queries de agregação
+            store: FileViewStore, GraphViewStore ou o caminho de um arquivo JSON
+            views: Visões a registrar (ver register)
+            dimensions: Dimensões de mudança procuradas nas cargas (padrão: DIMENSIONS)
+            auto_refresh: read() atualiza antes as partições pendentes da visão
+        """
+        self.sparql = sparql
+        self.store = FileViewStore(store) if isinstance(store, str) else store
+        self.dimensions = DIMENSIONS if dimensions is None else dimensions
+        self.auto_refresh = auto_refresh
+        self.views: Dict[str, MaterializedView] = {}
+        self._dirty: Dict[str, Set[str]] = {}
+        self._full: Set[str] = set()
+        self._lock = threading.Lock()
+        for view in views:
+            self.register(view)
+
+    def register(self, view: MaterializedView):
+        """Registra uma visão; se ela ainda não foi calculada, fica pendente de recálculo completo."""
+        if view.dimension is not None and view.dimension not in self.dimensions:
+            raise ValueError(f'Dimensão desconhecida: {view.dimension}')
+        with self._lock:
+            self.views[view.name] = view
+            if self.store.load(view.name) is None:
+                self._full.add(view.name)
+
+    def attach(self, loader):
+        """Passa a receber os eventos de escrita de um TurtleLoader."""
+        loader.add_listener(self.on_change)
+        return loader
+
+    def on_change(self, event: Dict[str, Any]):
+        """
+        Listener de escrita do TurtleLoader: marca as partições afetadas como pendentes.
+
+        Args:
+            event: Evento de escrita (ver TurtleLoader.add_listener)
+        """
+        with self._lock:
+            used = {view.dimension for view in self.views.values()
+                    if view.dimension is not None and view.name not in self._full}
+        changes = scan_changes(event, {name: self.dimensions[name] for name in used}) if used else None
+        with self._lock:
+            for view in self.views.values():
+                if changes is None or view.dimension is None:
+                    self._full.add(view.name)
+                    self._dirty.pop(view.name, None)
+                elif view.name not in self._full and changes.get(view.dimension):
+                    self._dirty.setdefault(view.name, set()).update(changes[view.dimension])
+
+    def invalidate(self, name: Optional[str] = None):
+        """Marca uma visão (ou todas) para recálculo completo."""
+        with self._lock:
+            for view_name in [name] if name is not None else list(self.views):
+                self._full.add(view_name)
+                self._dirty.pop(view_name, None)
+
+    def pending(self) -> Dict[str, Any]:
+        """Atualizações pendentes: visão -> 'full' ou lista de chaves alteradas."""
+        with self._lock:
+            pending: Dict[str, Any] = {name: sorted(keys) for name, keys in self._dirty.items()}
+            pending.update((name, 'full') for name in self._full)
+            return pending
+
+    def refresh(self, name: Optional[str] = None, full: bool = False) -> Dict[str, Any]:
+        """
+        Aplica as atualizações pendentes.
+
+        Args:
+            name: Visão a atualizar (se None, todas)
+            full: Recalcula a visão inteira mesmo sem pendências
+
+        Returns:
+            dict com o resultado de cada visão em "views"
+        """
+        names = [name] if name is not None else list(self.views)
+        results = {view_name: self._refresh_view(view_name, full) for view_name in names}
+        failed = [view_name for view_name, result in results.items() if not result['success']]
+        return {
+            "success": not failed,
+            "message": f"Falha ao atualizar: {', '.join(failed)}" if failed else "Visões atualizadas",
+            "views": results
+        }
+
+    def _refresh_view(self, name: str, full: bool = False) -> Dict[str, Any]:
+        view = self.views.get(name)
+        if view is None:
+            return {"success": False, "message": f"Visão não registrada: {name}"}
+
+        with self._lock:
+            full = full or name in self._full
+            keys = self._dirty.pop(name, set())
+            self._full.discard(name)
+        if not full and not keys:
+            return {"success": True, "view": name, "mode": 'fresh', "partitions": 0}
+
+        start = time.perf_counter()
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        variables: List[str] = []
+        try:
+            for query in view.queries(None if full else sorted(keys)):
+                result = self.sparql.select(query, use_cache=False, query_name=f'view:{name}')
+                if not result['success']:
+                    raise RuntimeError(result.get('message') or 'Erro na query da visão')
+                variables = result['variables']
+                for row in result['results']:
+                    key = term_n3(row.get(view.partition)) if view.partition else ''
+                    partitions.setdefault(key, []).append(row)
+            saved = self.store.save(name, variables, partitions,
+                                    removed=None if full else view.partition_keys(keys))
+            if not saved['success']:
+                raise RuntimeError(saved.get('message') or 'Erro ao gravar a visão')
+        except Exception as e:
+            # As pendências voltam para a próxima tentativa
+            with self._lock:
+                if full:
+                    self._full.add(name)
+                else:
+                    self._dirty.setdefault(name, set()).update(keys)
+            return {
+                "success": False,
+                "view": name,
+                "message": f"Erro ao atualizar a visão {name}: {str(e)}",
+                "error": str(e)
+            }
+
+        return {
+            "success": True,
+            "view": name,
+            "mode": 'full' if full else 'incremental',
+            "partitions": len(partitions) if full else len(keys),
+            "seconds": time.perf_counter() - start
+        }
+
+    def read(self, name: str) -> Dict[str, Any]:
+        """
+        Lê o resultado guardado de uma visão, ordenado pela partição.
+
+        Args:
+            name: Nome da visão
+
+        Returns:
+            dict com "results" no mesmo formato de SparqlQuery.select e "refreshed_at"
+        """
+        if name not in self.views:
+            return {"success": False, "message": f"Visão não registrada: {name}"}
+        if self.auto_refresh:
+            refreshed = self._refresh_view(name)
+            if not refreshed['success']:
+                return refreshed
+        stored = self.store.load(name)
+        if stored is None:
+            return {"success": False, "message": f"Visão {name} ainda não calculada"}
+        results = [row for rows in stored['partitions'].values() for row in rows]
+        return {
+            "success": True,
+            "results": results,
+            "variables": stored['variables'],
+            "count": len(results),
+            "refreshed_at": stored['refreshed_at'],
+            "pending": name in self.pending()
+        }
+
+
+# Visões das consultas de exemplo (teste_select_3 e teste_select_4). A contagem diária usa o
+# :DateTime-date gerado por TurtleLoader(..., enrich=DateTimeEnricher()), que permite recalcular
+# um dia pelo índice em vez de converter todos os horários para string
+VOOS_POR_DIA = MaterializedView('voos_por_dia', QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT ?data (COUNT(?flight) AS ?totalVoos)
+    WHERE {
+      %{particoes}
+      ?t :DateTime-date ?data .
+      ?landing :Landing-time ?t .
+      ?flight :ArrivalOperations-landing ?landing ;
+              a :ArrivalOperations .
+    }
+    GROUP BY ?data
+    """, name='view_voos_por_dia'), partition='data', dimension='date', partition_term=date.fromisoformat)
+
+AERODROMOS = MaterializedView('aerodromos', QueryTemplate("""
+    PREFIX ad: <http://airdata.org/ontology#>
+
+    SELECT DISTINCT ?aerodromo
+    WHERE {
+      %{particoes}
+      ?metar ad:WeatherCondition-aerodrome ?aerodromo ;
+             a ad:AerodromeCondition .
+    }
+    """, name='view_aerodromos'), partition='aerodromo', dimension='aerodrome', partition_term=aerodrome)
@@ -0,0 +1,449 @@
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from QueryTemplate import BoundQuery
+
+
+# Limites (em segundos) dos buckets dos histogramas de tempo
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Campos do evento de cada chamada que viram histogramas e contadores
+HISTOGRAMS = ('wall_seconds', 'ttfb_seconds', 'parse_seconds')
+COUNTERS = ('bytes_sent', 'bytes_received', 'rows', 'retries')
+_HELP = {
+    'wall_seconds': 'Tempo total da chamada em segundos',
+    'ttfb_seconds': 'Tempo até a chegada dos cabeçalhos da resposta em segundos',
+    'parse_seconds': 'Tempo entre o fim da resposta HTTP e o fim da chamada em segundos',
+}
+
+# Chaves dos dicts de resultado que informam a quantidade de linhas/triplas/operações
+_ROW_KEYS = ('count', 'triple_count', 'total_triples', 'applied_operations')
+
+# Parâmetros cujo valor identifica a chamada no log de chamadas lentas (além do texto da query)
+_LABEL_PARAMS = ('file_path', 'dir_path', 'graph_uri', 'source')
+
+# Evento da chamada instrumentada em andamento (ver in_current_call para levá-lo a outras threads)
+_current_event: ContextVar[Optional[Dict[str, Any]]] = ContextVar('fuseki_metrics_event', default=None)
+
+
+class Histogram:
+    """
+    Histograma cumulativo com buckets fixos (como os do Prometheus)
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Pares (limite, contagem acumulada), terminando em "+Inf"."""
+        total = 0
+        pairs = []
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            pairs.append((bound if isinstance(bound, str) else repr(float(bound)), total))
+        return pairs
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimativa do quantil q (0 a 1) pelo limite superior do bucket onde ele cai (None além do último)."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+        return None
+
+
+class Metrics:
+    """
+    Métricas de chamadas ao Fuseki feitas por SparqlQuery e TurtleLoader
+
+    Passe o mesmo objeto como metrics= para as classes. Cada chamada instrumentada gera um
+    evento (dict) com operation, query_name, success, status_code, wall_seconds,
+    ttfb_seconds (até a chegada dos cabeçalhos da resposta), parse_seconds (do fim da resposta
+    HTTP ao fim da chamada), bytes_sent, bytes_received, rows, retries e requests. Os eventos
+    são agregados em histogramas e contadores por (operação, query_name) e repassados aos
+    hooks registrados, que podem enviá-los a qualquer outro sistema.
+
+    O agregado pode ser exportado em texto do Prometheus (to_prometheus), em JSON (to_json),
+    gravado em arquivo (write) ou servido por HTTP (start_exporter).
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+                 hooks: Optional[List[Callable[[Dict[str, Any]], None]]] = None,
+                 namespace: str = 'fuseki_client'):
+        """
+        Inicializa o registro de métricas.
+
+        Args:
+            buckets: Limites em segundos dos buckets dos histogramas de tempo
+            hooks: Funções chamadas com o evento de cada chamada (opcional)
+            namespace: Prefixo dos nomes das métricas no formato do Prometheus
+        """
+        self.buckets = tuple(buckets)
+        self.hooks: List[Callable[[Dict[str, Any]], None]] = list(hooks or [])
+        self.namespace = namespace
+        self.hook_errors = 0
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, str, str], Histogram] = {}
+        self._counters: Dict[Tuple[str, str, str], float] = {}
+        self._statuses: Dict[Tuple[str, str, str], int] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def add_hook(self, hook: Callable[[Dict[str, Any]], None]):
+        """Registra uma função chamada com o evento de cada chamada."""
+        self.hooks.append(hook)
+
+    def record(self, event: Dict[str, Any]):
+        """
+        Agrega o evento de uma chamada e o repassa aos hooks.
+
+        Args:
+            event: dict com ao menos "operation"; os demais campos são opcionais
+        """
+        key = (event['operation'], event.get('query_name') or '')
+        with self._lock:
+            for name in HISTOGRAMS:
+                value = event.get(name)
+                if value is not None:
+                    histogram = self._histograms.get(key + (name,))
+                    if histogram is None:
+                        histogram = self._histograms[key + (name,)] = Histogram(self.buckets)
+                    histogram.observe(value)
+            for name in ('calls',) + COUNTERS:
+                value = 1 if name == 'calls' else event.get(name)
+                if value:
+                    self._counters[key + (name,)] = self._counters.get(key + (name,), 0) + value
+            if not event.get('success', True):
+                self._counters[key + ('errors',)] = self._counters.get(key + ('errors',), 0) + 1
+            status = str(event.get('status_code') or 'none')
+            self._statuses[key + (status,)] = self._statuses.get(key + (status,), 0) + 1
+
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                # Um hook com defeito não pode derrubar a consulta que está sendo medida
+                self.hook_errors += 1
+
+    def reset(self):
+        """Descarta todos os valores agregados."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._statuses.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Retorna o agregado atual.
+
+        Returns:
+            dict {"operations": [{operation, query_name, calls, errors, bytes_sent, ...,
+            "status_codes": {...}, "wall_seconds": {count, sum, mean, p50, p95, p99, buckets}, ...}]}
+        """
+        with self._lock:
+            keys = sorted({key[:2] for key in self._counters})
+            operations = []
+            for operation, query_name in keys:
+                item: Dict[str, Any] = {"operation": operation, "query_name": query_name or None}
+                for name in ('calls', 'errors') + COUNTERS:
+                    item[name] = self._counters.get((operation, query_name, name), 0)
+                item["status_codes"] = {status: count for (op, qn, status), count in sorted(self._statuses.items())
+                                        if (op, qn) == (operation, query_name)}
+                for name in HISTOGRAMS:
+                    histogram = self._histograms.get((operation, query_name, name))
+                    if histogram is None:
+                        continue
+                    item[name] = {
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "mean": histogram.sum / histogram.count,
+                        "p50": histogram.quantile(0.50),
+                        "p95": histogram.quantile(0.95),
+                        "p99": histogram.quantile(0.99),
+                        "buckets": dict(histogram.cumulative())
+                    }
+                operations.append(item)
+        return {"timestamp": time.time(), "operations": operations}
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """Agregado atual em JSON (ver snapshot)."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Agregado atual no formato de texto do Prometheus (version 0.0.4)."""
+        ns = self.namespace
+        lines = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+            statuses = sorted(self._statuses.items())
+
+        for name in HISTOGRAMS:
+            metric = f'{ns}_{name}'
+            series = [(key, histogram) for key, histogram in histograms if key[2] == name]
+            if not series:
+                continue
+            lines.append(f'# HELP {metric} {_HELP[name]}')
+            lines.append(f'# TYPE {metric} histogram')
+            for (operation, query_name, _), histogram in series:
+                labels = _labels(operation=operation, query_name=query_name)
+                for bound, count in histogram.cumulative():
+                    lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{metric}_sum{{{labels}}} {histogram.sum!r}')
+                lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+
+        for name in ('calls', 'errors') + COUNTERS:
+            metric = f'{ns}_{name}_total'
+            series = [(key, value) for key, value in counters if key[2] == name]
+            if not series:
+                continue
+            lines.append(f'# TYPE {metric} counter')
+            for (operation, query_name, _), value in series:
+                lines.append(f'{metric}{{{_labels(operation=operation, query_name=query_name)}}} {value}')
+
+        if statuses:
+            metric = f'{ns}_responses_total'
+            lines.append(f'# TYPE {metric} counter')
+            for (operation, query_name, status), value in statuses:
+                labels = _labels(operation=operation, query_name=query_name, status_code=status)
+                lines.append(f'{metric}{{{labels}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """
+        Grava o agregado em arquivo: JSON se o nome terminar em .json, senão texto do Prometheus
+        (ex.: para o textfile collector do node_exporter). A gravação é atômica.
+
+        Args:
+            path: Caminho do arquivo
+        """
+        content = self.to_json() if path.endswith('.json') else self.to_prometheus()
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        os.replace(tmp_path, path)
+
+    def start_exporter(self, host: str = '127.0.0.1', port: int = 9464) -> str:
+        """
+        Serve as métricas por HTTP em uma thread: /metrics (Prometheus) e /metrics.json.
+
+        Args:
+            host: Endereço de escuta
+            port: Porta de escuta (0 escolhe uma porta livre)
+
+        Returns:
+            URL base do exportador
+        """
+        if self._server is None:
+            self._server = ThreadingHTTPServer((host, port), _ExporterHandler)
+            self._server.daemon_threads = True
+            self._server.metrics = self
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def stop_exporter(self):
+        """Encerra o servidor iniciado por start_exporter()."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+def _labels(**labels: str) -> str:
+    return ','.join(f'{name}="' + value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"') + '"'
+                    for name, value in labels.items())
+
+
+class _ExporterHandler(BaseHTTPRequestHandler):
+    server: ThreadingHTTPServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        metrics: Metrics = self.server.metrics
+        if self.path.startswith('/metrics.json'):
+            body, content_type = metrics.to_json().encode('utf-8'), 'application/json'
+        elif self.path.startswith('/metrics'):
+            body, content_type = metrics.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4'
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def in_current_call(fn: Callable) -> Callable:
+    """
+    Liga fn à chamada instrumentada em andamento, para executá-la em outra thread (ex.: nos
+    workers de um ThreadPoolExecutor): as respostas observadas e as chamadas instrumentadas
+    feitas dentro de fn contam na chamada externa. Sem chamada em andamento devolve fn.
+
+    Ex.: executor.submit(in_current_call(upload), file_path)
+    """
+    event = _current_event.get()
+    if event is None:
+        return fn
+
+    @functools.wraps(fn)
+    def run(*args, **kwargs):
+        token = _current_event.set(event)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current_event.reset(token)
+    return run
+
+
+def observe_response(response: requests.Response):
+    """
+    Registra na chamada instrumentada em andamento os dados de uma resposta HTTP: status,
+    TTFB (response.elapsed), bytes enviados e recebidos e novas tentativas.
+    Sem chamada em andamento (ou sem metrics configurado) não faz nada.
+
+    Args:
+        response: Resposta devolvida pela sessão
+    """
+    event = _current_event.get()
+    if event is None or response is None:
+        return
+    with event['_lock']:
+        _observe(event, response)
+
+
+def _observe(event: Dict[str, Any], response: requests.Response):
+    event['requests'] += 1
+    event['status_code'] = response.status_code
+    event['ttfb_seconds'] = (event['ttfb_seconds'] or 0.0) + response.elapsed.total_seconds()
+    event['_response_at'] = time.perf_counter()
+
+    body = getattr(response.request, 'body', None)
+    if isinstance(body, (bytes, str)):
+        event['bytes_sent'] += len(body)
+    elif hasattr(body, 'fileno'):
+        try:
+            event['bytes_sent'] += os.fstat(body.fileno()).st_size
+        except (OSError, ValueError):
+            pass
+
+    length = response.headers.get('Content-Length')
+    if length and length.isdigit():
+        event['bytes_received'] += int(length)
+    elif response._content_consumed and isinstance(response._content, bytes):
+        event['bytes_received'] += len(response._content)
+
+    # Novas tentativas feitas pela FusekiSession (ou, em outra sessão, pelo urllib3)
+    retries = getattr(response, 'retries', None)
+    if isinstance(retries, int):
+        event['retries'] += retries
+    elif getattr(response.raw, 'retries', None) is not None:
+        event['retries'] += len(response.raw.retries.history)
+
+
+def instrumented(operation: str):
+    """
+    Decorador dos métodos de SparqlQuery/TurtleLoader medidos quando self.metrics está definido.
+
+    O nome da query vem do argumento query_name, se o método o aceitar, ou do atributo name
+    de uma BoundQuery. Chamadas aninhadas (ex.: select_columns usando select_iter) contam
+    só como a chamada externa, inclusive as feitas em workers com in_current_call. Quando o
+    método devolve um stream (SelectStream), a medição só termina quando ele é fechado, e
+    inclui a leitura dos resultados. Se self.slow_query_seconds estiver definido, chamadas que
+    demorarem ao menos esse tempo são registradas como WARNING em self.log, com o texto da
+    query ou um rótulo curto (caminho do arquivo, grafo), nunca os dados enviados.
+    """
+    def decorator(method):
+        first_param = list(inspect.signature(method).parameters)[1:2]
+        label_param = first_param[0] if first_param and first_param[0] in ('query',) + _LABEL_PARAMS else None
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics: Optional[Metrics] = self.metrics
+            slow_query_seconds: Optional[float] = self.slow_query_seconds
+            if (metrics is None and slow_query_seconds is None) or _current_event.get() is not None:
+                return method(self, *args, **kwargs)
+
+            first = args[0] if args else kwargs.get(label_param) if label_param else None
+            query_name = kwargs.get('query_name') or (first.name if isinstance(first, BoundQuery) else None)
+            label = first if label_param is not None and isinstance(first, str) else ''
+            event = {
+                "operation": operation,
+                "query_name": query_name,
+                "success": False,
+                "status_code": None,
+                "wall_seconds": None,
+                "ttfb_seconds": None,
+                "parse_seconds": None,
+                "bytes_sent": 0,
+                "bytes_received": 0,
+                "rows": None,
+                "retries": 0,
+                "requests": 0,
+                "_response_at": None,
+                "_lock": threading.Lock()
+            }
+            token = _current_event.set(event)
+            start = time.perf_counter()
+            try:
+                result = method(self, *args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                _current_event.reset(token)
+
+            def finish(end: float):
+                event['wall_seconds'] = end - start
+                if event['_response_at'] is not None:
+                    event['parse_seconds'] = end - event['_response_at']
+                del event['_response_at'], event['_lock']
+
+                if isinstance(result, dict):
+                    event['success'] = bool(result.get('success'))
+                    event['status_code'] = result.get('status_code', event['status_code'])
+                    event['rows'] = next((result[key] for key in _ROW_KEYS if isinstance(result.get(key), int)), None)
+                else:
+                    event['success'] = bool(getattr(result, 'success', True))
+                    event['status_code'] = getattr(result, 'status_code', event['status_code'])
+                    event['rows'] = getattr(result, 'count', None)
+
+                if slow_query_seconds is not None and event['wall_seconds'] >= slow_query_seconds:
+                    self.log.warning('Chamada lenta: %s%s levou %.3f s (status %s)\n%.2000s', operation,
+                                     f' [{query_name}]' if query_name else '', event['wall_seconds'],
+                                     event['status_code'], label,
+                                     extra={key: event[key] for key in ('operation', 'query_name', 'wall_seconds',
+                                                                        'ttfb_seconds', 'status_code', 'rows')})
+                if metrics is not None:
+                    metrics.record(event)
+
+            if hasattr(result, 'on_close'):
+                # Stream: a chamada só termina quando os resultados forem lidos (ou o stream fechado)
+                result.on_close(lambda: finish(time.perf_counter()))
+            else:
+                finish(end)
+            return result
+        return wrapper
+    return decorator
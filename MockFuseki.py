@@ -0,0 +1,249 @@
+import gzip
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+METAR_VARS = ['metar', 'hora', 'ventoKt', 'vis', 'qnh']
+
+
+def _metar_row(i: int) -> Tuple[str, str, str, int, str]:
+    return (f'http://airdata.org/ontology#Metar_SBGR_{i:08d}', f'2025-07-{1 + i // 48 % 28:02d}T{i // 2 % 24:02d}:{i % 2 * 30:02d}:00',
+            f'{i % 35}.{i % 10}', (800, 1500, 3000, 5000, 8000, 9999)[i % 6], f'{995 + i % 35}.{i % 10}')
+
+
+def canned_select(rows: int, result_format: str) -> bytes:
+    """
+    Gera uma resposta SELECT com linhas no formato da query teste_select_1 (METAR).
+
+    Args:
+        rows: Número de linhas
+        result_format: 'json', 'tsv' ou 'csv'
+
+    Returns:
+        Corpo da resposta
+    """
+    if result_format == 'json':
+        bindings = []
+        for i in range(rows):
+            metar, hora, vento, vis, qnh = _metar_row(i)
+            bindings.append({
+                'metar': {'type': 'uri', 'value': metar},
+                'hora': {'type': 'literal', 'datatype': XSD + 'dateTime', 'value': hora},
+                'ventoKt': {'type': 'literal', 'datatype': XSD + 'decimal', 'value': vento},
+                'vis': {'type': 'literal', 'datatype': XSD + 'integer', 'value': str(vis)},
+                'qnh': {'type': 'literal', 'datatype': XSD + 'decimal', 'value': qnh},
+            })
+        return json.dumps({'head': {'vars': METAR_VARS}, 'results': {'bindings': bindings}}).encode('utf-8')
+    if result_format == 'tsv':
+        lines = ['\t'.join(f'?{var}' for var in METAR_VARS)]
+        for i in range(rows):
+            metar, hora, vento, vis, qnh = _metar_row(i)
+            lines.append(f'<{metar}>\t"{hora}"^^<{XSD}dateTime>\t{vento}\t{vis}\t{qnh}')
+        return ('\n'.join(lines) + '\n').encode('utf-8')
+    if result_format == 'csv':
+        lines = [','.join(METAR_VARS)]
+        for i in range(rows):
+            lines.append(','.join(str(value) for value in _metar_row(i)))
+        return ('\r\n'.join(lines) + '\r\n').encode('utf-8')
+    raise ValueError(f'Formato não suportado pelo mock: {result_format}')
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    server: 'ThreadingHTTPServer'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def mock(self) -> 'MockFuseki':
+        return self.server.mock
+
+    def _read_body(self) -> bytes:
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            parts = []
+            while True:
+                size = int(self.rfile.readline().split(b';')[0].strip(), 16)
+                if size == 0:
+                    self.rfile.readline()
+                    break
+                parts.append(self.rfile.read(size))
+                self.rfile.readline()
+            body = b''.join(parts)
+        else:
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+        if self.headers.get('Content-Encoding', '').lower() == 'gzip':
+            body = gzip.decompress(body)
+        return body
+
+    def _reply(self, status: int, body: bytes = b'', content_type: str = 'application/json'):
+        failure = self.mock._take_failure()
+        answered, retry_after = True, None
+        if failure is not None:
+            (status, answered, retry_after), body, content_type = failure, b'Service Unavailable', 'text/plain'
+        self.mock._record(self.command, self.path, status)
+        self.mock._enter()
+        try:
+            if self.mock.latency:
+                time.sleep(self.mock.latency)
+        finally:
+            self.mock._leave()
+        self.send_response(status)
+        if answered:
+            self.send_header('Fuseki-Request-Id', str(len(self.mock.requests)))
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith('/query') or url.path.endswith('/sparql'):
+            query = parse_qs(url.query).get('query', [''])[0]
+            if query.lstrip().upper().startswith('ASK') or '\nASK' in query.upper():
+                return self._reply(200, b'{"head": {}, "boolean": true}', 'application/sparql-results+json')
+            accept = self.headers.get('Accept', '')
+            result_format = 'tsv' if 'tab-separated' in accept else 'csv' if 'csv' in accept else 'json'
+            body = self.mock.select_body(result_format)
+            return self._reply(200, body, {'json': 'application/sparql-results+json',
+                                           'tsv': 'text/tab-separated-values',
+                                           'csv': 'text/csv'}[result_format])
+        if url.path in ('/', '/$/ping'):
+            return self._reply(200, b'', 'text/plain')
+        return self._reply(404, b'Not found', 'text/plain')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self._read_body()
+        if url.path == '/$/validate/query':
+            query = parse_qs(body.decode('utf-8')).get('query', [''])[0]
+            plan = {'input': query, 'formatted': query, 'algebra': '(bgp)', 'algebra-quads': '(quadpattern)',
+                    'algebra-opt': '(bgp)', 'algebra-opt-quads': '(quadpattern)'}
+            return self._reply(200, json.dumps(plan).encode())
+        if url.path.endswith('/update'):
+            self.mock.updates += 1
+            if self.headers.get('Content-Type', '').startswith('application/sparql-update'):
+                self.mock.update_bodies.append(body.decode('utf-8'))
+            else:
+                self.mock.update_bodies.append(parse_qs(body.decode('utf-8')).get('update', [''])[0])
+            return self._reply(204)
+        if url.path.endswith('/data'):
+            # Contagem aproximada: uma tripla por linha terminada em " ." ou " ;" (exceto @prefix)
+            triples = body.count(b' .\n') + body.count(b' ;\n') + body.count(b' ,') - body.count(b'@prefix')
+            self.mock.bytes_received += len(body)
+            self.mock.upload_types.append(self.headers.get('Content-Type', ''))
+            self.mock.triples_received += triples
+            return self._reply(200, json.dumps({'count': triples, 'tripleCount': triples, 'quadCount': 0}).encode())
+        return self._reply(404, b'Not found', 'text/plain')
+
+    def do_PUT(self):
+        self.do_POST()
+
+    def do_DELETE(self):
+        self._reply(204)
+
+
+class MockFuseki:
+    """
+    Servidor HTTP em processo que imita os endpoints SPARQL/GSP do Fuseki, para benchmarks
+
+    As respostas de SELECT são geradas uma vez por (tamanho, formato) e repetidas a cada
+    requisição; uploads são consumidos e contados, sem armazenar os dados.
+    """
+
+    def __init__(self, dataset: str = 'airdata', rows: int = 100, latency: float = 0.0,
+                 host: str = '127.0.0.1', port: int = 0):
+        """
+        Inicializa o mock (use start() ou "with" para colocá-lo no ar).
+
+        Args:
+            dataset: Nome do dataset nas URLs
+            rows: Número de linhas devolvidas por SELECT
+            latency: Atraso artificial por requisição em segundos
+            host: Endereço de escuta
+            port: Porta de escuta (0 escolhe uma porta livre)
+        """
+        self.dataset = dataset
+        self.rows = rows
+        self.latency = latency
+        self.requests: List[Tuple[str, str, int]] = []
+        self.updates = 0
+        self.update_bodies: List[str] = []
+        self.bytes_received = 0
+        self.triples_received = 0
+        self.upload_types: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._failures: List[Tuple[int, bool, Optional[int]]] = []
+        self._bodies: Dict[Tuple[int, str], bytes] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def select_body(self, result_format: str) -> bytes:
+        key = (self.rows, result_format)
+        with self._lock:
+            if key not in self._bodies:
+                self._bodies[key] = canned_select(self.rows, result_format)
+            return self._bodies[key]
+
+    def fail_next(self, count: int, status: int = 503, answered: bool = False, retry_after: Optional[int] = None):
+        """
+        Faz as próximas count requisições responderem com o status de erro informado.
+
+        Args:
+            count: Número de requisições
+            status: Status HTTP do erro
+            answered: Se True o erro vem do próprio Fuseki (com Fuseki-Request-Id, como o 503 de
+                timeout da query); se False imita um proxy ou um servidor sobrecarregado
+            retry_after: Valor do cabeçalho Retry-After em segundos (None não envia)
+        """
+        with self._lock:
+            self._failures.extend([(status, answered, retry_after)] * count)
+
+    def _take_failure(self) -> Optional[Tuple[int, bool, Optional[int]]]:
+        with self._lock:
+            return self._failures.pop(0) if self._failures else None
+
+    def _record(self, method: str, path: str, status: int):
+        with self._lock:
+            self.requests.append((method, path, status))
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self) -> 'MockFuseki':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
@@ -0,0 +1,128 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+# Strings SPARQL (mantidas intactas) ou sequências de espaços (colapsadas)
+_NORMALIZE_RE = re.compile(r'"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\''
+                           r'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|\s+')
+
+
+def normalize_query(query: str) -> str:
+    """Colapsa espaços em branco fora de literais, para que variações de indentação gerem a mesma chave."""
+    return _NORMALIZE_RE.sub(lambda m: ' ' if m.group()[0].isspace() else m.group(), query).strip()
+
+
+def _copy(value: Any) -> Any:
+    """Copia os dicts e listas aninhados de um resultado (ex.: results e cada binding); o resto é imutável."""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    return value
+
+
+class QueryCache:
+    """
+    Cache LRU, com TTL por entrada, para resultados de queries SPARQL
+
+    Um mesmo objeto pode ser passado para SparqlQuery e TurtleLoader: qualquer escrita feita
+    por eles (update, load_from_*, clear_dataset) invalida as entradas do dataset afetado.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: Optional[float] = 300.0):
+        """
+        Inicializa o cache.
+
+        Args:
+            max_entries: Número máximo de resultados guardados (os menos usados são descartados)
+            ttl: Tempo de vida padrão de cada entrada em segundos (None = sem expiração)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(dataset: str, operation: str, query: str) -> Tuple[str, str, str]:
+        """
+        Monta a chave de uma query.
+
+        Args:
+            dataset: Identificador do dataset (URL do Fuseki + nome do dataset)
+            operation: Operação/formato da consulta (select, ask, construct...)
+            query: Texto da query
+
+        Returns:
+            tupla (dataset, operação, query normalizada)
+        """
+        return dataset, operation, normalize_query(query)
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """
+        Retorna uma cópia do resultado guardado, ou None se ausente/expirado.
+
+        A cópia inclui a lista de resultados e cada binding: o chamador pode ordenar, filtrar ou
+        editar o que recebeu sem alterar o que os próximos acertos vão ler.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if expires is None or expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return _copy(value)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Dict[str, Any], ttl: Optional[float] = None):
+        """
+        Guarda um resultado.
+
+        Args:
+            key: Chave gerada por make_key
+            value: dict de resultado (uma cópia é guardada)
+            ttl: Tempo de vida desta entrada (se None usa o padrão do cache)
+        """
+        value = _copy(value)
+        ttl = self.ttl if ttl is None else ttl
+        expires = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, dataset: Optional[str] = None):
+        """
+        Remove entradas do cache.
+
+        Args:
+            dataset: Remove apenas as entradas deste dataset (se None, limpa tudo)
+        """
+        with self._lock:
+            if dataset is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == dataset]:
+                del self._entries[key]
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de acertos, falhas e descartes do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0
+            }
@@ -0,0 +1,213 @@
+import re
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+# Strings, IRIs e comentários são mascarados antes das regras, para que o conteúdo deles não
+# seja confundido com a estrutura da query
+_MASK_RE = re.compile(r'"""(?:[^"\\]|\\.|"(?!""))*"""|\'\'\'(?:[^\'\\]|\\.|\'(?!\'\'))*\'\'\''
+                      r'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^<>\s]*>|#[^\n]*')
+_DECIMAL_RE = re.compile(r'(?<![\w?$])[+-]?\d*\.\d+')
+_VAR_RE = re.compile(r'[?$](\w+)')
+_STR_VAR_RE = re.compile(r'\bSTR\s*\(\s*[?$](\w+)\s*\)', re.IGNORECASE)
+_CALL_RE = re.compile(r'\b(FILTER|BIND)\s*\(', re.IGNORECASE)
+_VALUES_RE = re.compile(r'\bVALUES\s*(?:\([^)]*\)|[?$]\w+)', re.IGNORECASE)
+_GRAPH_RE = re.compile(r'\b(?:GRAPH|SERVICE(?:\s+SILENT)?)\s+(?:[?$]\w+|<_*>|[\w-]*:[\w.-]*)', re.IGNORECASE)
+_ALL_VARS_PATTERN_RE = re.compile(r'(?:^|[{.])\s*[?$]\w+\s+[?$]\w+\s+[?$]\w+\s*(?=[.}]|$)')
+_LIMIT_RE = re.compile(r'\bLIMIT\s+\d+', re.IGNORECASE)
+_SELECT_RE = re.compile(r'\bSELECT\b', re.IGNORECASE)
+
+SEVERITIES = ('error', 'warning', 'info')
+
+
+def _mask(query: str) -> str:
+    """Troca o conteúdo de strings, IRIs e comentários por "_", mantendo as posições do texto."""
+    def replace(match):
+        text = match.group()
+        if text[0] == '#':
+            return ' ' * len(text)
+        return text[0] + '_' * (len(text) - 2) + text[-1]
+    return _MASK_RE.sub(replace, query)
+
+
+def _blank(match: re.Match) -> str:
+    return ' ' * len(match.group())
+
+
+def _closing(text: str, start: int) -> int:
+    """Posição logo após o parêntese/chave que fecha o aberto em text[start]."""
+    opening = text[start]
+    closing = ')' if opening == '(' else '}'
+    depth = 0
+    for i in range(start, len(text)):
+        if text[i] == opening:
+            depth += 1
+        elif text[i] == closing:
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(text)
+
+
+def _calls(text: str) -> List[Dict[str, Any]]:
+    """Expressões de FILTER(...) e BIND(...) com as posições no texto mascarado."""
+    calls = []
+    for match in _CALL_RE.finditer(text):
+        end = _closing(text, match.end() - 1)
+        calls.append({"keyword": match.group(1).upper(), "start": match.start(), "end": end,
+                      "expression": text[match.end():end - 1]})
+    return calls
+
+
+def _groups(text: str) -> List[Tuple[str, int, int]]:
+    """
+    Grupos {...} do texto: (conteúdo sem os grupos aninhados, que viram grupos próprios,
+    posição inicial, posição final).
+    """
+    groups = []
+    stack: List[Tuple[int, List[str]]] = []
+    for i, char in enumerate(text):
+        if char == '{':
+            stack.append((i, []))
+        elif char == '}':
+            if stack:
+                start, chars = stack.pop()
+                groups.append((''.join(chars), start, i + 1))
+        elif stack:
+            stack[-1][1].append(char)
+    return groups
+
+
+def _components(group: str) -> List[Set[str]]:
+    """Conjuntos de variáveis ligadas entre si pelos padrões de tripla de um grupo."""
+    components: List[Set[str]] = []
+    for statement in _DECIMAL_RE.sub('0', group).split('.'):
+        variables = set(_VAR_RE.findall(statement))
+        if not variables:
+            continue
+        joined = [component for component in components if component & variables]
+        for component in joined:
+            components.remove(component)
+            variables |= component
+        components.append(variables)
+    return components
+
+
+def lint_query(query: str) -> List[Dict[str, str]]:
+    """
+    Procura no texto da query padrões que costumam deixar consultas lentas no Fuseki.
+
+    Regras:
+        string-join: FILTER que compara STR()/SUBSTR() de variáveis diferentes (junção por
+            string, avaliada sobre o produto cartesiano)
+        filter-str: FILTER sobre STR(?x), avaliado linha a linha, sem uso de índice
+        bind-str: BIND sobre STR(?x), calculado em cada linha
+        cross-product: padrões de um mesmo grupo sem variáveis em comum
+        unbounded-scan: padrão ?s ?p ?o sem LIMIT, que percorre o dataset inteiro
+
+    Args:
+        query: Texto da query SPARQL
+
+    Returns:
+        Lista de {"rule", "severity" (error/warning/info), "message", "snippet"}, das mais
+        graves para as mais leves
+    """
+    masked = _mask(query)
+    issues = []
+
+    for call in _calls(masked):
+        snippet = ' '.join(query[call['start']:call['end']].split())
+        str_vars = sorted(set(_STR_VAR_RE.findall(call['expression'])))
+        if call['keyword'] == 'FILTER' and len(str_vars) > 1 and '=' in call['expression']:
+            issues.append({
+                "rule": 'string-join',
+                "severity": 'error',
+                "message": f"Junção por comparação de strings entre {', '.join('?' + var for var in str_vars)}: "
+                           f"o Fuseki monta o produto cartesiano antes de filtrar. Junte por um termo "
+                           f"comum ou faça a junção no cliente (ex.: FlightWeather)",
+                "snippet": snippet
+            })
+        elif call['keyword'] == 'FILTER' and str_vars:
+            issues.append({
+                "rule": 'filter-str',
+                "severity": 'warning',
+                "message": f"FILTER sobre STR(?{str_vars[0]}) é avaliado linha a linha, sem índice. "
+                           f"Compare valores tipados (ex.: intervalo de xsd:dateTime) ou use os "
+                           f"triplos derivados de DateTimeEnricher",
+                "snippet": snippet
+            })
+        elif call['keyword'] == 'BIND' and str_vars:
+            issues.append({
+                "rule": 'bind-str',
+                "severity": 'info',
+                "message": f"BIND sobre STR(?{str_vars[0]}) é calculado em cada linha; para agrupar por "
+                           f"data ou hora use :DateTime-date / :DateTime-hourBucket (DateTimeEnricher)",
+                "snippet": snippet
+            })
+
+    # Padrões de tripla: sem FILTER/BIND, VALUES e GRAPH/SERVICE, que não ligam variáveis entre
+    # padrões (apagados com espaços, para manter as posições)
+    patterns = masked
+    for call in _calls(masked):
+        patterns = patterns[:call['start']] + ' ' * (call['end'] - call['start']) + patterns[call['end']:]
+    patterns = _GRAPH_RE.sub(_blank, _VALUES_RE.sub(_blank, patterns))
+    for group, start, end in _groups(patterns):
+        if _SELECT_RE.search(group):
+            # Subquery: o grupo externo só vê as variáveis projetadas
+            continue
+        components = _components(group)
+        if len(components) > 1:
+            parts = ' × '.join('{' + ' '.join('?' + var for var in sorted(component)) + '}'
+                               for component in components)
+            issues.append({
+                "rule": 'cross-product',
+                "severity": 'warning',
+                "message": f"Padrões sem variáveis em comum formam um produto cartesiano: {parts}",
+                "snippet": ' '.join(query[start:end].split())[:200]
+            })
+
+    scan = _ALL_VARS_PATTERN_RE.search(patterns)
+    if scan and not _LIMIT_RE.search(masked):
+        issues.append({
+            "rule": 'unbounded-scan',
+            "severity": 'warning',
+            "message": "Padrão ?s ?p ?o sem LIMIT percorre o dataset inteiro; use LIMIT, "
+                       "iter_all_triples ou get_all_triples_pages",
+            "snippet": ' '.join(query[scan.start():scan.end()].split()).strip(' {.')
+        })
+
+    issues.sort(key=lambda issue: SEVERITIES.index(issue['severity']))
+    return issues
+
+
+def format_profile(profile: Dict[str, Any]) -> str:
+    """
+    Monta um relatório em texto do resultado de SparqlQuery.profile.
+
+    Args:
+        profile: dict devolvido por profile()
+
+    Returns:
+        Relatório com as fases, o gargalo, os alertas e o plano otimizado
+    """
+    if not profile.get('success'):
+        return f"Falha no profile: {profile.get('message')}"
+    lines = [f"Query: {profile.get('query_name') or '(sem nome)'}  "
+             f"formato={profile['format']}  linhas={profile['rows']}  bytes={profile['bytes']}"]
+    for phase, seconds in profile['phases'].items():
+        lines.append(f"  {phase:<10} {seconds * 1000:10.1f} ms")
+    if profile.get('network_rtt_seconds') is not None:
+        lines.append(f"  rede (RTT) {profile['network_rtt_seconds'] * 1000:10.1f} ms  "
+                     f"servidor ~{profile['server_seconds'] * 1000:.1f} ms")
+    lines.append(f"Gargalo: {profile['bottleneck']}")
+    if profile.get('request_id'):
+        lines.append(f"Fuseki-Request-Id: {profile['request_id']}")
+    for issue in profile['lint']:
+        lines.append(f"[{issue['severity']}] {issue['rule']}: {issue['message']}")
+        lines.append(f"    {issue['snippet']}")
+    plan: Optional[Dict[str, Any]] = profile.get('plan')
+    if plan and plan.get('success') and plan.get('algebra_opt'):
+        lines.append('Plano otimizado:')
+        lines.extend('  ' + line for line in plan['algebra_opt'].rstrip().splitlines())
+    elif plan and not plan.get('success'):
+        lines.append(f"Plano indisponível: {plan.get('message')}")
+    return '\n'.join(lines)
@@ -0,0 +1,238 @@
+import re
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import quote_plus
+
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+AIRDATA = 'http://airdata.org/ontology#'
+
+_PLACEHOLDER_RE = re.compile(r'%\{(\w+)\}')
+_PROLOGUE_RE = re.compile(r'^(?:\s*(?:PREFIX\s+[^\s:]*:\s*<[^>]*>|BASE\s*<[^>]*>))*', re.IGNORECASE)
+_INVALID_IRI_RE = re.compile(r'[\x00-\x20<>"{}|^`\\]')
+_LANG_RE = re.compile(r'^[a-zA-Z]+(-[a-zA-Z0-9]+)*$')
+_VAR_RE = re.compile(r'^\w+$')
+_STRING_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+
+class IRI:
+    """IRI a ser inserido em uma query, validado para não permitir injeção de SPARQL"""
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: str):
+        if _INVALID_IRI_RE.search(value):
+            raise ValueError(f'IRI inválido: {value!r}')
+        self.value = value
+
+    def __repr__(self):
+        return f'IRI({self.value!r})'
+
+    def n3(self) -> str:
+        return f'<{self.value}>'
+
+
+class Literal:
+    """Literal RDF com datatype ou tag de idioma opcionais"""
+
+    __slots__ = ('value', 'datatype', 'lang')
+
+    def __init__(self, value: Any, datatype: Union[str, IRI, None] = None, lang: Optional[str] = None):
+        if lang is not None and not _LANG_RE.match(lang):
+            raise ValueError(f'Tag de idioma inválida: {lang!r}')
+        self.value = str(value)
+        self.datatype = datatype if isinstance(datatype, IRI) or datatype is None else IRI(datatype)
+        self.lang = lang
+
+    def __repr__(self):
+        return f'Literal({self.value!r}, datatype={self.datatype!r}, lang={self.lang!r})'
+
+    def n3(self) -> str:
+        text = '"' + self.value.translate(_STRING_ESCAPES) + '"'
+        if self.lang:
+            return f'{text}@{self.lang}'
+        if self.datatype is not None:
+            return f'{text}^^{self.datatype.n3()}'
+        return text
+
+
+class Values:
+    """
+    Bloco VALUES para ligar várias soluções em uma única query (batch).
+
+    Ex.: Values('aerodromo', [aerodrome('SBGR'), aerodrome('SBSP')]) gera
+    VALUES ?aerodromo { <...#Aerodrome_SBGR> <...#Aerodrome_SBSP> }
+    """
+
+    __slots__ = ('variables', 'rows')
+
+    def __init__(self, variables: Union[str, Sequence[str]], rows: Iterable[Any]):
+        self.variables = [variables] if isinstance(variables, str) else list(variables)
+        for var in self.variables:
+            if not _VAR_RE.match(var):
+                raise ValueError(f'Nome de variável inválido: {var!r}')
+        self.rows = list(rows)
+
+    def n3(self) -> str:
+        if len(self.variables) == 1:
+            terms = ' '.join(render_term(row) for row in self.rows)
+            return f'VALUES ?{self.variables[0]} {{ {terms} }}'
+        header = ' '.join(f'?{var}' for var in self.variables)
+        rows = ' '.join('(' + ' '.join(render_term(value) for value in row) + ')' for row in self.rows)
+        return f'VALUES ({header}) {{ {rows} }}'
+
+
+def split_prologue(query: str) -> Tuple[str, str]:
+    """Separa o prólogo (declarações PREFIX/BASE) do restante da query."""
+    end = _PROLOGUE_RE.match(query).end()
+    return query[:end], query[end:]
+
+
+def aerodrome(codigo_icao: str) -> IRI:
+    """IRI do aeródromo de código ICAO informado na ontologia airdata."""
+    return IRI(f'{AIRDATA}Aerodrome_{codigo_icao}')
+
+
+def render_term(value: Any) -> str:
+    """
+    Converte um valor Python em um termo SPARQL seguro.
+
+    str vira literal simples, int/float/Decimal/bool/datetime/date viram literais tipados,
+    None vira UNDEF (dentro de VALUES) e listas viram termos separados por espaço.
+    """
+    if hasattr(value, 'n3'):
+        return value.n3()
+    if value is None:
+        return 'UNDEF'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value != value:
+            lexical = 'NaN'
+        elif value in (float('inf'), float('-inf')):
+            lexical = 'INF' if value > 0 else '-INF'
+        else:
+            lexical = repr(value)
+        return Literal(lexical, XSD + 'double').n3()
+    if isinstance(value, Decimal):
+        return Literal(str(value), XSD + 'decimal').n3()
+    if isinstance(value, datetime):
+        return Literal(value.isoformat(), XSD + 'dateTime').n3()
+    if isinstance(value, date):
+        return Literal(value.isoformat(), XSD + 'date').n3()
+    if isinstance(value, str):
+        return Literal(value).n3()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return ' '.join(render_term(item) for item in value)
+    raise TypeError(f'Tipo de parâmetro não suportado: {type(value).__name__}')
+
+
+class BoundQuery(str):
+    """
+    Texto final de uma query gerada por QueryTemplate.
+
+    É uma str comum (pode ser usada em qualquer método de SparqlQuery), mas carrega também
+    a query já codificada para URL (url_encoded) e para o corpo de um POST (body), além do
+    nome do template (name), usado para identificar a query nas métricas.
+    """
+
+    def __new__(cls, text: str, url_encoded: str, body: bytes, name: Optional[str] = None):
+        obj = super().__new__(cls, text)
+        obj.url_encoded = url_encoded
+        obj.body = body
+        obj.name = name
+        return obj
+
+
+class QueryTemplate:
+    """
+    Query SPARQL parametrizada, analisada e codificada uma única vez.
+
+    Os parâmetros são escritos como %{nome} no texto da query. Cada valor é convertido por
+    render_term, de modo que strings nunca são interpretadas como SPARQL.
+    """
+
+    def __init__(self, template: str, name: Optional[str] = None):
+        """
+        Analisa o template.
+
+        Args:
+            template: Texto da query com parâmetros no formato %{nome}
+            name: Nome da query, repassado às BoundQuery geradas (aparece nas métricas)
+        """
+        self.template = template
+        self.name = name
+        self.prologue, self.body = split_prologue(template)
+        prologue_end = len(self.prologue)
+
+        # Trechos fixos e nomes dos parâmetros, intercalados
+        self._segments: List[str] = []
+        self.params: List[str] = []
+        position = prologue_end
+        for match in _PLACEHOLDER_RE.finditer(template, prologue_end):
+            self._segments.append(template[position:match.start()])
+            self.params.append(match.group(1))
+            position = match.end()
+        self._segments.append(template[position:])
+        self._segments[0] = self.prologue + self._segments[0]
+
+        # Codificações pré-calculadas dos trechos fixos (inclui o bloco de PREFIX)
+        self._url_segments = [quote_plus(segment) for segment in self._segments]
+        self._body_segments = [segment.encode('utf-8') for segment in self._segments]
+
+    def bind(self, **params: Any) -> BoundQuery:
+        """
+        Liga os parâmetros e gera a query final.
+
+        Args:
+            **params: Valor de cada parâmetro %{nome} do template
+
+        Returns:
+            BoundQuery com o texto e as versões já codificadas da query
+        """
+        missing = [name for name in self.params if name not in params]
+        if missing:
+            raise ValueError(f'Parâmetros sem valor: {", ".join(sorted(set(missing)))}')
+
+        rendered: Dict[str, str] = {}
+        text = [self._segments[0]]
+        url = [self._url_segments[0]]
+        body = [self._body_segments[0]]
+        for i, name in enumerate(self.params, start=1):
+            term = rendered.get(name)
+            if term is None:
+                term = rendered[name] = render_term(params[name])
+            text.append(term)
+            text.append(self._segments[i])
+            url.append(quote_plus(term))
+            url.append(self._url_segments[i])
+            body.append(term.encode('utf-8'))
+            body.append(self._body_segments[i])
+        return BoundQuery(''.join(text), ''.join(url), b''.join(body), self.name)
+
+    def bind_batches(self, param: str, variables: Union[str, Sequence[str]], rows: Iterable[Any],
+                     batch_size: int = 200, **params: Any) -> Iterator[BoundQuery]:
+        """
+        Gera uma query por lote de valores, ligando cada lote como um bloco VALUES.
+
+        Args:
+            param: Nome do parâmetro do template que recebe o bloco VALUES
+            variables: Variável (ou variáveis) do bloco VALUES
+            rows: Valores (ou tuplas de valores) a serem distribuídos nos lotes
+            batch_size: Número máximo de linhas do VALUES por query
+            **params: Demais parâmetros do template
+
+        Returns:
+            Iterador de BoundQuery, uma por lote
+        """
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                yield self.bind(**params, **{param: Values(variables, batch)})
+                batch = []
+        if batch:
+            yield self.bind(**params, **{param: Values(variables, batch)})
@@ -0,0 +1,677 @@
+import gzip
+import io
+import os
+import re
+from collections import deque
+from multiprocessing import Pool
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+
+
+# Formato -> Content-Type aceito pelo Fuseki
+RDF_FORMATS = {
+    'ttl': 'text/turtle; charset=utf-8',
+    'nt': 'application/n-triples',
+    'nq': 'application/n-quads',
+    'trig': 'application/trig',
+    'jsonld': 'application/ld+json',
+    'rdf': 'application/rdf+xml',
+}
+
+EXTENSIONS = {
+    '.ttl': 'ttl', '.turtle': 'ttl',
+    '.nt': 'nt', '.ntriples': 'nt',
+    '.nq': 'nq', '.nquads': 'nq',
+    '.trig': 'trig',
+    '.jsonld': 'jsonld',
+    '.rdf': 'rdf', '.owl': 'rdf',
+}
+
+# Formatos de uma tripla/quad por linha, que podem ser divididos em qualquer fim de linha
+LINE_FORMATS = ('nt', 'nq')
+
+_SNIFF_BYTES = 8192
+_NT_TERM = r'(?:<[^<>\s]*>|_:\S+)'
+_NT_OBJECT = r'(?:<[^<>\s]*>|_:\S+|"(?:[^"\\]|\\.)*"(?:@[\w-]+|\^\^<[^<>\s]*>)?)'
+_NT_LINE_RE = re.compile(rf'^{_NT_TERM}\s+<[^<>\s]*>\s+{_NT_OBJECT}\s*\.$')
+_NQ_LINE_RE = re.compile(rf'^{_NT_TERM}\s+<[^<>\s]*>\s+{_NT_OBJECT}\s+{_NT_TERM}\s*\.$')
+_TRIG_GRAPH_RE = re.compile(r'^\s*(?:GRAPH\b|(?:<[^<>\s]*>|[\w-]*:[\w.-]*)\s*\{)', re.IGNORECASE | re.MULTILINE)
+
+
+def format_from_name(file_path: str) -> Optional[str]:
+    """Retorna o formato RDF pela extensão do arquivo (ignorando .gz), ou None se desconhecida."""
+    name = file_path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    return EXTENSIONS.get(os.path.splitext(name)[1])
+
+
+def sniff_format(sample: bytes) -> Optional[str]:
+    """
+    Tenta reconhecer o formato RDF pelo início do conteúdo.
+
+    Args:
+        sample: Primeiros bytes do conteúdo (já descomprimidos)
+
+    Returns:
+        'ttl', 'nt', 'nq', 'trig', 'jsonld', 'rdf' ou None se não parecer RDF
+    """
+    text = sample.decode('utf-8', errors='replace').lstrip('\ufeff')
+    stripped = text.lstrip()
+    if stripped.startswith(('{', '[')):
+        return 'jsonld' if '"@' in stripped else None
+    if stripped.startswith('<?xml') or stripped.startswith('<rdf:RDF'):
+        return 'rdf' if 'rdf:RDF' in text or '22-rdf-syntax-ns' in text else None
+
+    # Linhas completas e significativas (a última pode ter sido cortada pela amostra)
+    lines = [line.strip() for line in text.splitlines()[:-1] or text.splitlines()]
+    lines = [line for line in lines if line and not line.startswith('#')]
+    if not lines:
+        return None
+    first = lines[0]
+    if re.match(r'(@prefix|@base|prefix\s|base\s)', first, re.IGNORECASE):
+        return 'trig' if _TRIG_GRAPH_RE.search(text) else 'ttl'
+    if all(_NT_LINE_RE.match(line) for line in lines):
+        return 'nt'
+    if all(_NT_LINE_RE.match(line) or _NQ_LINE_RE.match(line) for line in lines):
+        return 'nq'
+    if re.match(r'(<[^<>\s]*>|_:\S+|\[)', first):
+        return 'trig' if _TRIG_GRAPH_RE.search(text) else 'ttl'
+    return None
+
+
+def open_rdf(file_path: str) -> BinaryIO:
+    """Abre um arquivo RDF em modo binário, descomprimindo-o se terminar em .gz."""
+    return gzip.open(file_path, 'rb') if file_path.endswith('.gz') else open(file_path, 'rb')
+
+
+def detect_format(file_path: str) -> Optional[str]:
+    """
+    Detecta o formato RDF de um arquivo, pela extensão ou, se ela for desconhecida, pelo conteúdo.
+
+    Args:
+        file_path: Caminho do arquivo (.gz é aceito em qualquer formato)
+
+    Returns:
+        Nome do formato (chave de RDF_FORMATS) ou None se o arquivo não for RDF
+    """
+    fmt = format_from_name(file_path)
+    if fmt is not None:
+        return fmt
+    try:
+        with open(file_path, 'rb') as file:
+            sample = file.read(_SNIFF_BYTES)
+        if sample[:2] == b'\x1f\x8b':
+            with gzip.open(file_path, 'rb') as file:
+                sample = file.read(_SNIFF_BYTES)
+        return sniff_format(sample)
+    except (OSError, EOFError):
+        return None
+
+
+def content_type(fmt: str) -> str:
+    """Retorna o Content-Type de um formato de RDF_FORMATS."""
+    try:
+        return RDF_FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f'Formato RDF desconhecido: {fmt} (use {", ".join(RDF_FORMATS)})') from None
+
+
+# Strings, IRIs, comentários, parênteses/colchetes e rótulos de blank node fora de strings
+_TURTLE_TOKEN_RE = re.compile(rb'"""|\'\'\'|"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'|<[^>\s]*>|#|_:|[\[\]()]')
+_DIRECTIVE_RE = re.compile(rb'^\s*(@prefix|@base|prefix|base)\s', re.IGNORECASE)
+
+
+def _find_long_string_end(line: bytes, pos: int, quote: bytes) -> int:
+    """Retorna a posição das aspas triplas que fecham uma string longa (não escapadas), ou -1."""
+    while True:
+        end = line.find(quote, pos)
+        if end < 0:
+            return -1
+        backslashes = 0
+        while end - backslashes > 0 and line[end - backslashes - 1] == 0x5C:
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return end
+        pos = end + 1
+
+
+def _scan_turtle_line(line: bytes, long_quote: Optional[bytes], depth: int):
+    """
+    Analisa uma linha Turtle a partir do estado da linha anterior.
+
+    Returns:
+        (string longa aberta, profundidade de []/(), se a linha encerra uma sentença,
+         se a linha usa rótulo de blank node)
+    """
+    pos = 0
+    code_end = len(line)
+    has_bnode = False
+    while True:
+        if long_quote:
+            end = _find_long_string_end(line, pos, long_quote)
+            if end < 0:
+                return long_quote, depth, False, has_bnode
+            pos = end + 3
+            long_quote = None
+        match = _TURTLE_TOKEN_RE.search(line, pos)
+        if not match:
+            break
+        token = match.group()
+        if token == b'"""' or token == b"'''":
+            long_quote = token
+        elif token == b'#':
+            code_end = match.start()
+            break
+        elif token == b'_:':
+            has_bnode = True
+        elif token == b'[' or token == b'(':
+            depth += 1
+        elif token == b']' or token == b')':
+            depth -= 1
+        pos = match.end()
+    ends = depth == 0 and line[:code_end].rstrip().endswith(b'.')
+    return None, depth, ends, has_bnode
+
+
+def split_turtle_file(file_path: str, chunk_bytes: int) -> Iterator[bytes]:
+    """
+    Divide um arquivo Turtle em pedaços autocontidos de aproximadamente chunk_bytes.
+
+    Os cortes acontecem apenas no fim de uma sentença (fora de strings longas e de []/()), e os
+    @prefix/@base lidos até o momento são repetidos no início de cada pedaço. A partir do primeiro
+    rótulo de blank node (_:x) o arquivo deixa de ser dividido, para que todas as ocorrências do
+    rótulo sejam enviadas na mesma requisição (o Fuseki trata rótulos de requisições diferentes
+    como nós diferentes).
+
+    Args:
+        file_path: Caminho do arquivo Turtle (.gz é descomprimido)
+        chunk_bytes: Tamanho aproximado de cada pedaço em bytes
+
+    Returns:
+        Iterador de pedaços (bytes) prontos para envio
+    """
+    directives = []
+    current = []
+    size = 0
+    long_quote = None
+    depth = 0
+    splittable = True
+    at_statement_start = True
+    with open_rdf(file_path) as file:
+        for line in file:
+            if at_statement_start and not long_quote and _DIRECTIVE_RE.match(line):
+                directives.append(line if line.endswith(b'\n') else line + b'\n')
+                continue
+            current.append(line)
+            size += len(line)
+            long_quote, depth, ends, has_bnode = _scan_turtle_line(line, long_quote, depth)
+            splittable = splittable and not has_bnode
+            if line.strip() and not line.lstrip().startswith(b'#'):
+                at_statement_start = ends
+            if ends and splittable and size >= chunk_bytes:
+                yield b''.join(directives + current)
+                current = []
+                size = 0
+    if current:
+        yield b''.join(directives + current)
+
+
+def split_lines_file(file_path: str, chunk_bytes: int) -> Iterator[bytes]:
+    """
+    Divide um arquivo N-Triples/N-Quads em pedaços de aproximadamente chunk_bytes.
+
+    Os cortes acontecem em fins de linha. Como em split_turtle_file, o arquivo deixa de ser
+    dividido a partir da primeira linha com rótulo de blank node (_:x).
+
+    Args:
+        file_path: Caminho do arquivo (.gz é descomprimido)
+        chunk_bytes: Tamanho aproximado de cada pedaço em bytes
+
+    Returns:
+        Iterador de pedaços (bytes) prontos para envio
+    """
+    current = []
+    size = 0
+    splittable = True
+    with open_rdf(file_path) as file:
+        for line in file:
+            current.append(line)
+            size += len(line)
+            splittable = splittable and b'_:' not in line
+            if splittable and size >= chunk_bytes:
+                yield b''.join(current)
+                current = []
+                size = 0
+    if current:
+        yield b''.join(current)
+
+
+def iter_line_blocks(lines: Iterable[bytes], batch_bytes: int = 65536) -> Iterator[bytes]:
+    """
+    Agrupa linhas N-Triples/N-Quads em blocos de aproximadamente batch_bytes.
+
+    Diferente de split_lines_file, os blocos fazem parte de uma mesma requisição, então podem
+    ser cortados em qualquer fim de linha, mesmo com blank nodes.
+
+    Args:
+        lines: Linhas (ex.: um arquivo aberto em modo binário)
+        batch_bytes: Tamanho aproximado de cada bloco
+
+    Returns:
+        Iterador de blocos (bytes) formados por linhas completas
+    """
+    current = []
+    size = 0
+    for line in lines:
+        current.append(line)
+        size += len(line)
+        if size >= batch_bytes:
+            yield b''.join(current)
+            current = []
+            size = 0
+    if current:
+        yield b''.join(current)
+
+
+_XSD = 'http://www.w3.org/2001/XMLSchema#'
+_RDF = 'http://www.w3.org/1999/02/22-rdf-syntax-ns#'
+_LOCAL_ESCAPE = r"\\[_~.\-!$&'()*+,;=/?#@%]"
+_PN_PREFIX = r'(?:[^\W\d_](?:[\w.-]*[\w-])?)?'
+_PN_LOCAL = rf"(?:(?:[\w:%-]|{_LOCAL_ESCAPE})(?:(?:[\w.:%-]|{_LOCAL_ESCAPE})*(?:[\w:%-]|{_LOCAL_ESCAPE}))?)?"
+_TOKEN_RE = re.compile(rf'''
+    (?P<ws>(?:\s+|\#[^\n]*)+)
+  | (?P<iri><(?:[^<>"{{}}|^`\\\x00-\x20]|\\u[0-9A-Fa-f]{{4}}|\\U[0-9A-Fa-f]{{8}})*>)
+  | (?P<string>"""(?:(?:"|"")?(?:[^"\\]|\\.))*"""|\'\'\'(?:(?:\'|\'\')?(?:[^\'\\]|\\.))*\'\'\'
+               |"(?:[^"\\\n\r]|\\.)*"|\'(?:[^\'\\\n\r]|\\.)*\')
+  | (?P<datatype>\^\^)
+  | (?P<lang>@[a-zA-Z]+(?:-[a-zA-Z0-9]+)*)
+  | (?P<bnode>_:[\w](?:[\w.-]*[\w-])?)
+  | (?P<double>[+-]?(?:\d+\.\d*[eE][+-]?\d+|\.\d+[eE][+-]?\d+|\d+[eE][+-]?\d+))
+  | (?P<decimal>[+-]?\d*\.\d+)
+  | (?P<integer>[+-]?\d+)
+  | (?P<pname>{_PN_PREFIX}:{_PN_LOCAL})
+  | (?P<word>[A-Za-z]+)
+  | (?P<punct>[.;,\[\]()])
+  | (?P<error>.)
+''', re.VERBOSE | re.DOTALL)
+_ECHAR_RE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))', re.DOTALL)
+_SCHEME_RE = re.compile(r'[A-Za-z][\w+.-]*:')
+_LOCAL_UNESCAPE_RE = re.compile(r'\\(.)')
+_ECHARS = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+_NT_ESCAPES = str.maketrans({'\\': '\\\\', '"': '\\"', '\n': '\\n', '\r': '\\r'})
+
+
+def _unescape(text: str) -> str:
+    def replace(match):
+        code = match.group(1) or match.group(2)
+        if code:
+            return chr(int(code, 16))
+        if match.group(3) not in _ECHARS:
+            raise ValueError(f'Escape inválido: \\{match.group(3)}')
+        return _ECHARS[match.group(3)]
+    return _ECHAR_RE.sub(replace, text) if '\\' in text else text
+
+
+class TurtleToNTriples:
+    """
+    Conversor de Turtle para N-Triples em streaming, sentença por sentença
+
+    A memória usada é limitada ao tamanho da maior sentença Turtle. Blank nodes anônimos ([] e
+    coleções) recebem rótulos únicos no documento; rótulos explícitos (_:x) são mantidos e
+    sinalizados em bnode_labels, pois só identificam o mesmo nó dentro de uma mesma requisição.
+    """
+
+    def __init__(self, base: str = ''):
+        """
+        Inicializa o conversor.
+
+        Args:
+            base: IRI base para resolver IRIs relativos (substituído por @base/BASE do documento)
+        """
+        self.base = base
+        self.prefixes: Dict[str, str] = {}
+        self.triples = 0
+        self.bnode_labels = False
+        self._anon = 0
+        self._names: Dict[str, str] = {}
+        self._tokens: List[Tuple[str, str]] = []
+        self._pos = 0
+        self._out: List[str] = []
+
+    def convert_lines(self, lines: Iterable[bytes], batch_bytes: int = 65536) -> Iterator[bytes]:
+        """
+        Converte linhas Turtle (bytes em UTF-8) em N-Triples.
+
+        Args:
+            lines: Linhas do documento (ex.: um arquivo aberto em modo binário)
+            batch_bytes: Tamanho aproximado do trecho convertido de uma vez
+
+        Returns:
+            Iterador de blocos N-Triples (bytes), cada um com as triplas de sentenças completas
+        """
+        buffer = []
+        size = 0
+        long_quote = None
+        depth = 0
+        line_number = 0
+        start_line = 1
+        for line in lines:
+            line_number += 1
+            buffer.append(line)
+            size += len(line)
+            long_quote, depth, ends, _ = _scan_turtle_line(line, long_quote, depth)
+            if ends and size >= batch_bytes:
+                block = self.convert_text(b''.join(buffer).decode('utf-8'), start_line)
+                buffer = []
+                size = 0
+                start_line = line_number + 1
+                if block:
+                    yield block
+        if buffer:
+            block = self.convert_text(b''.join(buffer).decode('utf-8'), start_line)
+            if block:
+                yield block
+
+    def convert_text(self, text: str, line: int = 1) -> bytes:
+        """
+        Converte um trecho Turtle formado por sentenças completas.
+
+        Args:
+            text: Sentenças Turtle (diretivas e triplas)
+            line: Número da primeira linha do trecho, usado nas mensagens de erro
+
+        Returns:
+            Triplas em N-Triples (bytes em UTF-8)
+        """
+        self._tokens = self._tokenize(text, line)
+        self._pos = 0
+        self._out = []
+        while self._pos < len(self._tokens):
+            kind, value = self._tokens[self._pos]
+            if kind == 'lang' and value in ('@prefix', '@base'):
+                self._pos += 1
+                self._directive(value[1:])
+                self._expect('.')
+            elif kind == 'word' and value.lower() in ('prefix', 'base'):
+                self._pos += 1
+                self._directive(value.lower())
+            else:
+                self._triples()
+                self._expect('.')
+        return ''.join(self._out).encode('utf-8')
+
+    @staticmethod
+    def _tokenize(text: str, line: int) -> List[Tuple[str, str]]:
+        tokens = [(match.lastgroup, match) for match in _TOKEN_RE.finditer(text) if match.lastgroup != 'ws']
+        for kind, match in tokens:
+            if kind == 'error':
+                pos = match.start()
+                raise ValueError(f'Turtle inválido na linha {line + text.count(chr(10), 0, pos)}: '
+                                 f'{text[pos:pos + 40]!r}')
+        return [(kind, match.group()) for kind, match in tokens]
+
+    def _next(self) -> Tuple[str, str]:
+        if self._pos >= len(self._tokens):
+            raise ValueError('Sentença Turtle incompleta')
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _peek(self) -> Tuple[Optional[str], Optional[str]]:
+        return self._tokens[self._pos] if self._pos < len(self._tokens) else (None, None)
+
+    def _expect(self, punct: str):
+        kind, value = self._next()
+        if kind != 'punct' or value != punct:
+            raise ValueError(f'Esperado "{punct}" e encontrado {value!r}')
+
+    def _directive(self, name: str):
+        if name == 'prefix':
+            kind, value = self._next()
+            if kind != 'pname' or not value.endswith(':'):
+                raise ValueError(f'Nome de prefixo inválido: {value!r}')
+            kind, iri = self._next()
+            if kind != 'iri':
+                raise ValueError(f'IRI esperado no prefixo {value!r}')
+            self.prefixes[value[:-1]] = self._iri(iri)[1:-1]
+            self._names.clear()
+        else:
+            kind, iri = self._next()
+            if kind != 'iri':
+                raise ValueError('IRI esperado em @base')
+            self.base = self._iri(iri)[1:-1]
+
+    def _iri(self, token: str) -> str:
+        iri = _unescape(token[1:-1])
+        if self.base and not _SCHEME_RE.match(iri):
+            iri = urljoin(self.base, iri)
+        return f'<{iri}>'
+
+    def _pname(self, token: str) -> str:
+        iri = self._names.get(token)
+        if iri is None:
+            prefix, local = token.split(':', 1)
+            if prefix not in self.prefixes:
+                raise ValueError(f'Prefixo não declarado: {prefix}:')
+            if '\\' in local:
+                local = _LOCAL_UNESCAPE_RE.sub(r'\1', local)
+            iri = self._names[token] = f'<{self.prefixes[prefix]}{local}>'
+            if len(self._names) > 100000:
+                self._names.clear()
+        return iri
+
+    def _new_bnode(self) -> str:
+        self._anon += 1
+        return f'_:genid{self._anon}'
+
+    def _emit(self, subject: str, predicate: str, obj: str):
+        self._out.append(f'{subject} {predicate} {obj} .\n')
+        self.triples += 1
+
+    def _triples(self):
+        kind, value = self._peek()
+        if kind == 'punct' and value == '[':
+            subject = self._term()
+            kind, value = self._peek()
+            if kind == 'punct' and value == '.':
+                return
+        else:
+            subject = self._term()
+        self._predicate_objects(subject)
+
+    def _predicate_objects(self, subject: str):
+        while True:
+            kind, value = self._next()
+            if kind == 'word' and value == 'a':
+                predicate = f'<{_RDF}type>'
+            elif kind == 'iri':
+                predicate = self._iri(value)
+            elif kind == 'pname':
+                predicate = self._pname(value)
+            else:
+                raise ValueError(f'Predicado inválido: {value!r}')
+            self._emit(subject, predicate, self._term())
+            while self._peek() == ('punct', ','):
+                self._pos += 1
+                self._emit(subject, predicate, self._term())
+            # Um ou mais ";" (o último pode não ter predicado depois)
+            if self._peek() != ('punct', ';'):
+                return
+            while self._peek() == ('punct', ';'):
+                self._pos += 1
+            if self._peek() in (('punct', '.'), ('punct', ']')):
+                return
+
+    def _term(self) -> str:
+        kind, value = self._next()
+        if kind == 'iri':
+            return self._iri(value)
+        if kind == 'pname':
+            return self._pname(value)
+        if kind == 'bnode':
+            self.bnode_labels = True
+            return f'_:b{value[2:]}'
+        if kind == 'string':
+            quote = 3 if value[:3] in ('"""', "'''") else 1
+            lexical = '"' + _unescape(value[quote:-quote]).translate(_NT_ESCAPES) + '"'
+            next_kind, next_value = self._peek()
+            if next_kind == 'lang':
+                self._pos += 1
+                return lexical + next_value
+            if next_kind == 'datatype':
+                self._pos += 1
+                kind, value = self._next()
+                if kind not in ('iri', 'pname'):
+                    raise ValueError(f'Datatype inválido: {value!r}')
+                return f'{lexical}^^{self._iri(value) if kind == "iri" else self._pname(value)}'
+            return lexical
+        if kind in ('integer', 'decimal', 'double'):
+            return f'"{value}"^^<{_XSD}{kind}>'
+        if kind == 'word' and value in ('true', 'false'):
+            return f'"{value}"^^<{_XSD}boolean>'
+        if kind == 'punct' and value == '[':
+            node = self._new_bnode()
+            if self._peek() != ('punct', ']'):
+                self._predicate_objects(node)
+            self._expect(']')
+            return node
+        if kind == 'punct' and value == '(':
+            items = []
+            while self._peek() != ('punct', ')'):
+                items.append(self._term())
+            self._pos += 1
+            if not items:
+                return f'<{_RDF}nil>'
+            head = node = self._new_bnode()
+            for i, item in enumerate(items):
+                self._emit(node, f'<{_RDF}first>', item)
+                rest = self._new_bnode() if i + 1 < len(items) else f'<{_RDF}nil>'
+                self._emit(node, f'<{_RDF}rest>', rest)
+                node = rest
+            return head
+        raise ValueError(f'Termo inválido: {value!r}')
+
+
+def _turtle_chunk_to_ntriples(args: Tuple[bytes, str]) -> bytes:
+    data, base = args
+    return b''.join(TurtleToNTriples(base).convert_lines(io.BytesIO(data)))
+
+
+def split_turtle_as_ntriples(file_path: str, chunk_bytes: int, base: str = '',
+                             processes: int = 1) -> Iterator[bytes]:
+    """
+    Converte um arquivo Turtle para N-Triples, em pedaços de aproximadamente chunk_bytes.
+
+    O arquivo é dividido por split_turtle_file em pedaços Turtle autocontidos, e cada pedaço é
+    convertido (em paralelo, se processes > 1). Os pedaços são devolvidos na ordem do arquivo, e
+    no máximo 2 * processes ficam em memória aguardando consumo.
+
+    Args:
+        file_path: Caminho do arquivo Turtle (.gz é descomprimido)
+        chunk_bytes: Tamanho aproximado de cada pedaço Turtle em bytes
+        base: IRI base para IRIs relativos
+        processes: Número de processos de conversão
+
+    Returns:
+        Iterador de pedaços N-Triples (bytes)
+    """
+    chunks = split_turtle_file(file_path, chunk_bytes)
+    if processes <= 1:
+        for data in chunks:
+            yield _turtle_chunk_to_ntriples((data, base))
+        return
+
+    with Pool(processes) as pool:
+        pending = deque()
+        for data in chunks:
+            pending.append(pool.apply_async(_turtle_chunk_to_ntriples, ((data, base),)))
+            if len(pending) >= 2 * processes:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+def convert_turtle_file(src_path: str, dst_path: str, base: str = '') -> int:
+    """
+    Converte um arquivo Turtle em um arquivo N-Triples (comprimido se dst_path terminar em .gz).
+
+    Returns:
+        Número de triplas gravadas
+    """
+    converter = TurtleToNTriples(base)
+    opener = gzip.open if dst_path.endswith('.gz') else open
+    with open_rdf(src_path) as src, opener(dst_path, 'wb') as dst:
+        for block in converter.convert_lines(src):
+            dst.write(block)
+    return converter.triples
+
+
+def split_prefixes(text: str) -> Tuple[Dict[str, str], Optional[str], str]:
+    """
+    Separa as diretivas de um trecho Turtle (@prefix/@base ou PREFIX/BASE) do restante.
+
+    Args:
+        text: Trecho Turtle
+
+    Returns:
+        (prefixos {nome: IRI}, IRI base ou None, trecho sem as diretivas)
+
+    Raises:
+        ValueError: se o trecho redefine um prefixo (ou a base) com outro IRI, caso em que as
+            diretivas não podem ser movidas para o início sem mudar o significado
+    """
+    prefixes: Dict[str, str] = {}
+    base = None
+    body = []
+    tokens = [match for match in _TOKEN_RE.finditer(text) if match.lastgroup != 'ws']
+    pos = 0
+    i = 0
+    while i < len(tokens):
+        kind, value = tokens[i].lastgroup, tokens[i].group()
+        turtle_style = kind == 'lang' and value in ('@prefix', '@base') and (i == 0 or tokens[i - 1].lastgroup != 'string')
+        sparql_style = kind == 'word' and value.lower() in ('prefix', 'base')
+        if not (turtle_style or sparql_style):
+            i += 1
+            continue
+        try:
+            if value.lstrip('@').lower() == 'prefix':
+                name, iri = tokens[i + 1], tokens[i + 2]
+                end = i + 3
+                if name.lastgroup != 'pname' or not name.group().endswith(':') or iri.lastgroup != 'iri':
+                    raise IndexError
+                name, iri = name.group()[:-1], iri.group()[1:-1]
+                if prefixes.get(name, iri) != iri:
+                    raise ValueError(f'O prefixo {name}: é redefinido no trecho')
+                prefixes[name] = iri
+            else:
+                iri = tokens[i + 1]
+                end = i + 2
+                if iri.lastgroup != 'iri':
+                    raise IndexError
+                if base is not None and base != iri.group()[1:-1]:
+                    raise ValueError('A base é redefinida no trecho')
+                base = iri.group()[1:-1]
+            if turtle_style:
+                if tokens[end].group() != '.':
+                    raise IndexError
+                end += 1
+        except IndexError:
+            raise ValueError(f'Diretiva {value} inválida') from None
+        body.append(text[pos:tokens[i].start()])
+        pos = tokens[end - 1].end()
+        i = end
+    body.append(text[pos:])
+    return prefixes, base, ''.join(body)
+
+
+def rename_bnodes(text: str, tag: str) -> str:
+    """
+    Acrescenta tag aos rótulos de blank node (_:x vira _:{tag}x) de um trecho Turtle.
+
+    Usado ao juntar trechos independentes em uma única requisição, em que rótulos iguais de
+    trechos diferentes passariam a identificar o mesmo nó.
+    """
+    if '_:' not in text:
+        return text
+    return _TOKEN_RE.sub(lambda match: f'_:{tag}{match.group()[2:]}' if match.lastgroup == 'bnode' else match.group(), text)
@@ -0,0 +1,203 @@
+import random
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Requisição recusada no cliente porque o circuit breaker está aberto
+
+    É uma ConnectionError, então os métodos de SparqlQuery/TurtleLoader a tratam como o Fuseki
+    fora do ar (dict de falha), só que sem esperar por timeouts.
+    """
+
+
+class RetryPolicy:
+    """
+    Política de novas tentativas com backoff exponencial e jitter ("full jitter")
+
+    Só repete requisições seguras: métodos idempotentes (GET, HEAD, PUT, DELETE, OPTIONS),
+    requisições que nunca chegaram ao servidor (conexão recusada) e, se pedido, POSTs.
+    Um orçamento de tentativas (retry_budget) limita as repetições a uma fração das
+    requisições recentes, para que um Fuseki em pausa de GC não receba uma avalanche de
+    novas tentativas de todos os clientes ao mesmo tempo.
+    """
+
+    IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS'])
+
+    def __init__(self, retries: int = 3, backoff_factor: float = 0.5, backoff_max: float = 30.0,
+                 status_forcelist: Iterable[int] = (429, 502, 503, 504),
+                 retry_non_idempotent: bool = False, respect_retry_after: bool = True,
+                 retry_budget: Optional[float] = 0.2, budget_min_tokens: float = 10.0):
+        """
+        Args:
+            retries: Número máximo de novas tentativas por requisição
+            backoff_factor: Espera base; a tentativa n espera um valor aleatório entre 0 e
+                backoff_factor * 2**n segundos
+            backoff_max: Maior espera entre tentativas em segundos
+            status_forcelist: Códigos HTTP que indicam falha temporária do servidor
+            retry_non_idempotent: Repete também POSTs (SPARQL UPDATE, GSP POST). Seguro para
+                INSERT DATA/N-Triples sem blank nodes, que não duplicam dados
+            respect_retry_after: Respeita o cabeçalho Retry-After das respostas 429/503
+            retry_budget: Fração das requisições que pode ser repetida (None = sem limite)
+            budget_min_tokens: Tentativas sempre disponíveis, mesmo com pouco tráfego
+        """
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.status_forcelist = frozenset(status_forcelist)
+        self.retry_non_idempotent = retry_non_idempotent
+        self.respect_retry_after = respect_retry_after
+        self.retry_budget = retry_budget
+        self.budget_min_tokens = budget_min_tokens
+        self.retries_done = 0
+        self.retries_denied = 0
+        self._tokens = budget_min_tokens
+        self._lock = threading.Lock()
+
+    def is_idempotent(self, method: str, idempotent: Optional[bool] = None) -> bool:
+        """Indica se uma requisição com esse método pode ser repetida depois de enviada."""
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in self.IDEMPOTENT_METHODS or self.retry_non_idempotent
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        """
+        Espera antes da nova tentativa número attempt (começando em 0).
+
+        Args:
+            attempt: Índice da nova tentativa
+            response: Resposta que motivou a nova tentativa (para ler Retry-After)
+
+        Returns:
+            Tempo em segundos
+        """
+        wait = random.uniform(0, min(self.backoff_max, self.backoff_factor * 2 ** attempt))
+        if self.respect_retry_after and response is not None:
+            retry_after = response.headers.get('Retry-After', '')
+            if retry_after.isdigit():
+                wait = max(wait, min(float(retry_after), self.backoff_max))
+        return wait
+
+    def on_request(self):
+        """Cada requisição nova aumenta o orçamento de tentativas."""
+        if self.retry_budget is not None:
+            with self._lock:
+                self._tokens = min(self._tokens + self.retry_budget,
+                                   self.budget_min_tokens + 100 * self.retry_budget)
+
+    def acquire_retry(self) -> bool:
+        """Consome uma tentativa do orçamento; False se ele estiver esgotado."""
+        with self._lock:
+            if self.retry_budget is not None:
+                if self._tokens < 1:
+                    self.retries_denied += 1
+                    return False
+                self._tokens -= 1
+            self.retries_done += 1
+            return True
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker para um servidor Fuseki
+
+    Depois de failure_threshold falhas seguidas (erros de conexão, timeouts e respostas
+    5xx/429) o circuito abre e as requisições falham na hora com CircuitOpenError, sem
+    ocupar conexões nem o servidor. Após reset_timeout segundos o circuito fica meio aberto:
+    até half_open_max_calls requisições de teste passam; um sucesso fecha o circuito e uma
+    falha o abre de novo.
+
+    Um mesmo objeto pode ser compartilhado pelas sessões que falam com o mesmo servidor.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0, half_open_max_calls: int = 1):
+        """
+        Args:
+            failure_threshold: Falhas seguidas que abrem o circuito
+            reset_timeout: Tempo em segundos com o circuito aberto antes de testar o servidor
+            half_open_max_calls: Requisições de teste simultâneas com o circuito meio aberto
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_count = 0
+        self.rejected_count = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """Chamado antes de cada requisição; levanta CircuitOpenError se ela não deve ser feita."""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.rejected_count += 1
+                    raise CircuitOpenError(f'Circuito aberto: Fuseki indisponível há '
+                                           f'{time.monotonic() - self._opened_at:.1f}s')
+                self.state = self.HALF_OPEN
+                self._half_open_calls = 0
+            if self.state == self.HALF_OPEN:
+                if self._half_open_calls >= self.half_open_max_calls:
+                    self.rejected_count += 1
+                    raise CircuitOpenError('Circuito meio aberto: aguardando a requisição de teste')
+                self._half_open_calls += 1
+
+    def is_open(self) -> bool:
+        """Indica se uma requisição feita agora seria recusada (sem alterar o estado do circuito)."""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.reset_timeout
+            return self.state == self.HALF_OPEN and self._half_open_calls >= self.half_open_max_calls
+
+    def release(self):
+        """
+        Devolve a vaga de teste de uma requisição que terminou sem dizer nada sobre o servidor
+        (ex.: exceção no gerador do corpo de um upload), para o circuito meio aberto não ficar
+        esperando para sempre por um resultado que não vem.
+        """
+        with self._lock:
+            if self.state == self.HALF_OPEN and self._half_open_calls > 0:
+                self._half_open_calls -= 1
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened_count += 1
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado atual e contadores do circuito."""
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "opened_count": self.opened_count,
+                "rejected_count": self.rejected_count
+            }
+
+
+def never_sent(error: Exception) -> bool:
+    """Indica se o erro aconteceu antes de a requisição chegar ao servidor (seguro repetir)."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(reason, NewConnectionError)
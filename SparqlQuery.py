@@ -1,8 +1,31 @@
+import json
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Sequence, Tuple, Union
 
 from requests.auth import HTTPBasicAuth
 
+from FlightWeather import FlightWeather
+from FusekiLogging import instance_logger
+from FusekiSession import FusekiSession
+from LoadBalancer import ReplicaPool, replica_unavailable
+from Metrics import Metrics, in_current_call, instrumented, observe_response
+from QueryCache import QueryCache
+from QueryProfiler import lint_query
+from Resilience import CircuitBreaker, RetryPolicy
+from RdfFormats import rename_bnodes
+from QueryTemplate import BoundQuery, Literal, QueryTemplate, aerodrome, split_prologue
+from SparqlResults import RESULT_FORMATS, SelectStream
+
+# Operação INSERT DATA (após o prólogo): lotes só com elas podem ser enviados em qualquer ordem
+_INSERT_DATA_RE = re.compile(r'\s*INSERT\s+DATA\b', re.IGNORECASE)
+# LIMIT/OFFSET em qualquer ordem no final da query
+_SLICE_RE = re.compile(r'\b(LIMIT|OFFSET)\s+\d+(\s+(LIMIT|OFFSET)\s+\d+)?\s*$', re.IGNORECASE)
+
 
 class SparqlQuery:
     """
@@ -10,61 +33,251 @@ class SparqlQuery:
     """
 
     def __init__(self, fuseki_url: str = "http://localhost:3030", dataset: str = "airdata",
-                 auth_user: str = "admin", auth_pass: str = "admin123"):
+                 auth_user: str = "admin", auth_pass: str = "admin123",
+                 session: Optional[FusekiSession] = None, pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = (5, 300),
+                 retries: int = 3, backoff_factor: float = 0.5,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Union[CircuitBreaker, bool] = True,
+                 cache: Optional[QueryCache] = None, result_format: str = 'json',
+                 metrics: Optional[Metrics] = None,
+                 verbose: bool = False, slow_query_seconds: Optional[float] = None,
+                 read_urls: Optional[Sequence[str]] = None, balancing: str = 'least_outstanding',
+                 health_check_interval: Optional[float] = 10.0, primary_fallback: bool = True):
         """
         Inicializa o executor de queries.
 
         Args:
             fuseki_url: URL base do servidor Fuseki (padrão: http://localhost:3030)
             dataset: Nome do dataset no Fuseki (padrão: ds)
+            session: Sessão HTTP compartilhada (ex.: a mesma de um TurtleLoader). Se None, cria uma própria
+            pool_size: Tamanho do pool de conexões (usado apenas se session for None)
+            timeout: Timeout padrão por requisição (usado apenas se session for None)
+            retries: Novas tentativas em falhas de conexão/5xx (usado apenas se session for None)
+            backoff_factor: Fator do backoff exponencial (usado apenas se session for None)
+            retry_policy: Política de novas tentativas completa (usado apenas se session for None)
+            circuit_breaker: CircuitBreaker da sessão, True para um padrão ou False para desativar
+                (usado apenas se session for None)
+            cache: Cache de resultados (opcional). Passe o mesmo objeto ao TurtleLoader para que
+                as cargas também invalidem o cache
+            result_format: Formato padrão das respostas de select(): 'json', 'tsv', 'csv', 'thrift'
+                ou 'auto' (ver _choose_format)
+            metrics: Registro de métricas (opcional). Cada chamada registra tempo total, TTFB,
+                tempo de parse, bytes, linhas, novas tentativas e status, por operação e query_name
+            verbose: Mostra no stdout cada operação e query executada por esta instância (logger
+                "fuseki.query" em nível DEBUG). Para outros destinos/níveis use FusekiLogging.configure_logging
+            slow_query_seconds: Chamadas que levarem ao menos esse tempo são registradas como
+                WARNING, com a query, mesmo com o nível DEBUG desligado (None desativa)
+            read_urls: URLs base de réplicas somente leitura do Fuseki (opcional), servidores
+                com o dataset montado a partir de fuseki-data/templates/config-tdb2-dir-readonly
+                (ver LoadBalancer.ReplicaPool). As consultas (select, ask, construct...) são
+                distribuídas entre elas; update e cargas continuam indo para fuseki_url, o primário
+            balancing: Estratégia de escolha da réplica: 'least_outstanding' ou 'ewma'
+                (ver LoadBalancer.ReplicaPool)
+            health_check_interval: Intervalo em segundos dos health checks das réplicas (None desativa)
+            primary_fallback: Se nenhuma réplica responder, consulta o primário
         """
         self.fuseki_url = fuseki_url.rstrip('/')
         self.dataset = dataset
         self.query_endpoint = f"{self.fuseki_url}/{dataset}/query"
         self.update_endpoint = f"{self.fuseki_url}/{dataset}/update"
+        self.validate_endpoint = f"{self.fuseki_url}/$/validate/query"
         self.auth = HTTPBasicAuth(auth_user, auth_pass) if auth_user and auth_pass else None
-        print('Instância de SparqlQuery criada!')
-        print('Informações do objeto:')
-        print(f'{self.fuseki_url=}')
-        print(f'{self.dataset=}')
-        print(f'{self.query_endpoint=}')
-        print(f'{self.update_endpoint=}')
+        self.cache = cache
+        self.result_format = result_format
+        self.metrics = metrics
+        self.slow_query_seconds = slow_query_seconds
+        self.log = instance_logger('query', verbose)
+        self._owns_session = session is None
+        self.session = session or FusekiSession(pool_size=pool_size, timeout=timeout,
+                                                retries=retries, backoff_factor=backoff_factor,
+                                                retry_policy=retry_policy, circuit_breaker=circuit_breaker)
+        self.primary_fallback = primary_fallback
+        self.replicas = ReplicaPool(read_urls, dataset, strategy=balancing) if read_urls else None
+        if self.replicas is not None and health_check_interval:
+            self.replicas.start_health_checks(self.session, health_check_interval)
+        self.log.debug('Instância de SparqlQuery criada: fuseki_url=%s dataset=%s query_endpoint=%s update_endpoint=%s',
+                       self.fuseki_url, self.dataset, self.query_endpoint, self.update_endpoint)
+
+    def close(self):
+        """Fecha a sessão HTTP, caso ela tenha sido criada por este objeto, e para os health checks."""
+        if self.replicas is not None:
+            self.replicas.stop_health_checks()
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _query_get(self, **kwargs) -> requests.Response:
+        """
+        GET no endpoint de consulta: no primário ou, com réplicas, na réplica escolhida pelo
+        balanceamento.
+
+        Um erro de conexão ou uma réplica indisponível (429/502/503/504 vindo de um proxy ou de
+        um servidor sobrecarregado, ver LoadBalancer.replica_unavailable) faz a consulta ser
+        repetida na próxima réplica, sem esperar backoff; só a última tentativa usa as novas
+        tentativas da sessão. Uma resposta do Fuseki, mesmo de erro (query inválida, timeout da
+        query), é devolvida como veio: executar a mesma query em outra réplica só repetiria o
+        custo. Se nenhuma réplica responder, consulta o primário (primary_fallback).
+        """
+        if self.replicas is None:
+            return self.session.get(self.query_endpoint, **kwargs)
+
+        tried = []
+        response = None
+        error = None
+        while True:
+            replica = self.replicas.acquire(exclude=tried)
+            if replica is None:
+                break
+            tried.append(replica)
+            last = len(tried) == len(self.replicas) and not self.primary_fallback
+            breaker = replica.circuit_breaker
+            try:
+                breaker.before_request()
+                try:
+                    # O circuito da réplica é controlado aqui, pela classificação de replica_unavailable
+                    response = self.session.get(replica.query_endpoint, retry=last, circuit_breaker=False, **kwargs)
+                except requests.exceptions.RequestException:
+                    breaker.record_failure()
+                    raise
+                except BaseException:
+                    breaker.release()
+                    raise
+            except requests.exceptions.RequestException as e:
+                self.replicas.release(replica, failed=True)
+                self.log.warning('Réplica %s falhou: %s', replica.fuseki_url, e)
+                error = e
+                continue
+            except BaseException:
+                self.replicas.release(replica, failed=True)
+                raise
+            failed = replica_unavailable(response)
+            self.replicas.release(replica, seconds=response.elapsed.total_seconds(), failed=failed)
+            if not failed:
+                breaker.record_success()
+                response.replica = replica.fuseki_url
+                return response
+            breaker.record_failure()
+            self.log.warning('Réplica %s indisponível: %d', replica.fuseki_url, response.status_code)
+            if not last:
+                response.close()
+                response = None
+
+        if self.primary_fallback:
+            self.log.warning('Nenhuma réplica respondeu; consultando o primário %s', self.fuseki_url)
+            return self.session.get(self.query_endpoint, **kwargs)
+        if response is not None:
+            return response
+        raise error
+
+    @staticmethod
+    def _query_params(query: str):
+        """Parâmetros de URL da query; uma BoundQuery já chega codificada pelo QueryTemplate."""
+        if isinstance(query, BoundQuery):
+            return f'query={query.url_encoded}'
+        return {'query': query}
+
+    @staticmethod
+    def _choose_format(result_format: str, columnar: bool = False) -> str:
+        """
+        Resolve o formato 'auto' pelo tipo de resultado que será montado.
 
-    def select(self, query: str) -> Dict[str, Any]:
+        Para dicts de binding (select, select_iter) usa JSON: o parser em C do módulo json
+        monta os dicts mais rápido que os decodificadores de TSV/CSV em Python, mesmo com
+        respostas grandes. Para colunas (select_columns) usa TSV, decodificado direto nos
+        arrays, sem dicts intermediários. TSV e CSV continuam úteis para reduzir os bytes na
+        rede, pedidos explicitamente.
+        """
+        if result_format != 'auto':
+            return result_format
+        return 'tsv' if columnar else 'json'
+
+    def _cache_get(self, operation: str, query: str) -> Optional[Dict[str, Any]]:
+        if self.cache is None:
+            return None
+        return self.cache.get(QueryCache.make_key(f'{self.fuseki_url}/{self.dataset}', operation, query))
+
+    def _cache_put(self, operation: str, query: str, result: Dict[str, Any]):
+        if self.cache is not None:
+            self.cache.put(QueryCache.make_key(f'{self.fuseki_url}/{self.dataset}', operation, query), result)
+
+    def _cache_invalidate(self):
+        if self.cache is not None:
+            self.cache.invalidate(f'{self.fuseki_url}/{self.dataset}')
+
+    @instrumented('select')
+    def select(self, query: str, result_format: Optional[str] = None, use_cache: bool = True,
+               query_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Executa uma query SELECT SPARQL.
 
         Args:
             query: Query SPARQL SELECT
+            result_format: Formato pedido ao Fuseki: 'json', 'tsv', 'csv', 'thrift' ou 'auto'
+                (se None usa o formato padrão do objeto). O formato da resposta não muda o
+                formato dos resultados devolvidos; JSON é o mais rápido de decodificar aqui e
+                TSV/CSV são os menores na rede
+            use_cache: Se False, ignora o cache de resultados nesta chamada
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
 
         Returns:
             dict com resultados e metadados
         """
+        result_format = self._choose_format(result_format or self.result_format)
+        if result_format not in RESULT_FORMATS:
+            return {
+                "success": False,
+                "message": f"Formato de resultado não suportado: {result_format}"
+            }
+
         headers = {
-            'Accept': 'application/sparql-results+json'
+            'Accept': RESULT_FORMATS[result_format]
         }
 
-        params = {
-            'query': query
-        }
+        params = self._query_params(query)
+
+        cached = self._cache_get(f'select:{result_format}', query) if use_cache else None
+        if cached is not None:
+            return cached
 
         try:
-            print('Fazendo a operação SELECT')
-            print(f'Query utilizada:\n{query}')
-            response = requests.get(
-                self.query_endpoint,
+            self.log.debug('Fazendo a operação SELECT. Query utilizada:\n%s', query)
+            response = self._query_get(
                 params=params,
                 headers=headers
             )
+            observe_response(response)
 
             if response.status_code == 200:
-                data = response.json()
-                return {
+                if result_format == 'json':
+                    data = response.json()
+                    bindings = data.get('results', {}).get('bindings', [])
+                    variables = data.get('head', {}).get('vars', [])
+                else:
+                    stream = SelectStream(response, result_format=result_format)
+                    bindings = list(stream)
+                    variables = stream.variables
+                    if not stream.success:
+                        return {
+                            "success": False,
+                            "message": stream.message,
+                            "error": stream.error
+                        }
+                result = {
                     "success": True,
-                    "results": data.get('results', {}).get('bindings', []),
-                    "variables": data.get('head', {}).get('vars', []),
-                    "count": len(data.get('results', {}).get('bindings', []))
+                    "results": bindings,
+                    "variables": variables,
+                    "count": len(bindings),
+                    "format": result_format
                 }
+                if use_cache:
+                    self._cache_put(f'select:{result_format}', query, result)
+                return result
             else:
                 return {
                     "success": False,
@@ -87,12 +300,212 @@ class SparqlQuery:
                 "traceback": traceback.format_exc()
             }
 
-    def ask(self, query: str) -> Dict[str, Any]:
+    @instrumented('select_iter')
+    def select_iter(self, query: str, result_format: str = 'json', chunk_size: int = 65536,
+                    query_name: Optional[str] = None) -> SelectStream:
+        """
+        Executa uma query SELECT SPARQL lendo os resultados sob demanda (streaming).
+
+        Ao contrário de select(), os bindings não são materializados em uma lista: cada
+        binding é decodificado e entregue à medida que chega, com memória limitada ao
+        tamanho do chunk. Sair do laço for (no fim, com break ou por uma exceção), chamar
+        close() ou sair do bloco with fecha a conexão com o Fuseki; ao consumir o stream com
+        next(), use close() ou with.
+
+        Args:
+            query: Query SPARQL SELECT
+            result_format: Formato pedido ao Fuseki: 'json', 'tsv', 'csv', 'thrift' ou 'auto' (padrão: json)
+            chunk_size: Tamanho em bytes de cada leitura do corpo da resposta
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
+
+        Returns:
+            SelectStream iterável com os bindings (mesmo formato de select()['results'])
+        """
+        result_format = self._choose_format(result_format)
+        if result_format not in RESULT_FORMATS:
+            return SelectStream(message=f"Formato de resultado não suportado: {result_format}",
+                                error=result_format)
+
+        headers = {
+            'Accept': RESULT_FORMATS[result_format]
+        }
+
+        params = self._query_params(query)
+
+        try:
+            self.log.debug('Fazendo a operação SELECT (streaming). Query utilizada:\n%s', query)
+            response = self._query_get(
+                params=params,
+                headers=headers,
+                stream=True
+            )
+            observe_response(response)
+
+            if response.status_code == 200:
+                return SelectStream(response, result_format=result_format, chunk_size=chunk_size)
+            else:
+                message = f"Erro na query: {response.text}"
+                response.close()
+                return SelectStream(message=message, status_code=response.status_code,
+                                    error=message)
+
+        except requests.exceptions.ConnectionError as e:
+            return SelectStream(message="Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                                error=str(e))
+        except Exception as e:
+            return SelectStream(message=f"Erro inesperado: {str(e)}", error=str(e))
+
+    def select_pages(self, query: str, page_size: int = 10000, workers: int = 4,
+                     cursor: Optional[Dict[str, Any]] = None, keyset: Optional[str] = None,
+                     result_format: str = 'tsv', query_name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Executa uma query SELECT em páginas, entregues em ordem.
+
+        No modo padrão a query é fatiada com LIMIT/OFFSET e até `workers` páginas são buscadas
+        ao mesmo tempo. A query precisa de um ORDER BY total (que desempate todas as linhas)
+        para que as páginas sejam estáveis, e não pode terminar com LIMIT/OFFSET próprios.
+
+        Com keyset=<variável>, cada página filtra as linhas depois do último valor da página
+        anterior (FILTER(?var > ...)), sem OFFSET. A variável deve ser única por linha; as
+        páginas são buscadas em sequência, já que cada uma depende da anterior.
+
+        Cada página traz um "cursor"; passar o cursor da última página recebida retoma uma
+        exportação interrompida a partir da página seguinte. Uma página com success=False
+        encerra a iteração e seu cursor aponta para ela mesma (para tentar de novo).
+
+        Args:
+            query: Query SPARQL SELECT
+            page_size: Número de linhas por página
+            workers: Número máximo de páginas buscadas em paralelo (modo LIMIT/OFFSET)
+            cursor: Cursor devolvido por uma página anterior, para retomar
+            keyset: Variável usada na paginação por keyset (opcional)
+            result_format: Formato pedido ao Fuseki (padrão: tsv)
+            query_name: Nome da query nas métricas de cada página (ver select)
+
+        Returns:
+            Iterador de dicts no formato de select(), com "page" e "cursor"
+        """
+        if _SLICE_RE.search(query):
+            yield {
+                "success": False,
+                "message": "A query paginada não pode ter LIMIT/OFFSET próprios",
+                "cursor": cursor
+            }
+            return
+        if keyset:
+            yield from self._select_keyset_pages(query, page_size, cursor, keyset, result_format, query_name)
+            return
+
+        offset = cursor['offset'] if cursor else 0
+        page = cursor['page'] if cursor else 0
+
+        def fetch(page_offset: int) -> Dict[str, Any]:
+            return self.select(f"{query}\nLIMIT {page_size} OFFSET {page_offset}",
+                               result_format=result_format, use_cache=False, query_name=query_name)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            next_offset = offset
+            try:
+                while True:
+                    while len(pending) < workers:
+                        pending.append((next_offset, executor.submit(fetch, next_offset)))
+                        next_offset += page_size
+                    page_offset, future = pending.popleft()
+                    result = future.result()
+                    if not result['success']:
+                        result['page'] = page
+                        result['cursor'] = {"mode": "offset", "offset": page_offset, "page": page}
+                        yield result
+                        return
+                    page += 1
+                    result['page'] = page
+                    result['cursor'] = {"mode": "offset", "offset": page_offset + page_size, "page": page}
+                    yield result
+                    if result['count'] < page_size:
+                        return
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    def _select_keyset_pages(self, query: str, page_size: int, cursor: Optional[Dict[str, Any]],
+                             keyset: str, result_format: str,
+                             query_name: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        prologue, body = split_prologue(query)
+        after = cursor['after'] if cursor else None
+        page = cursor['page'] if cursor else 0
+        key = f'?{keyset.lstrip("?$")}'
+        while True:
+            if after is None:
+                page_filter = ''
+            elif after['type'] == 'uri':
+                # IRIs não são comparáveis com ">" em SPARQL; ORDER BY os ordena pela mesma string
+                page_filter = f"FILTER(STR({key}) > {Literal(after['value']).n3()})"
+            else:
+                page_filter = f"FILTER({key} > {Literal(after['value'], after.get('datatype')).n3()})"
+            page_query = (f"{prologue}\nSELECT * WHERE {{\n{{ {body} }}\n{page_filter}\n}}\n"
+                          f"ORDER BY {key}\nLIMIT {page_size}")
+            result = self.select(page_query, result_format=result_format, use_cache=False, query_name=query_name)
+            if not result['success']:
+                result['page'] = page
+                result['cursor'] = {"mode": "keyset", "after": after, "page": page}
+                yield result
+                return
+            page += 1
+            if result['results']:
+                after = result['results'][-1].get(key[1:])
+            result['page'] = page
+            result['cursor'] = {"mode": "keyset", "after": after, "page": page}
+            yield result
+            if result['count'] < page_size or after is None:
+                return
+
+    @instrumented('select_columns')
+    def select_columns(self, query: str, result_format: str = 'tsv',
+                       query_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Executa uma query SELECT SPARQL devolvendo os resultados por coluna.
+
+        Os bindings são decodificados direto em um array por variável (NumPy, se instalado):
+        literais numéricos viram float64/int64, xsd:dateTime vira datetime64 e IRIs viram
+        strings internadas. O resultado pode ser convertido com to_pandas()/to_arrow().
+
+        Args:
+            query: Query SPARQL SELECT
+            result_format: Formato pedido ao Fuseki (padrão: tsv, decodificado sem dicts
+                intermediários; 'auto' também escolhe TSV)
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
+
+        Returns:
+            dict com o ColumnarResult em "results" e metadados
+        """
+        stream = self.select_iter(query, result_format=self._choose_format(result_format, columnar=True),
+                                  query_name=query_name)
+        columns = stream.columns()
+        if not stream.success:
+            result = {
+                "success": False,
+                "message": stream.message,
+                "error": stream.error
+            }
+            if stream.status_code is not None:
+                result["status_code"] = stream.status_code
+            return result
+        return {
+            "success": True,
+            "results": columns,
+            "variables": columns.variables,
+            "count": columns.count
+        }
+
+    @instrumented('ask')
+    def ask(self, query: str, query_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Executa uma query ASK SPARQL (retorna booleano).
 
         Args:
             query: Query SPARQL ASK
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
 
         Returns:
             dict com resultado booleano
@@ -101,25 +514,28 @@ class SparqlQuery:
             'Accept': 'application/sparql-results+json'
         }
 
-        params = {
-            'query': query
-        }
+        params = self._query_params(query)
+
+        cached = self._cache_get('ask', query)
+        if cached is not None:
+            return cached
 
         try:
-            print('Fazendo a operação ASK')
-            print(f'Query utilizada:\n{query}')
-            response = requests.get(
-                self.query_endpoint,
+            self.log.debug('Fazendo a operação ASK. Query utilizada:\n%s', query)
+            response = self._query_get(
                 params=params,
                 headers=headers
             )
+            observe_response(response)
 
             if response.status_code == 200:
                 data = response.json()
-                return {
+                result = {
                     "success": True,
                     "result": data.get('boolean', False)
                 }
+                self._cache_put('ask', query, result)
+                return result
             else:
                 return {
                     "success": False,
@@ -136,12 +552,14 @@ class SparqlQuery:
                 "traceback": traceback.format_exc()
             }
 
-    def construct(self, query: str) -> Dict[str, Any]:
+    @instrumented('construct')
+    def construct(self, query: str, query_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Executa uma query CONSTRUCT SPARQL (retorna grafo RDF).
 
         Args:
             query: Query SPARQL CONSTRUCT
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
 
         Returns:
             dict com grafo resultante em formato Turtle
@@ -150,25 +568,28 @@ class SparqlQuery:
             'Accept': 'text/turtle'
         }
 
-        params = {
-            'query': query
-        }
+        params = self._query_params(query)
+
+        cached = self._cache_get('construct', query)
+        if cached is not None:
+            return cached
 
         try:
-            print('Fazendo a operação CONSTRUCT')
-            print(f'Query utilizada:\n{query}')
-            response = requests.get(
-                self.query_endpoint,
+            self.log.debug('Fazendo a operação CONSTRUCT. Query utilizada:\n%s', query)
+            response = self._query_get(
                 params=params,
                 headers=headers
             )
+            observe_response(response)
 
             if response.status_code == 200:
-                return {
+                result = {
                     "success": True,
                     "graph": response.text,
                     "format": "turtle"
                 }
+                self._cache_put('construct', query, result)
+                return result
             else:
                 return {
                     "success": False,
@@ -182,29 +603,37 @@ class SparqlQuery:
                 "message": f"Erro inesperado: {str(e)}"
             }
 
-    def update(self, query: str) -> Dict[str, Any]:
+    @instrumented('update')
+    def update(self, query: str, query_name: Optional[str] = None) -> Dict[str, Any]:
         """
         Executa uma operação SPARQL UPDATE (INSERT, DELETE, etc).
 
         Args:
             query: Query SPARQL UPDATE
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
 
         Returns:
             dict com status da operação
         """
+        self.log.debug('Fazendo a operação UPDATE. Query utilizada:\n%s', query)
+        return self._send_update(query.body if isinstance(query, BoundQuery) else query.encode('utf-8'))
+
+    def _send_update(self, body: bytes) -> Dict[str, Any]:
         headers = {
             'Content-Type': 'application/sparql-update'
         }
 
         try:
-            print('Fazendo a operação UPDATE')
-            print(f'Query utilizada:\n{query}')
-            response = requests.post(
+            # Invalida antes e depois: leituras concorrentes não podem repor um resultado antigo
+            self._cache_invalidate()
+            response = self.session.post(
                 self.update_endpoint,
-                data=query.encode('utf-8'),
+                data=body,
                 headers=headers,
                 auth=self.auth
             )
+            observe_response(response)
+            self._cache_invalidate()
 
             if response.status_code in [200, 204]:
                 return {
@@ -224,6 +653,300 @@ class SparqlQuery:
                 "message": f"Erro inesperado: {str(e)}"
             }
 
+    @instrumented('update_batch')
+    def update_batch(self, operations: Iterable[str], batch_size: int = 200,
+                     max_bytes: int = 1024 * 1024, workers: int = 4,
+                     ordered: Optional[bool] = None, query_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Executa muitas operações SPARQL UPDATE juntando-as em poucas requisições.
+
+        As operações são concatenadas com ";" (cada requisição é uma única transação no Fuseki:
+        se uma operação falha, o lote inteiro falha). Rótulos de blank node (_:x) não podem ser
+        repetidos entre operações de uma mesma requisição: nas operações INSERT DATA eles recebem
+        um prefixo por operação; as demais operações que contêm "_:" (em modelos ou padrões
+        WHERE, onde renomear não é seguro) são enviadas sozinhas, sem alteração.
+
+        Lotes só são enviados em paralelo quando a ordem não importa: por padrão, quando todas as
+        operações são INSERT DATA. Caso contrário, são enviados em sequência e o envio para no
+        primeiro lote com falha, para não aplicar operações posteriores a ele.
+
+        Args:
+            operations: Operações SPARQL UPDATE (pode ser um gerador)
+            batch_size: Número máximo de operações por requisição
+            max_bytes: Tamanho máximo aproximado de cada requisição
+            workers: Número de lotes enviados em paralelo (quando a ordem não importa)
+            ordered: True força envio sequencial; False permite paralelo para qualquer operação;
+                None decide pelo tipo das operações
+            query_name: Nome do lote de operações nas métricas (opcional)
+
+        Returns:
+            dict com o status de cada lote (índices das operações, sucesso, mensagem, tempo) e a vazão
+        """
+        operations = [op for op in operations if op.strip()]
+        if ordered is None:
+            ordered = not all(_INSERT_DATA_RE.match(split_prologue(op)[1]) for op in operations)
+        concurrency = 1 if ordered else max(1, workers)
+
+        def batches() -> Iterator[Tuple[int, int, bytes]]:
+            start = 0
+            parts: List[bytes] = []
+            size = 0
+            isolated = False
+            for i, op in enumerate(operations):
+                prologue, body = split_prologue(op.strip().rstrip(';'))
+                alone = False
+                if _INSERT_DATA_RE.match(body):
+                    # O corpo de INSERT DATA só tem triplas/quads concretos, lidos como Turtle
+                    body = rename_bnodes(body, f'u{i}_')
+                elif '_:' in body:
+                    alone = True
+                data = (prologue + body).encode('utf-8')
+                if parts and (alone or isolated or len(parts) >= batch_size or size + len(data) > max_bytes):
+                    yield start, i, b' ;\n'.join(parts)
+                    start, parts, size = i, [], 0
+                parts.append(data)
+                size += len(data) + 3
+                isolated = alone
+            if parts:
+                yield start, len(operations), b' ;\n'.join(parts)
+
+        def send(index: int, first: int, last: int, body: bytes) -> Dict[str, Any]:
+            begin = time.perf_counter()
+            result = self._send_update(body)
+            return {
+                "batch": index,
+                "operations": [first, last],
+                "success": result['success'],
+                "message": result['message'],
+                "status_code": result.get('status_code'),
+                "bytes": len(body),
+                "seconds": time.perf_counter() - begin
+            }
+
+        self.log.debug('Executando %d operações UPDATE em lotes de até %d (%s)', len(operations), batch_size,
+                       'sequencial' if ordered else f'{concurrency} em paralelo')
+        reports = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            pending = deque()
+            for index, (first, last, body) in enumerate(batches()):
+                pending.append(executor.submit(in_current_call(send), index, first, last, body))
+                if len(pending) >= concurrency:
+                    reports.append(pending.popleft().result())
+                    if ordered and not reports[-1]['success']:
+                        break
+            reports.extend(future.result() for future in pending)
+        elapsed = time.perf_counter() - start
+
+        applied = sum(r['operations'][1] - r['operations'][0] for r in reports if r['success'])
+        failed = [r['batch'] for r in reports if not r['success']]
+        return {
+            "success": applied == len(operations),
+            "message": f"{applied}/{len(operations)} operações aplicadas em {len(reports)} lotes"
+                       + (f", lotes com falha: {failed}" if failed else ""),
+            "batches": reports,
+            "total_operations": len(operations),
+            "applied_operations": applied,
+            "elapsed_seconds": elapsed,
+            "operations_per_second": applied / elapsed if elapsed else 0.0
+        }
+
+    def explain(self, query: str, lint: bool = True) -> Dict[str, Any]:
+        """
+        Pede ao Fuseki a álgebra e o plano otimizado de uma query, sem executá-la.
+
+        Usa o validador do servidor (/$/validate/query), que devolve a query formatada, a álgebra
+        SPARQL e a álgebra depois do otimizador do ARQ, onde se vê a ordem das junções e se os
+        FILTERs foram empurrados para dentro dos padrões.
+
+        Args:
+            query: Query SPARQL
+            lint: Inclui em "lint" os alertas de lint_query (ver QueryProfiler)
+
+        Returns:
+            dict com "formatted", "algebra", "algebra_quads", "algebra_opt", "algebra_opt_quads"
+            e, se a query tiver erro de sintaxe, "errors"
+        """
+        result: Dict[str, Any] = {"lint": lint_query(query)} if lint else {}
+        try:
+            self.log.debug('Pedindo o plano da query:\n%s', query)
+            response = self.session.post(
+                self.validate_endpoint,
+                data={'query': str(query), 'languageSyntax': 'SPARQL',
+                      'outputFormat': ['sparql', 'algebra', 'quads', 'opt', 'optquads']},
+                headers={'Accept': 'application/json'},
+                auth=self.auth
+            )
+            if response.status_code != 200:
+                result.update({
+                    "success": False,
+                    "message": f"Erro ao pedir o plano: {response.text}",
+                    "status_code": response.status_code
+                })
+                return result
+            data = response.json()
+            errors = data.get('errors') or []
+            result.update({
+                "success": not errors,
+                "message": "Query com erro de sintaxe" if errors else "Plano obtido",
+                "errors": errors,
+                "formatted": data.get('formatted'),
+                "algebra": data.get('algebra'),
+                "algebra_quads": data.get('algebra-quads'),
+                "algebra_opt": data.get('algebra-opt'),
+                "algebra_opt_quads": data.get('algebra-opt-quads')
+            })
+            return result
+
+        except requests.exceptions.ConnectionError as e:
+            result.update({
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            })
+            return result
+        except Exception as e:
+            import traceback
+            result.update({
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            })
+            return result
+
+    @instrumented('profile')
+    def profile(self, query: str, result_format: Optional[str] = None, explain: bool = True,
+                query_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Executa uma query SELECT medindo cada fase no cliente, para localizar o gargalo.
+
+        As fases são: preparo da requisição, espera pela resposta (TTFB: rede + execução no
+        Fuseki), download do corpo e parse dos resultados. Um /$/ping no servidor que respondeu
+        mede o RTT da rede, e a diferença para o TTFB estima o tempo de execução no servidor (se o
+        ping falhar, network_rtt_seconds fica None e server_seconds é o próprio TTFB). O Fuseki
+        não expõe estatísticas de execução por query via HTTP; para cruzar com o log do servidor
+        (fuseki-server --verbose) o resultado traz o Fuseki-Request-Id da resposta. O cache de
+        resultados não é usado.
+
+        Ex.:
+            print(format_profile(sparql.profile(query)))
+
+        Args:
+            query: Query SPARQL SELECT
+            result_format: Formato pedido ao Fuseki (se None usa o formato padrão do objeto)
+            explain: Inclui em "plan" o resultado de explain() (álgebra e plano otimizado)
+            query_name: Nome da query nas métricas (se None, usa o name de uma BoundQuery)
+
+        Returns:
+            dict com "phases" (segundos por fase), "server_seconds", "network_rtt_seconds",
+            "bottleneck", "lint", "plan", "rows" e "bytes"
+        """
+        start = time.perf_counter()
+        result_format = self._choose_format(result_format or self.result_format)
+        if result_format not in RESULT_FORMATS:
+            return {
+                "success": False,
+                "message": f"Formato de resultado não suportado: {result_format}"
+            }
+        lint = lint_query(query)
+        plan = self.explain(query, lint=False) if explain else None
+
+        try:
+            prepare_start = time.perf_counter()
+            params = self._query_params(query)
+            headers = {'Accept': RESULT_FORMATS[result_format]}
+            prepare = time.perf_counter() - prepare_start
+
+            self.log.debug('Fazendo a operação SELECT (profile). Query utilizada:\n%s', query)
+            response = self._query_get(params=params, headers=headers, stream=True)
+            observe_response(response)
+            ttfb = response.elapsed.total_seconds()
+
+            download_start = time.perf_counter()
+            body = response.content
+            download = time.perf_counter() - download_start
+
+            if response.status_code != 200:
+                return {
+                    "success": False,
+                    "message": f"Erro na query: {response.text}",
+                    "status_code": response.status_code,
+                    "lint": lint,
+                    "plan": plan
+                }
+
+            parse_start = time.perf_counter()
+            if result_format == 'json':
+                rows = len(json.loads(body).get('results', {}).get('bindings', []))
+            else:
+                stream = SelectStream(response, result_format=result_format)
+                rows = sum(1 for _ in stream)
+                if not stream.success:
+                    return {"success": False, "message": stream.message, "error": stream.error}
+            parse = time.perf_counter() - parse_start
+
+            # RTT do servidor que respondeu (o primário ou a réplica escolhida). É só uma
+            # estimativa: se o ping falhar, o profile da query continua valendo, sem o RTT
+            rtt = None
+            ping_start = time.perf_counter()
+            server_url = getattr(response, 'replica', self.fuseki_url)
+            try:
+                ping = self.session.get(f'{server_url}/$/ping', timeout=2, retry=False, circuit_breaker=False)
+                if ping.status_code == 200:
+                    rtt = ping.elapsed.total_seconds()
+                ping.close()
+            except requests.exceptions.RequestException as e:
+                self.log.debug('Ping de %s falhou: %s', server_url, e)
+            ping_seconds = time.perf_counter() - ping_start
+
+        except requests.exceptions.ConnectionError as e:
+            return {
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            }
+        except Exception as e:
+            import traceback
+            return {
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+        server = max(ttfb - rtt, 0.0) if rtt is not None else ttfb
+        phases = {
+            "prepare": prepare,
+            "ttfb": ttfb,
+            "download": download,
+            "parse": parse,
+            "total": time.perf_counter() - start - ping_seconds
+        }
+        candidates = {"servidor (execução da query)": server, "download": download, "parse": parse}
+        if rtt is not None:
+            candidates["rede (RTT)"] = rtt
+        bottleneck = max(candidates, key=candidates.get)
+        if bottleneck.startswith('servidor') and any(issue['severity'] != 'info' for issue in lint):
+            bottleneck += '; veja os alertas do lint'
+
+        return {
+            "success": True,
+            "query_name": query_name or getattr(query, 'name', None),
+            "format": result_format,
+            "rows": rows,
+            "bytes": len(body),
+            "status_code": response.status_code,
+            "request_id": response.headers.get('Fuseki-Request-Id'),
+            "server": server_url,
+            "phases": phases,
+            "network_rtt_seconds": rtt,
+            "server_seconds": server,
+            "bottleneck": bottleneck,
+            "lint": lint,
+            "plan": plan
+        }
+
     def get_all_triples(self, limit: Optional[int] = None) -> Dict[str, Any]:
         """
         Recupera todas as triplas do dataset (útil para testes).
@@ -244,26 +967,71 @@ class SparqlQuery:
         {limit_clause}
         """
 
-        print('Obtendo todas as triplas')
-        print(f'Query utilizada:\n{query}')
+        if not limit:
+            self.log.warning('get_all_triples sem limit carrega o dataset inteiro em memória; '
+                             'prefira iter_all_triples ou get_all_triples_pages')
+        self.log.debug('Obtendo todas as triplas')
 
         return self.select(query)
 
+    def get_all_triples_pages(self, page_size: int = 100000, workers: int = 4,
+                              cursor: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Recupera todas as triplas do dataset em páginas ordenadas (ver select_pages).
 
-def teste_select_1(obj: SparqlQuery):
-    codigo_icao = "SBGR"
+        Args:
+            page_size: Número de triplas por página
+            workers: Número máximo de páginas buscadas em paralelo
+            cursor: Cursor da última página recebida, para retomar uma exportação
 
-    print('-'*60)
-    print(f'SELECT PARA PEGAR A CONDIÇÃO METEOROLÓGICA NO AEROPORTO DE CÓDIGO {codigo_icao}')
-    print('-'*60)
-    query1 = f"""
+        Returns:
+            Iterador de páginas no formato de select()
+        """
+        query = """
+        SELECT ?subject ?predicate ?object
+        WHERE {
+            ?subject ?predicate ?object .
+        }
+        ORDER BY ?subject ?predicate ?object"""
+
+        self.log.debug('Obtendo todas as triplas em páginas')
+
+        return self.select_pages(query, page_size=page_size, workers=workers, cursor=cursor)
+
+    def iter_all_triples(self, limit: Optional[int] = None, result_format: str = 'tsv') -> SelectStream:
+        """
+        Percorre todas as triplas do dataset em streaming, sem carregá-las em memória.
+
+        Args:
+            limit: Número máximo de resultados (opcional)
+            result_format: Formato pedido ao Fuseki (padrão: tsv, o menor na rede)
+
+        Returns:
+            SelectStream com as triplas
+        """
+        limit_clause = f"LIMIT {limit}" if limit else ""
+
+        query = f"""
+        SELECT ?subject ?predicate ?object
+        WHERE {{
+            ?subject ?predicate ?object .
+        }}
+        {limit_clause}
+        """
+
+        self.log.debug('Percorrendo todas as triplas')
+
+        return self.select_iter(query, result_format=result_format)
+
+
+CONDICAO_AERODROMO = QueryTemplate("""
     PREFIX : <http://airdata.org/ontology#>
     PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
 
     SELECT ?metar ?hora ?ventoKt ?vis ?qnh
-    WHERE {{
+    WHERE {
       ?metar a :AerodromeCondition ;
-             :WeatherCondition-aerodrome :Aerodrome_{codigo_icao} ;
+             :WeatherCondition-aerodrome %{aerodromo} ;
              :WeatherCondition-time ?t ;
              :WeatherCondition-visibility ?v ;
              :WeatherCondition-wind ?w ;
@@ -273,10 +1041,78 @@ def teste_select_1(obj: SparqlQuery):
       ?v :Visibility-prevailingVisibilityMeters ?vis .
       ?w :Wind-windSpeedKt ?ventoKt .
 
-      FILTER(STRSTARTS(STR(?hora), "2025-07-01T10"))
-    }}
+      FILTER(STRSTARTS(STR(?hora), %{prefixo_hora}))
+    }
     ORDER BY ?hora
-        """
+        """)
+
+CONDICAO_AERODROMOS_LOTE = QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT ?aerodromo ?metar ?hora ?ventoKt ?vis ?qnh
+    WHERE {
+      %{aerodromos}
+      ?metar a :AerodromeCondition ;
+             :WeatherCondition-aerodrome ?aerodromo ;
+             :WeatherCondition-time ?t ;
+             :WeatherCondition-visibility ?v ;
+             :WeatherCondition-wind ?w ;
+             :AerodromeCondition-qnhHpa ?qnh .
+
+      ?t :DateTime-value ?hora .
+      ?v :Visibility-prevailingVisibilityMeters ?vis .
+      ?w :Wind-windSpeedKt ?ventoKt .
+
+      FILTER(STRSTARTS(STR(?hora), %{prefixo_hora}))
+    }
+    ORDER BY ?aerodromo ?hora
+        """)
+
+
+# Variantes para dados carregados com TurtleLoader(..., enrich=DateTimeEnricher()): a hora cheia
+# e a data já vêm calculadas na carga e são comparadas como termos, sem converter ?hora para string
+CONDICAO_AERODROMO_HORA = QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT ?metar ?hora ?ventoKt ?vis ?qnh
+    WHERE {
+      ?metar a :AerodromeCondition ;
+             :WeatherCondition-aerodrome %{aerodromo} ;
+             :WeatherCondition-time ?t ;
+             :WeatherCondition-visibility ?v ;
+             :WeatherCondition-wind ?w ;
+             :AerodromeCondition-qnhHpa ?qnh .
+
+      ?t :DateTime-hourBucket %{hora} ;
+         :DateTime-value ?hora .
+      ?v :Visibility-prevailingVisibilityMeters ?vis .
+      ?w :Wind-windSpeedKt ?ventoKt .
+    }
+    ORDER BY ?hora
+        """, name='condicao_aerodromo_hora')
+
+VOOS_POR_DIA = QueryTemplate("""
+    PREFIX : <http://airdata.org/ontology#>
+
+    SELECT ?data (COUNT(?flight) AS ?totalVoos)
+    WHERE {
+      ?flight a :ArrivalOperations ;
+              :ArrivalOperations-landing ?landing .
+      ?landing :Landing-time ?t .
+      ?t :DateTime-date ?data .
+    }
+    GROUP BY ?data
+    ORDER BY ?data
+        """, name='voos_por_dia')
+
+
+def teste_select_1(obj: SparqlQuery):
+    codigo_icao = "SBGR"
+
+    print('-'*60)
+    print(f'SELECT PARA PEGAR A CONDIÇÃO METEOROLÓGICA NO AEROPORTO DE CÓDIGO {codigo_icao}')
+    print('-'*60)
+    query1 = CONDICAO_AERODROMO.bind(aerodromo=aerodrome(codigo_icao), prefixo_hora="2025-07-01T10")
 
     result = obj.select(query1)
     print('Resultados')
@@ -286,42 +1122,35 @@ def teste_select_1(obj: SparqlQuery):
         print('\n')
 
 
-def teste_select_2(obj: SparqlQuery):
+def teste_select_1_lote(obj: SparqlQuery, codigos_icao: List[str]):
     print('-'*60)
-    print('SELECT PARA PEGAR TODOS OS VOOS E CONDIÇÕES METEOROLÓGICAS COM HORÁRIOS SIMILARES')
+    print(f'SELECT EM LOTE DAS CONDIÇÕES METEOROLÓGICAS EM {len(codigos_icao)} AERÓDROMOS')
     print('-'*60)
-    query = f"""
-PREFIX : <http://airdata.org/ontology#>
-PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+    queries = CONDICAO_AERODROMOS_LOTE.bind_batches('aerodromos', 'aerodromo',
+                                                    [aerodrome(codigo) for codigo in codigos_icao],
+                                                    batch_size=200, prefixo_hora="2025-07-01T10")
+    for query in queries:
+        result = obj.select(query)
+        print(f"Resultados no lote: {result.get('count', result.get('message'))}")
 
-SELECT ?flight ?horaVoo ?horaMetar ?ventoKt ?qnh ?vis
-WHERE {{
-  ?flight a :ArrivalOperations ;
-          :ArrivalOperations-landing ?landing .
-  ?landing :Landing-time ?tVoo .
-  ?tVoo :DateTime-value ?horaVoo .
-  ?flight :Flight-destinationAerodrome :Aerodrome_SBAF .
-  
-  ?metar a :AerodromeCondition ;
-         :WeatherCondition-aerodrome :Aerodrome_SBAF ;
-         :WeatherCondition-time ?tMetar ;
-         :WeatherCondition-wind ?w ;
-         :WeatherCondition-visibility ?v ;
-         :AerodromeCondition-qnhHpa ?qnh .
-  ?tMetar :DateTime-value ?horaMetar .
-  ?w :Wind-windSpeedKt ?ventoKt .
-  ?v :Visibility-prevailingVisibilityMeters ?vis .
-  
-  FILTER(SUBSTR(STR(?horaVoo), 1, 13) = SUBSTR(STR(?horaMetar), 1, 13))
-}}
-ORDER BY ?horaVoo
 
-            """
-
-    result = obj.select(query)
+def teste_select_2(obj: SparqlQuery):
+    flight_weather = FlightWeather(obj)
+    # O intervalo vem dos próprios dados, para cobrir todos os pousos em SBAF
+    interval = flight_weather.landing_range('SBAF')
+    print('-'*60)
+    print('SELECT PARA PEGAR TODOS OS VOOS E CONDIÇÕES METEOROLÓGICAS COM HORÁRIOS SIMILARES')
+    if interval['success'] and interval['start'] is not None:
+        print(f"(pousos em SBAF de {interval['start']} a {interval['end']})")
+    print('-'*60)
+    if not interval['success'] or interval['start'] is None:
+        print(interval.get('message', 'Nenhum pouso em SBAF'))
+        return
+    # Pousos e METARs são buscados como séries ordenadas e juntados no cliente (ver FlightWeather)
+    result = flight_weather.correlate('SBAF', interval['start'], interval['end'], mode='same_hour')
     print('Resultados')
-    print(result)
-    for res in result['results']:
+    print(result.get('count', result.get('message')))
+    for res in result.get('results', []):
         for key, value in res.items():
             print(f'{key}: {value}')
         print('\n')
@@ -381,7 +1210,7 @@ ORDER BY ?aerodromo
 # Exemplo de uso
 if __name__ == "__main__":
     # Inicializa o executor
-    sparql = SparqlQuery()
+    sparql = SparqlQuery(verbose=True)
 
     # Exemplo 1: Condições meteorológicas (METAR) no mesmo horário e aeroporto
     teste_select_1(sparql)
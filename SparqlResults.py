@@ -0,0 +1,698 @@
+import codecs
+import csv
+import json
+import re
+import struct
+import sys
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+try:
+    import numpy as np
+except ImportError:  # numpy é opcional: sem ele as colunas são listas Python
+    np = None
+
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+# Content types aceitos por formato de resultado
+RESULT_FORMATS = {
+    'json': 'application/sparql-results+json',
+    'tsv': 'text/tab-separated-values',
+    'csv': 'text/csv',
+    'thrift': 'application/sparql-results+thrift',
+}
+
+_NUMBER_RE = re.compile(r'^[+-]?(\d+\.?\d*([eE][+-]?\d+)?|\.\d+([eE][+-]?\d+)?)$')
+_SCHEME_RE = re.compile(r'^[A-Za-z][A-Za-z0-9+.-]*:\S*$')
+_ESCAPES = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+
+def _unescape(text: str) -> str:
+    """Remove os escapes no estilo N-Triples (\\n, \\", \\uXXXX...) de um literal."""
+    if '\\' not in text:
+        return text
+    out = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c == '\\' and i + 1 < len(text):
+            n = text[i + 1]
+            if n == 'u':
+                out.append(chr(int(text[i + 2:i + 6], 16)))
+                i += 6
+                continue
+            if n == 'U':
+                out.append(chr(int(text[i + 2:i + 10], 16)))
+                i += 10
+                continue
+            out.append(_ESCAPES.get(n, n))
+            i += 2
+            continue
+        out.append(c)
+        i += 1
+    return ''.join(out)
+
+
+def parse_tsv_term(token: str) -> Optional[Dict[str, str]]:
+    """
+    Converte um termo RDF no formato SPARQL TSV para o formato de binding do JSON.
+
+    Args:
+        token: Termo como aparece na célula TSV (ex.: <http://...>, "abc"@pt, 12)
+
+    Returns:
+        dict {'type': ..., 'value': ...} ou None se a variável não estiver ligada
+    """
+    if not token:
+        return None
+    first = token[0]
+    if first == '<':
+        return {'type': 'uri', 'value': _unescape(token[1:-1])}
+    if first == '"':
+        end = token.rfind('"')
+        term = {'type': 'literal', 'value': _unescape(token[1:end])}
+        suffix = token[end + 1:]
+        if suffix.startswith('@'):
+            term['xml:lang'] = suffix[1:]
+        elif suffix.startswith('^^'):
+            term['datatype'] = suffix[3:-1]
+        return term
+    if token.startswith('_:'):
+        return {'type': 'bnode', 'value': token[2:]}
+    if token in ('true', 'false'):
+        return {'type': 'literal', 'value': token, 'datatype': XSD + 'boolean'}
+    if _NUMBER_RE.match(token):
+        if 'e' in token or 'E' in token:
+            datatype = 'double'
+        elif '.' in token:
+            datatype = 'decimal'
+        else:
+            datatype = 'integer'
+        return {'type': 'literal', 'value': token, 'datatype': XSD + datatype}
+    return {'type': 'literal', 'value': token}
+
+
+def parse_csv_term(value: str) -> Optional[Dict[str, str]]:
+    """
+    Converte uma célula SPARQL CSV para o formato de binding do JSON.
+
+    O formato CSV não carrega tipos, então IRIs e blank nodes são inferidos pela forma do valor
+    e literais numéricos chegam sem datatype.
+    """
+    if value == '':
+        return None
+    if value.startswith('_:'):
+        return {'type': 'bnode', 'value': value[2:]}
+    if _SCHEME_RE.match(value):
+        return {'type': 'uri', 'value': value}
+    return {'type': 'literal', 'value': value}
+
+
+def iter_text_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Decodifica pedaços de bytes UTF-8 e os reagrupa em linhas (terminadas em \\n)."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    pending = ''
+    for chunk in chunks:
+        pending += decoder.decode(chunk)
+        if '\n' not in pending:
+            continue
+        lines = pending.split('\n')
+        pending = lines.pop()
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
+
+
+class _JsonBindingParser:
+    """
+    Parser incremental do formato application/sparql-results+json.
+
+    Lê o corpo em pedaços e decodifica um binding por vez, mantendo em memória apenas o
+    trecho ainda não consumido do buffer.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    def _read_more(self) -> bool:
+        if self._eof:
+            return False
+        # Descarta a parte já consumida antes de crescer o buffer
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self._buf += self._decoder.decode(chunk)
+                return True
+        self._buf += self._decoder.decode(b'', final=True)
+        self._eof = True
+        return False
+
+    def _skip(self, chars: str = ' \t\r\n'):
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in chars:
+                self._pos += 1
+            if self._pos < len(self._buf) or not self._read_more():
+                return
+
+    def _seek(self, *tokens: str) -> Optional[str]:
+        """Avança até logo depois do primeiro dos tokens encontrado e o retorna."""
+        longest = max(len(t) for t in tokens)
+        while True:
+            found = [(idx, t) for t in tokens for idx in [self._buf.find(t, self._pos)] if idx >= 0]
+            if found:
+                idx, token = min(found)
+                self._pos = idx + len(token)
+                return token
+            # Mantém o final do buffer caso o token esteja dividido entre dois pedaços
+            self._pos = max(self._pos, len(self._buf) - longest)
+            if not self._read_more():
+                return None
+
+    def _decode_value(self) -> Any:
+        while True:
+            self._skip()
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+                self._pos = end
+                return value
+            except json.JSONDecodeError:
+                if not self._read_more():
+                    raise
+
+    def read_variables(self) -> List[str]:
+        """Lê o cabeçalho até a lista de variáveis e posiciona o parser no início dos bindings."""
+        variables = []
+        token = self._seek('"vars"', '"bindings"')
+        if token == '"vars"':
+            self._skip(' \t\r\n:')
+            variables = self._decode_value()
+            token = self._seek('"bindings"')
+        if token is None:
+            return variables
+        self._skip(' \t\r\n:')
+        self._skip(' \t\r\n[')
+        return variables
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        while True:
+            self._skip(' \t\r\n,')
+            if self._pos >= len(self._buf) or self._buf[self._pos] == ']':
+                return
+            yield self._decode_value()
+
+
+class _ByteReader:
+    """Leitor de bytes sobre um iterável de pedaços, usado pelo decodificador Thrift."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._buf = b''
+        self._pos = 0
+
+    def _fill(self, n: int) -> bool:
+        while len(self._buf) - self._pos < n:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return False
+            self._buf = self._buf[self._pos:] + chunk
+            self._pos = 0
+        return True
+
+    def at_end(self) -> bool:
+        return not self._fill(1)
+
+    def read(self, n: int) -> bytes:
+        if not self._fill(n):
+            raise EOFError('Resposta Thrift truncada')
+        data = self._buf[self._pos:self._pos + n]
+        self._pos += n
+        return data
+
+    def read_byte(self) -> int:
+        if self._pos >= len(self._buf) and not self._fill(1):
+            raise EOFError('Resposta Thrift truncada')
+        value = self._buf[self._pos]
+        self._pos += 1
+        return value
+
+    def read_varint(self) -> int:
+        shift = 0
+        result = 0
+        while True:
+            byte = self.read_byte()
+            result |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return result
+            shift += 7
+
+
+# Tipos do protocolo Thrift compacto (TCompactProtocol)
+_CT_TRUE, _CT_FALSE, _CT_BYTE, _CT_I16, _CT_I32, _CT_I64 = 1, 2, 3, 4, 5, 6
+_CT_DOUBLE, _CT_BINARY, _CT_LIST, _CT_SET, _CT_MAP, _CT_STRUCT = 7, 8, 9, 10, 11, 12
+
+
+class _ThriftResultParser:
+    """
+    Decodificador do formato binário application/sparql-results+thrift do Jena.
+
+    A resposta é uma sequência de structs no protocolo Thrift compacto: um RDF_VarTuple com as
+    variáveis seguido de um RDF_DataTuple (lista de RDF_Term) por linha, conforme BinaryRDF.thrift.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._reader = _ByteReader(chunks)
+
+    def _zigzag(self) -> int:
+        value = self._reader.read_varint()
+        return (value >> 1) ^ -(value & 1)
+
+    def _read_value(self, ctype: int) -> Any:
+        reader = self._reader
+        if ctype == _CT_BINARY:
+            return reader.read(reader.read_varint())
+        if ctype in (_CT_I16, _CT_I32, _CT_I64):
+            return self._zigzag()
+        if ctype == _CT_STRUCT:
+            return self._read_struct()
+        if ctype in (_CT_LIST, _CT_SET):
+            header = reader.read_byte()
+            size = header >> 4
+            if size == 15:
+                size = reader.read_varint()
+            etype = header & 0x0F
+            if etype in (_CT_TRUE, _CT_FALSE):
+                return [reader.read_byte() == _CT_TRUE for _ in range(size)]
+            return [self._read_value(etype) for _ in range(size)]
+        if ctype == _CT_TRUE:
+            return True
+        if ctype == _CT_FALSE:
+            return False
+        if ctype == _CT_BYTE:
+            return reader.read_byte()
+        if ctype == _CT_DOUBLE:
+            return struct.unpack('<d', reader.read(8))[0]
+        if ctype == _CT_MAP:
+            size = reader.read_varint()
+            if not size:
+                return {}
+            types = reader.read_byte()
+            return {self._read_value(types >> 4): self._read_value(types & 0x0F) for _ in range(size)}
+        raise ValueError(f'Tipo Thrift desconhecido: {ctype}')
+
+    def _read_struct(self) -> Dict[int, Any]:
+        fields = {}
+        field_id = 0
+        while True:
+            header = self._reader.read_byte()
+            if header == 0:
+                return fields
+            delta = header >> 4
+            field_id = field_id + delta if delta else self._zigzag()
+            fields[field_id] = self._read_value(header & 0x0F)
+
+    @staticmethod
+    def _term(term: Dict[int, Any], previous: Optional[Dict[str, str]]) -> Optional[Dict[str, str]]:
+        """Converte um RDF_Term (union) para o formato de binding do JSON."""
+        if 1 in term:
+            return {'type': 'uri', 'value': term[1][1].decode('utf-8')}
+        if 3 in term:
+            literal = term[3]
+            result = {'type': 'literal', 'value': literal[1].decode('utf-8')}
+            if 2 in literal:
+                result['xml:lang'] = literal[2].decode('utf-8')
+            elif 3 in literal:
+                result['datatype'] = literal[3].decode('utf-8')
+            elif 4 in literal:
+                result['datatype'] = (literal[4][1] + b':' + literal[4][2]).decode('utf-8')
+            return result
+        if 2 in term:
+            return {'type': 'bnode', 'value': term[2][1].decode('utf-8')}
+        if 10 in term:
+            return {'type': 'literal', 'value': str(term[10]), 'datatype': XSD + 'integer'}
+        if 11 in term:
+            return {'type': 'literal', 'value': repr(term[11]), 'datatype': XSD + 'double'}
+        if 12 in term:
+            value, scale = term[12][1], term[12][2]
+            digits = str(abs(value)).rjust(scale + 1, '0')
+            lexical = ('-' if value < 0 else '') + (f'{digits[:-scale]}.{digits[-scale:]}' if scale > 0 else digits + '.0')
+            return {'type': 'literal', 'value': lexical, 'datatype': XSD + 'decimal'}
+        if 4 in term:
+            return {'type': 'uri', 'value': (term[4][1] + b':' + term[4][2]).decode('utf-8')}
+        if 8 in term:
+            return previous
+        return None
+
+    def read_variables(self) -> List[str]:
+        if self._reader.at_end():
+            return []
+        header = self._read_struct()
+        self.variables = [var[1].decode('utf-8') for var in header.get(1, [])]
+        return self.variables
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        variables = self.variables
+        previous: List[Optional[Dict[str, str]]] = [None] * len(variables)
+        while not self._reader.at_end():
+            row = self._read_struct().get(1, [])
+            binding = {}
+            for i, (var, term) in enumerate(zip(variables, row)):
+                value = self._term(term, previous[i])
+                previous[i] = value
+                if value is not None:
+                    binding[var] = value
+            yield binding
+
+
+_INTEGER_TYPES = frozenset(XSD + t for t in (
+    'integer', 'int', 'long', 'short', 'byte', 'nonNegativeInteger', 'nonPositiveInteger',
+    'positiveInteger', 'negativeInteger', 'unsignedLong', 'unsignedInt', 'unsignedShort', 'unsignedByte'))
+_FLOAT_TYPES = frozenset(XSD + t for t in ('decimal', 'double', 'float'))
+_DATETIME_TYPES = frozenset((XSD + 'dateTime', XSD + 'dateTimeStamp'))
+_TZ_OFFSET_RE = re.compile(r'[+-]\d\d:\d\d$')
+
+
+def _tsv_cell(token: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Classifica uma célula TSV sem montar o dict do binding.
+
+    Returns:
+        (tipo, lexical): tipo é 'uri', 'bnode', 'string' ou o IRI do datatype do literal
+    """
+    if not token:
+        return None, None
+    first = token[0]
+    if first == '<':
+        return 'uri', token[1:-1]
+    if first == '"':
+        end = token.rfind('"')
+        suffix = token[end + 1:]
+        datatype = suffix[3:-1] if suffix.startswith('^^') else 'string'
+        return datatype, _unescape(token[1:end])
+    if token.startswith('_:'):
+        return 'bnode', token[2:]
+    if token == 'true' or token == 'false':
+        return XSD + 'boolean', token
+    # Números abreviados do TSV: 12 (integer), 1.5 (decimal), 1.5e0 (double)
+    if 'e' in token or 'E' in token:
+        return XSD + 'double', token
+    return XSD + ('decimal' if '.' in token else 'integer'), token
+
+
+def _binding_cell(term: Optional[Dict[str, str]]) -> Tuple[Optional[str], Optional[str]]:
+    """Classifica um termo no formato de binding do JSON, como _tsv_cell."""
+    if term is None:
+        return None, None
+    if term['type'] == 'uri':
+        return 'uri', term['value']
+    if term['type'] == 'bnode':
+        return 'bnode', term['value']
+    return term.get('datatype', 'string'), term['value']
+
+
+def _parse_datetime(lexical: str) -> datetime:
+    value = datetime.fromisoformat(lexical.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _build_column(kinds: List[Optional[str]], values: List[Optional[str]]) -> Tuple[str, Any]:
+    """
+    Converte os valores de uma variável para um array tipado.
+
+    Números viram float64/int64, xsd:dateTime vira datetime64[ms] (em UTC), xsd:boolean vira
+    bool, IRIs viram strings internadas e o restante fica como objeto. Sem numpy, devolve
+    listas Python com os valores já convertidos.
+
+    Returns:
+        (tipo da coluna, array)
+    """
+    present = {kind for kind in kinds if kind is not None}
+    missing = len(present) < len(set(kinds))
+    kind = present.pop() if len(present) == 1 else ('mixed' if present else 'empty')
+    if kind in _INTEGER_TYPES and not missing:
+        if np is not None:
+            return kind, np.array(values, dtype=np.int64)
+        return kind, [int(v) for v in values]
+    if kind in _INTEGER_TYPES or kind in _FLOAT_TYPES:
+        if np is not None:
+            return kind, np.array(['nan' if v is None else v for v in values], dtype=np.float64)
+        return kind, [float('nan') if v is None else float(v) for v in values]
+    if kind in _DATETIME_TYPES:
+        if np is not None and not any(v is not None and _TZ_OFFSET_RE.search(v) for v in values):
+            # Sem offsets (apenas UTC "Z" ou horário local) o NumPy converte direto das strings
+            return kind, np.array(['NaT' if v is None else v.rstrip('Z') for v in values], dtype='datetime64[ms]')
+        parsed = [None if v is None else _parse_datetime(v) for v in values]
+        if np is not None:
+            return kind, np.array(['NaT' if v is None else v for v in parsed], dtype='datetime64[ms]')
+        return kind, parsed
+    if kind == XSD + 'date':
+        if np is not None:
+            return kind, np.array(['NaT' if v is None else v[:10] for v in values], dtype='datetime64[D]')
+        return kind, [None if v is None else datetime.fromisoformat(v[:10]).date() for v in values]
+    if kind == XSD + 'boolean' and not missing:
+        converted = [v in ('true', '1') for v in values]
+        return kind, np.array(converted, dtype=bool) if np is not None else converted
+    if kind == 'uri':
+        values = [None if v is None else sys.intern(v) for v in values]
+    if np is not None:
+        column = np.empty(len(values), dtype=object)
+        column[:] = values
+        return kind, column
+    return kind, values
+
+
+class ColumnarResult:
+    """
+    Resultado de SELECT organizado por coluna (um array por variável)
+
+    Evita criar um dict por binding: cada variável vira um único array NumPy tipado pelo
+    datatype dos literais, pronto para análise ou para conversão em pandas/Arrow.
+    """
+
+    def __init__(self, variables: List[str], columns: Dict[str, Any], types: Dict[str, str], count: int):
+        self.variables = variables
+        self.columns = columns
+        self.types = types
+        self.count = count
+
+    @classmethod
+    def from_cells(cls, variables: List[str], rows: Iterable[List[Tuple[Optional[str], Optional[str]]]]):
+        """
+        Monta as colunas a partir de linhas de células (tipo, lexical).
+
+        Args:
+            variables: Nomes das variáveis, na ordem das células
+            rows: Iterável de linhas, cada uma com uma célula por variável
+        """
+        kinds: List[List[Optional[str]]] = [[] for _ in variables]
+        values: List[List[Optional[str]]] = [[] for _ in variables]
+        count = 0
+        for row in rows:
+            count += 1
+            for i, (kind, value) in enumerate(row):
+                kinds[i].append(kind)
+                values[i].append(value)
+        columns = {}
+        types = {}
+        for i, var in enumerate(variables):
+            types[var], columns[var] = _build_column(kinds[i], values[i])
+        return cls(variables, columns, types, count)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, variable: str):
+        return self.columns[variable]
+
+    def to_pandas(self):
+        """Converte para pandas.DataFrame (as colunas NumPy são reaproveitadas sem cópia)."""
+        import pandas as pd
+        return pd.DataFrame({var: self.columns[var] for var in self.variables}, columns=self.variables)
+
+    def to_arrow(self):
+        """Converte para pyarrow.Table."""
+        import pyarrow as pa
+        return pa.table({var: pa.array(self.columns[var]) for var in self.variables})
+
+
+class SelectStream:
+    """
+    Iterador sobre os bindings de uma query SELECT, lidos da resposta HTTP sob demanda.
+
+    Cada item tem o mesmo formato de SparqlQuery.select()['results']. Em caso de erro a
+    iteração não produz itens e os atributos success/message/status_code/error descrevem a
+    falha (assim como os dicts de resultado das demais operações). Sair de um laço for (fim,
+    break ou exceção), chamar close() ou usar o objeto como context manager fecha a conexão;
+    quem lê com next() deve chamar close() ou usar "with".
+    """
+
+    def __init__(self, response: Optional[requests.Response] = None, result_format: str = 'json',
+                 chunk_size: int = 65536, message: str = '', status_code: Optional[int] = None,
+                 error: Optional[str] = None):
+        self.response = response
+        self.format = result_format
+        self.chunk_size = chunk_size
+        self.variables: List[str] = []
+        self.count = 0
+        self.success = response is not None and error is None
+        self.message = message
+        self.status_code = status_code if status_code is not None else getattr(response, 'status_code', None)
+        self.error = error
+        self._rows: Iterator[Dict[str, Any]] = iter(())
+        self._lines: Optional[Iterator[str]] = None
+        self._closed = False
+        self._close_callbacks: List[Callable[[], None]] = []
+        if self.success:
+            try:
+                self._rows = self._open()
+            except Exception as e:
+                self._fail(e)
+
+    def _open(self) -> Iterator[Dict[str, Any]]:
+        chunks = self.response.iter_content(chunk_size=self.chunk_size)
+        if self.format == 'json':
+            parser = _JsonBindingParser(chunks)
+            self.variables = parser.read_variables()
+            return iter(parser)
+
+        if self.format == 'thrift':
+            parser = _ThriftResultParser(chunks)
+            self.variables = parser.read_variables()
+            return iter(parser)
+
+        text = iter_text_lines(chunks)
+        if self.format == 'tsv':
+            header = next(text, '').rstrip('\r\n')
+            self.variables = [v.lstrip('?$') for v in header.split('\t')] if header else []
+            self._lines = text
+            return self._tsv_rows(text)
+        if self.format == 'csv':
+            reader = csv.reader(text)
+            self.variables = next(reader, [])
+            return self._csv_rows(reader)
+        raise ValueError(f'Formato de resultado não suportado: {self.format}')
+
+    def _tsv_rows(self, text: Iterator[str]) -> Iterator[Dict[str, Any]]:
+        variables = self.variables
+        for line in text:
+            line = line.rstrip('\r\n')
+            if not line:
+                continue
+            row = {}
+            for var, token in zip(variables, line.split('\t')):
+                term = parse_tsv_term(token)
+                if term is not None:
+                    row[var] = term
+            yield row
+
+    def _csv_rows(self, reader) -> Iterator[Dict[str, Any]]:
+        variables = self.variables
+        for cells in reader:
+            row = {}
+            for var, value in zip(variables, cells):
+                term = parse_csv_term(value)
+                if term is not None:
+                    row[var] = term
+            yield row
+
+    def columns(self) -> ColumnarResult:
+        """
+        Consome o restante do stream e devolve os resultados em formato colunar.
+
+        No formato TSV as células são decodificadas direto para as colunas, sem passar pelos
+        dicts de binding.
+        """
+        variables = self.variables
+        if self._lines is not None and self.count == 0:
+            def rows():
+                width = len(variables)
+                for line in self._lines:
+                    line = line.rstrip('\r\n')
+                    if not line:
+                        continue
+                    tokens = line.split('\t')
+                    if len(tokens) < width:
+                        tokens += [''] * (width - len(tokens))
+                    yield [_tsv_cell(token) for token in tokens[:width]]
+        else:
+            def rows():
+                for binding in self:
+                    yield [_binding_cell(binding.get(var)) for var in variables]
+        try:
+            result = ColumnarResult.from_cells(variables, rows())
+        except Exception as e:
+            self._fail(e)
+            return ColumnarResult.from_cells(variables, [])
+        self.count = result.count
+        self.close()
+        return result
+
+    def _fail(self, e: Exception):
+        self.success = False
+        self.message = f"Erro ao ler resultados: {str(e)}"
+        self.error = str(e)
+        self.close()
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # Um gerador: ao sair do laço antes do fim (break, exceção) o finally devolve a conexão ao pool
+        try:
+            while True:
+                try:
+                    row = next(self)
+                except StopIteration:
+                    return
+                yield row
+        finally:
+            self.close()
+
+    def __next__(self) -> Dict[str, Any]:
+        try:
+            row = next(self._rows)
+        except StopIteration:
+            self.close()
+            raise
+        except Exception as e:
+            self._fail(e)
+            raise StopIteration
+        self.count += 1
+        return row
+
+    def on_close(self, callback: Callable[[], None]):
+        """Registra uma função chamada uma vez quando o stream for fechado (na hora, se já estiver)."""
+        if self._closed:
+            callback()
+        else:
+            self._close_callbacks.append(callback)
+
+    def close(self):
+        """Interrompe a leitura e devolve/fecha a conexão HTTP."""
+        self._rows = iter(())
+        if self.response is not None:
+            self.response.close()
+            self.response = None
+        self._closed = True
+        callbacks, self._close_callbacks = self._close_callbacks, []
+        for callback in callbacks:
+            callback()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,218 @@
+import itertools
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from RdfFormats import rename_bnodes, split_prefixes
+
+
+class TurtleBatchWriter:
+    """
+    Acumula pequenos trechos Turtle e os envia ao Fuseki em requisições grandes
+
+    Cada requisição é uma única transação de escrita no TDB2, então juntar centenas de trechos
+    (ex.: um METAR cada) em um só envio multiplica a vazão. Os prefixos dos trechos são
+    reunidos em um único bloco no início do lote; se um trecho declara um prefixo já usado no
+    lote com outro IRI, o lote atual é enviado antes. Rótulos de blank node recebem um sufixo
+    por trecho, para que trechos diferentes não passem a compartilhar nós.
+
+    Um lote é fechado quando atinge max_bytes ou max_snippets, ou quando o trecho mais antigo
+    espera há max_delay segundos, e é enviado por uma thread em segundo plano. Se o Fuseki não
+    acompanhar e max_pending lotes estiverem aguardando envio, write() bloqueia até haver espaço.
+
+    Use com "with" (ou chame close()) para garantir que tudo seja enviado.
+    """
+
+    def __init__(self, loader, graph_uri: Optional[str] = None, max_bytes: int = 4 * 1024 * 1024,
+                 max_snippets: int = 10000, max_delay: Optional[float] = 2.0, max_pending: int = 4):
+        """
+        Inicializa o writer e a thread de envio.
+
+        Args:
+            loader: TurtleLoader usado para os envios
+            graph_uri: URI do grafo nomeado de destino (opcional)
+            max_bytes: Tamanho máximo de um lote em bytes
+            max_snippets: Número máximo de trechos por lote
+            max_delay: Tempo máximo em segundos que um trecho espera no buffer (None = sem limite)
+            max_pending: Lotes fechados aguardando envio antes de write() bloquear
+        """
+        self.loader = loader
+        self.graph_uri = graph_uri
+        self.max_bytes = max_bytes
+        self.max_snippets = max_snippets
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+
+        self.batches_sent = 0
+        self.snippets_sent = 0
+        self.bytes_sent = 0
+        self.triples_sent = 0
+        self.failures: List[Dict[str, Any]] = []
+
+        self._cond = threading.Condition()
+        self._parts: List[bytes] = []
+        self._prefixes: Dict[str, str] = {}
+        self._base: Optional[str] = None
+        self._size = 0
+        self._started = 0.0
+        self._snippet_ids = itertools.count(1)
+        self._sealed = deque()
+        self._uploading = 0
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='TurtleBatchWriter', daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def write(self, snippet: str):
+        """
+        Adiciona um trecho Turtle ao lote atual.
+
+        Bloqueia enquanto houver max_pending lotes aguardando envio (backpressure).
+
+        Args:
+            snippet: Trecho Turtle completo (com seus próprios @prefix, se usar prefixos)
+        """
+        snippet = rename_bnodes(snippet, f'w{next(self._snippet_ids)}_')
+        try:
+            prefixes, base, body = split_prefixes(snippet)
+            standalone = False
+        except ValueError:
+            # O trecho redefine prefixos internamente: é enviado sozinho, sem alterações
+            prefixes, base, body = {}, None, snippet
+            standalone = True
+        data = body.encode('utf-8')
+
+        with self._cond:
+            while len(self._sealed) >= self.max_pending and not self._closed:
+                self._cond.wait()
+            if self._closed:
+                raise ValueError('TurtleBatchWriter já foi fechado')
+
+            conflict = (base != self._base or any(self._prefixes.get(name, iri) != iri
+                                                  for name, iri in prefixes.items()))
+            if self._parts and (standalone or conflict):
+                self._seal()
+            if not self._parts:
+                self._started = time.monotonic()
+                self._base = base
+            self._prefixes.update(prefixes)
+            self._parts.append(data)
+            self._size += len(data)
+            if standalone or self._size >= self.max_bytes or len(self._parts) >= self.max_snippets:
+                self._seal()
+            self._cond.notify_all()
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Envia o lote atual e espera até que todos os lotes pendentes tenham sido enviados.
+
+        Returns:
+            dict com o status dos envios feitos desde o último flush
+        """
+        with self._cond:
+            failures_before = len(self.failures)
+            batches_before = self.batches_sent
+            self._seal()
+            while self._sealed or self._uploading:
+                self._cond.wait()
+            failures = self.failures[failures_before:]
+            batches = self.batches_sent - batches_before
+        return {
+            "success": not failures,
+            "message": f"{batches} lotes enviados, {len(failures)} com falha",
+            "failures": failures
+        }
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Envia tudo o que estiver pendente e encerra a thread de envio.
+
+        Returns:
+            dict com o status dos envios feitos desde o último flush
+        """
+        with self._cond:
+            if self._closed:
+                return {"success": True, "message": "TurtleBatchWriter já estava fechado", "failures": []}
+            failures_before = len(self.failures)
+            batches_before = self.batches_sent
+            self._closed = True
+            self._seal()
+            self._cond.notify_all()
+        self._thread.join()
+        failures = self.failures[failures_before:]
+        return {
+            "success": not failures,
+            "message": f"{self.batches_sent - batches_before} lotes enviados, {len(failures)} com falha",
+            "failures": failures
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna os contadores de lotes, trechos, bytes e triplas enviados."""
+        with self._cond:
+            return {
+                "batches_sent": self.batches_sent,
+                "snippets_sent": self.snippets_sent,
+                "bytes_sent": self.bytes_sent,
+                "triples_sent": self.triples_sent,
+                "buffered_snippets": len(self._parts),
+                "pending_batches": len(self._sealed),
+                "failures": len(self.failures)
+            }
+
+    def _seal(self):
+        # Chamado com self._cond adquirido
+        if not self._parts:
+            return
+        header = ''
+        if self._base is not None:
+            header += f'@base <{self._base}> .\n'
+        header += ''.join(f'@prefix {name}: <{iri}> .\n' for name, iri in self._prefixes.items())
+        body = header.encode('utf-8') + b'\n'.join(self._parts) + b'\n'
+        self._sealed.append((body, len(self._parts)))
+        self._parts = []
+        self._prefixes = {}
+        self._base = None
+        self._size = 0
+        self._cond.notify_all()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._sealed and not self._closed:
+                    if self._parts and self.max_delay is not None:
+                        remaining = self._started + self.max_delay - time.monotonic()
+                        if remaining <= 0:
+                            self._seal()
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if not self._sealed:
+                    return
+                body, snippets = self._sealed.popleft()
+                self._uploading += 1
+                self._cond.notify_all()
+
+            result = self.loader._post_data(body, self.graph_uri)
+
+            with self._cond:
+                self._uploading -= 1
+                if result['success']:
+                    self.batches_sent += 1
+                    self.snippets_sent += snippets
+                    self.bytes_sent += len(body)
+                    self.triples_sent += result.get('triple_count') or 0
+                else:
+                    self.failures.append({
+                        "snippets": snippets,
+                        "bytes": len(body),
+                        "message": result.get('message'),
+                        "status_code": result.get('status_code')
+                    })
+                self._cond.notify_all()
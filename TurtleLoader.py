@@ -1,10 +1,31 @@
+import hashlib
+import json
 import os
 import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
-from typing import Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote
 from requests.auth import HTTPBasicAuth
 
+from FusekiLogging import instance_logger
+from FusekiSession import FusekiSession
+from Metrics import Metrics, in_current_call, instrumented, observe_response
+from QueryCache import QueryCache
+from QueryTemplate import Literal
+from Resilience import CircuitBreaker, RetryPolicy
+from TurtleBatchWriter import TurtleBatchWriter
+from Enrichment import DateTimeEnricher
+from RdfFormats import (LINE_FORMATS, TurtleToNTriples, content_type, detect_format, iter_line_blocks, open_rdf,
+                        sniff_format, split_lines_file, split_turtle_as_ntriples, split_turtle_file)
+
+
+# Formatos que podem ser enriquecidos durante a carga (Turtle é convertido para N-Triples)
+ENRICH_FORMATS = ('ttl',) + LINE_FORMATS
+
 
 class TurtleLoader:
     """
@@ -12,32 +33,100 @@ class TurtleLoader:
     """
 
     def __init__(self, fuseki_url: str = "http://localhost:3030", dataset: str = "airdata",
-                 auth_user: str = "admin", auth_pass: str = "admin123", verbose: bool=True):
+                 auth_user: str = "admin", auth_pass: str = "admin123", verbose: bool = True,
+                 session: Optional[FusekiSession] = None, pool_size: int = 10,
+                 timeout: Union[float, Tuple[float, float]] = (5, 300),
+                 retries: int = 3, backoff_factor: float = 0.5,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 circuit_breaker: Union[CircuitBreaker, bool] = True,
+                 cache: Optional[QueryCache] = None, metrics: Optional[Metrics] = None,
+                 slow_query_seconds: Optional[float] = None,
+                 listeners: Optional[List[Callable[[Dict[str, Any]], None]]] = None):
         """
         Inicializa o loader com a URL do Fuseki e o dataset.
 
         Args:
             fuseki_url: URL base do servidor Fuseki (padrão: http://localhost:3030)
             dataset: Nome do dataset no Fuseki (padrão: ds)
+            verbose: Mostra no stdout cada etapa das cargas desta instância (logger "fuseki.loader"
+                em nível DEBUG; padrão: True). Para outros destinos/níveis use FusekiLogging.configure_logging
+            session: Sessão HTTP compartilhada (ex.: a mesma de um SparqlQuery). Se None, cria uma própria
+            pool_size: Tamanho do pool de conexões (usado apenas se session for None)
+            timeout: Timeout padrão por requisição (usado apenas se session for None)
+            retries: Novas tentativas em falhas de conexão/5xx (usado apenas se session for None)
+            backoff_factor: Fator do backoff exponencial (usado apenas se session for None)
+            retry_policy: Política de novas tentativas completa (usado apenas se session for None)
+            circuit_breaker: CircuitBreaker da sessão, True para um padrão ou False para desativar
+                (usado apenas se session for None)
+            cache: Cache de resultados compartilhado com um SparqlQuery (opcional). Cada carga ou
+                limpeza invalida as entradas deste dataset
+            metrics: Registro de métricas (opcional). Cada carga, limpeza e envio HTTP registra
+                tempo total, TTFB, bytes, triplas, novas tentativas e status
+            slow_query_seconds: Chamadas que levarem ao menos esse tempo são registradas como
+                WARNING, mesmo com o nível DEBUG desligado (None desativa)
+            listeners: Funções chamadas com um evento a cada escrita bem-sucedida (ver add_listener)
         """
         self.fuseki_url = fuseki_url.rstrip('/')
         self.dataset = dataset
         self.data_endpoint = f"{self.fuseki_url}/{dataset}/data"
+        self.update_endpoint = f"{self.fuseki_url}/{dataset}/update"
         self.auth = HTTPBasicAuth(auth_user, auth_pass) if auth_user and auth_pass else None
         self.verbose = verbose
-        print('Instância da classe TurtleLoader criada!')
-        print('informações do objeto:')
-        print(f'{self.fuseki_url=}')
-        print(f'{self.dataset=}')
-        print(f'{self.data_endpoint=}')
-        print(f'{self.verbose=}')
-
-    def print(self, *args, **kwargs):
-        if self.verbose:
-            print(*args, **kwargs)
+        self.cache = cache
+        self.metrics = metrics
+        self.slow_query_seconds = slow_query_seconds
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = list(listeners or [])
+        self.listener_errors = 0
+        self.log = instance_logger('loader', verbose)
+        self._owns_session = session is None
+        self.session = session or FusekiSession(pool_size=pool_size, timeout=timeout,
+                                                retries=retries, backoff_factor=backoff_factor,
+                                                retry_policy=retry_policy, circuit_breaker=circuit_breaker)
+        self.log.debug('Instância da classe TurtleLoader criada: fuseki_url=%s dataset=%s data_endpoint=%s',
+                       self.fuseki_url, self.dataset, self.data_endpoint)
+
+    def print(self, *args, sep: str = ' ', **kwargs):
+        """Mantido por compatibilidade: registra a mensagem em self.log, que verbose=True mostra no stdout."""
+        self.log.info(sep.join(str(arg) for arg in args))
+
+    def close(self):
+        """Fecha a sessão HTTP, caso ela tenha sido criada por este objeto."""
+        if self._owns_session:
+            self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _cache_invalidate(self):
+        if self.cache is not None:
+            self.cache.invalidate(f'{self.fuseki_url}/{self.dataset}')
+
+    def add_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Registra uma função chamada após cada escrita bem-sucedida no dataset (ex.: para atualizar
+        visões materializadas).
 
+        O evento é um dict com "operation" ('load', 'replace', 'delete' ou 'update') e "graph_uri";
+        cargas trazem também "source" (caminho do arquivo), "data" (corpo em bytes, se houver) e
+        "content_type". Em bulk_load_directory a função é chamada pelas threads de upload.
+        """
+        self.listeners.append(listener)
+
+    def _notify(self, event: Dict[str, Any]):
+        for listener in self.listeners:
+            try:
+                listener(event)
+            except Exception:
+                # Um listener com defeito não pode transformar uma carga bem-sucedida em falha
+                self.listener_errors += 1
+                self.log.warning('Erro em listener de escrita', exc_info=True)
+
+    @instrumented('load_from_directory')
     def load_from_directory(self, dir_path: str, graph_uri: Optional[str] = None) -> dict:
-        self.print(f'Arquivos serão carregados pelo diretório {dir_path}')
+        self.log.info('Arquivos serão carregados pelo diretório %s', dir_path)
 
         # estrutura "total" de result = {
         #     'success': bool,
@@ -51,41 +140,396 @@ class TurtleLoader:
             'message': [],
             'status_code': [],
             'error': [],
-            'traceback': []
+            'traceback': [],
+            'skipped': []
         }
         for dir, _, file_names in os.walk(dir_path):
             for file_name in file_names:
                 file_path = os.path.join(dir, file_name)
-                self.print(f'Arquivo selecionado: {file_path}')
-                result = self.load_from_file(file_path=file_path, graph_uri=graph_uri)
-                self.print(result)
+                rdf_format = detect_format(file_path)
+                if rdf_format is None:
+                    self.log.debug('Arquivo ignorado (não é RDF): %s', file_path)
+                    total_result['skipped'].append(file_path)
+                    continue
+                self.log.debug('Arquivo selecionado: %s (%s)', file_path, rdf_format)
+                result = self.load_from_file(file_path=file_path, graph_uri=graph_uri, rdf_format=rdf_format)
+                self.log.debug('%s', result)
 
                 # Armazena os resultados de todas as inserções
-                possible_fields = ['succes', 'message', 'status_code', 'error', 'traceback']
+                possible_fields = ['success', 'message', 'status_code', 'error', 'traceback']
                 for field in possible_fields:
                     if field in result.keys():
                         total_result[field].append(result[field])
                     else:
                         total_result[field].append(None)
 
-        self.print('Arquivos carregados com sucesso, retornando resultados')
+        self.log.info('Arquivos carregados com sucesso, retornando resultados')
         return total_result
-    def load_from_file(self, file_path: str, graph_uri: Optional[str] = None) -> dict:
+
+    @instrumented('bulk_load_directory')
+    def bulk_load_directory(self, dir_path: str, graph_uri: Optional[str] = None, workers: int = 4,
+                            chunk_bytes: Optional[int] = 64 * 1024 * 1024,
+                            convert_turtle: bool = False,
+                            enrich: Optional[DateTimeEnricher] = None) -> dict:
         """
-        Carrega um arquivo .ttl no Fuseki.
+        Carrega todos os arquivos RDF de um diretório em paralelo.
+
+        Os arquivos são enviados em streaming por um pool de threads, cada um com o Content-Type
+        do seu formato; arquivos que não são RDF são ignorados. Arquivos maiores que chunk_bytes
+        são divididos: N-Triples/N-Quads em fins de linha e Turtle no fim de uma sentença, com o
+        bloco de prefixos repetido em cada pedaço (arquivos .gz e demais formatos são enviados
+        inteiros). Para que a sessão comporte as threads, use pool_size >= workers.
 
         Args:
-            file_path: Caminho para o arquivo .ttl
-            graph_uri: URI do grafo nomeado (opcional, se None usa o grafo padrão)
+            dir_path: Diretório com os arquivos
+            graph_uri: URI do grafo nomeado (opcional)
+            workers: Número de uploads simultâneos
+            chunk_bytes: Tamanho aproximado de cada pedaço (None desativa a divisão)
+            convert_turtle: Converte os arquivos Turtle grandes para N-Triples no cliente (em
+                workers processos) antes do envio, que é mais barato para o parser do Fuseki
+            enrich: Enriquecedor aplicado a cada pedaço nas threads de upload (ex.:
+                DateTimeEnricher()). Turtle grande é sempre convertido para N-Triples; arquivos
+                de outros formatos são enviados sem enriquecimento
+
+        Returns:
+            dict com o status de cada arquivo e a vazão agregada (triplas/s e bytes/s)
+        """
+        self.log.info('Carga paralela do diretório %s com %d workers', dir_path, workers)
+        files = {}
+        skipped = []
+        for dir, _, file_names in os.walk(dir_path):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir, file_name)
+                rdf_format = detect_format(file_path)
+                if rdf_format is None:
+                    self.log.debug('Arquivo ignorado (não é RDF): %s', file_path)
+                    skipped.append(file_path)
+                    continue
+                if enrich is not None and rdf_format not in ENRICH_FORMATS:
+                    self.log.warning('Arquivo enviado sem enriquecimento (formato %s): %s', rdf_format, file_path)
+                files[file_path] = {
+                    'file': file_path,
+                    'format': rdf_format,
+                    'success': True,
+                    'chunks': 0,
+                    'bytes': 0,
+                    'triples': 0,
+                    'seconds': 0.0,
+                    'message': [],
+                    'status_code': []
+                }
+
+        lock = threading.Lock()
+        # Limita os pedaços em memória aguardando envio
+        in_flight = threading.BoundedSemaphore(workers * 2)
+
+        def upload(file_path: str, data: Optional[bytes], rdf_format: str):
+            start = time.perf_counter()
+            size = 0
+            try:
+                enrich_file = enrich if rdf_format in ENRICH_FORMATS else None
+                if data is None:
+                    size = os.path.getsize(file_path)
+                    result = self.load_from_file(file_path, graph_uri, rdf_format, enrich=enrich_file)
+                else:
+                    size = len(data)
+                    if enrich_file is not None:
+                        data = enrich_file.enrich(data)
+                    result = self._post_data(data, graph_uri, content_type=content_type(rdf_format))
+            except Exception as e:
+                # Ex.: UnicodeDecodeError ao enriquecer um literal que não é UTF-8. A falha fica
+                # no status do arquivo, sem interromper a carga dos demais
+                self.log.warning('Erro ao ler %s: %s', file_path, e)
+                result = {"success": False, "message": f"Erro ao ler arquivo: {str(e)}", "error": str(e)}
+            finally:
+                in_flight.release()
+            elapsed = time.perf_counter() - start
+            with lock:
+                status = files[file_path]
+                status['chunks'] += 1
+                status['bytes'] += size
+                status['triples'] += result.get('triple_count') or 0
+                status['seconds'] += elapsed
+                status['success'] = status['success'] and result['success']
+                if not result['success']:
+                    status['message'].append(result.get('message'))
+                    status['status_code'].append(result.get('status_code'))
+
+        def chunks(file_path: str, rdf_format: str):
+            # None indica que o arquivo inteiro é enviado em streaming por load_from_file
+            large = chunk_bytes and not file_path.endswith('.gz') and os.path.getsize(file_path) > chunk_bytes
+            if large and rdf_format == 'ttl' and (convert_turtle or enrich is not None):
+                for data in split_turtle_as_ntriples(file_path, chunk_bytes, processes=workers):
+                    yield data, 'nt'
+            elif large and rdf_format == 'ttl':
+                for data in split_turtle_file(file_path, chunk_bytes):
+                    yield data, rdf_format
+            elif large and rdf_format in LINE_FORMATS:
+                for data in split_lines_file(file_path, chunk_bytes):
+                    yield data, rdf_format
+            else:
+                yield None, rdf_format
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = []
+            for file_path, status in files.items():
+                try:
+                    for data, rdf_format in chunks(file_path, status['format']):
+                        in_flight.acquire()
+                        futures.append(executor.submit(in_current_call(upload), file_path, data, rdf_format))
+                except Exception as e:
+                    with lock:
+                        files[file_path]['success'] = False
+                        files[file_path]['message'].append(f"Erro ao ler arquivo: {str(e)}")
+            for future in futures:
+                future.result()
+        elapsed = time.perf_counter() - start
+
+        total_bytes = sum(status['bytes'] for status in files.values())
+        total_triples = sum(status['triples'] for status in files.values())
+        loaded = sum(1 for status in files.values() if status['success'])
+        self.log.info('%d/%d arquivos carregados em %.1fs', loaded, len(files), elapsed)
+        result = {
+            "success": loaded == len(files),
+            "message": f"{loaded}/{len(files)} arquivos carregados",
+            "files": list(files.values()),
+            "skipped": skipped,
+            "total_files": len(files),
+            "total_bytes": total_bytes,
+            "total_triples": total_triples,
+            "elapsed_seconds": elapsed,
+            "bytes_per_second": total_bytes / elapsed if elapsed else 0.0,
+            "triples_per_second": total_triples / elapsed if elapsed else 0.0
+        }
+        if enrich is not None:
+            result["enrichment"] = enrich.stats()
+        return result
+
+    @instrumented('sync_directory')
+    def sync_directory(self, dir_path: str, manifest_path: Optional[str] = None,
+                       graph_prefix: str = 'urn:airdata:file:', workers: int = 4,
+                       delete_missing: bool = False, default_graph: bool = True,
+                       checkpoint_every: int = 100, checkpoint_seconds: float = 30.0) -> dict:
+        """
+        Sincroniza um diretório com o dataset, enviando apenas arquivos novos ou alterados.
+
+        Cada arquivo é carregado em um grafo nomeado próprio (graph_prefix + caminho relativo),
+        sempre com PUT: um arquivo alterado substitui o conteúdo anterior do seu grafo, e repetir
+        um envio interrompido não duplica triplas. Um manifesto JSON guarda, por arquivo, tamanho,
+        mtime, SHA-256 e grafo de destino; ele é gravado a cada checkpoint_every envios ou
+        checkpoint_seconds segundos e no final, então uma nova execução após uma falha continua
+        do último checkpoint (reenviar os arquivos seguintes é seguro). O hash só é calculado
+        quando tamanho ou mtime mudaram, de modo que reexecutar sobre um diretório já
+        sincronizado custa apenas um stat por arquivo.
+
+        Com default_graph=True as triplas de cada arquivo também são copiadas (ADD) para o grafo
+        padrão, onde as queries do projeto (teste_select_*, FlightWeather, MaterializedViews)
+        as procuram. O grafo do arquivo serve de registro do que ele contribuiu: antes de
+        reenviar ou remover um arquivo, as triplas antigas dele são apagadas do grafo padrão,
+        exceto as que outro arquivo sincronizado também contém. Uma tripla que também tenha sido
+        carregada no grafo padrão por outro meio (ex.: bulk_load_directory) é apagada junto.
+
+        Formatos de quads (nq, trig) não são suportados, pois não cabem em um único grafo.
+
+        Args:
+            dir_path: Diretório com os arquivos
+            manifest_path: Caminho do manifesto (padrão: .fuseki_sync.json dentro de dir_path)
+            graph_prefix: Prefixo dos URIs dos grafos de cada arquivo
+            workers: Número de uploads simultâneos
+            delete_missing: Remove (DELETE) os grafos de arquivos que não existem mais
+            default_graph: Copia as triplas de cada arquivo para o grafo padrão (False as deixa
+                só no grafo nomeado do arquivo, visível apenas com GRAPH/FROM)
+            checkpoint_every: Envios bem-sucedidos entre gravações do manifesto
+            checkpoint_seconds: Tempo máximo em segundos entre gravações do manifesto
+
+        Returns:
+            dict com os arquivos enviados, inalterados, removidos, ignorados e com falha
+        """
+        manifest_path = manifest_path or os.path.join(dir_path, '.fuseki_sync.json')
+        target = f'{self.fuseki_url}/{self.dataset}'
+        manifest = self._load_manifest(manifest_path, target)
+        entries = manifest['files']
+        lock = threading.Lock()
+        report = {'uploaded': [], 'unchanged': 0, 'deleted': [], 'skipped': [], 'failed': []}
+        checkpoint = {'pending': 0, 'saved_at': time.monotonic()}
+
+        self.log.info('Sincronizando %s (manifesto: %s)', dir_path, manifest_path)
+        start = time.perf_counter()
+        pending = []
+        seen = set()
+        for dir, _, file_names in os.walk(dir_path):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(dir, file_name)
+                if os.path.abspath(file_path) in (os.path.abspath(manifest_path), os.path.abspath(f'{manifest_path}.tmp')):
+                    continue
+                rel_path = os.path.relpath(file_path, dir_path).replace(os.sep, '/')
+                rdf_format = detect_format(file_path)
+                if rdf_format is None or rdf_format in ('nq', 'trig'):
+                    report['skipped'].append(rel_path)
+                    continue
+                seen.add(rel_path)
+                stat = os.stat(file_path)
+                entry = entries.get(rel_path)
+                if entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime:
+                    report['unchanged'] += 1
+                    continue
+                sha256 = self._file_sha256(file_path)
+                if entry and entry['sha256'] == sha256:
+                    # Apenas o mtime mudou (ex.: arquivo copiado de novo): nada a enviar
+                    entry['mtime'] = stat.st_mtime
+                    report['unchanged'] += 1
+                    continue
+                pending.append((file_path, rel_path, rdf_format, stat, sha256))
+
+        def upload(file_path: str, rel_path: str, rdf_format: str, stat: os.stat_result, sha256: str):
+            graph_uri = graph_prefix + quote(rel_path, safe='/')
+            # Sempre, mesmo sem entrada no manifesto: um envio anterior pode ter parado depois do ADD
+            result = self._unmirror_graph(graph_uri, graph_prefix) if default_graph else {'success': True}
+            if result['success']:
+                result = self.load_from_file(file_path, graph_uri, rdf_format, replace=True)
+            if result['success'] and default_graph:
+                result = self._update(f'ADD SILENT GRAPH <{graph_uri}> TO DEFAULT',
+                                      f'Grafo <{graph_uri}> copiado para o grafo padrão')
+            with lock:
+                if result['success']:
+                    entries[rel_path] = {
+                        'size': stat.st_size,
+                        'mtime': stat.st_mtime,
+                        'sha256': sha256,
+                        'graph': graph_uri,
+                        'format': rdf_format,
+                        'loaded_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+                    }
+                    report['uploaded'].append(rel_path)
+                    checkpoint['pending'] += 1
+                    if (checkpoint['pending'] >= checkpoint_every
+                            or time.monotonic() - checkpoint['saved_at'] >= checkpoint_seconds):
+                        self._save_manifest(manifest_path, manifest)
+                        checkpoint['pending'], checkpoint['saved_at'] = 0, time.monotonic()
+                else:
+                    report['failed'].append({'file': rel_path, 'message': result.get('message'),
+                                             'status_code': result.get('status_code')})
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for future in [executor.submit(in_current_call(upload), *item) for item in pending]:
+                future.result()
+
+        if delete_missing:
+            for rel_path in sorted(set(entries) - seen):
+                graph_uri = entries[rel_path]['graph']
+                result = self._unmirror_graph(graph_uri, graph_prefix) if default_graph else {'success': True}
+                if result['success']:
+                    result = self.delete_graph(graph_uri)
+                if result['success'] or result.get('status_code') == 404:
+                    del entries[rel_path]
+                    report['deleted'].append(rel_path)
+                else:
+                    report['failed'].append({'file': rel_path, 'message': result.get('message'),
+                                             'status_code': result.get('status_code')})
+        self._save_manifest(manifest_path, manifest)
+        elapsed = time.perf_counter() - start
+
+        message = (f"{len(report['uploaded'])} enviados, {report['unchanged']} inalterados, "
+                   f"{len(report['deleted'])} removidos, {len(report['failed'])} com falha")
+        self.log.info('Sincronização concluída em %.1fs: %s', elapsed, message)
+        return {
+            "success": not report['failed'],
+            "message": message,
+            **report,
+            "manifest": manifest_path,
+            "elapsed_seconds": elapsed
+        }
+
+    def _unmirror_graph(self, graph_uri: str, graph_prefix: str) -> dict:
+        """Apaga do grafo padrão as triplas de graph_uri que nenhum outro grafo sincronizado contém."""
+        return self._update(f"""
+DELETE {{ ?s ?p ?o }}
+WHERE {{
+  GRAPH <{graph_uri}> {{ ?s ?p ?o }}
+  FILTER NOT EXISTS {{
+    GRAPH ?g {{ ?s ?p ?o }}
+    FILTER(?g != <{graph_uri}> && STRSTARTS(STR(?g), {Literal(graph_prefix).n3()}))
+  }}
+}}""", f'Triplas de <{graph_uri}> removidas do grafo padrão')
+
+    @staticmethod
+    def _file_sha256(file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as file:
+            for block in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _load_manifest(manifest_path: str, target: str) -> dict:
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except (FileNotFoundError, ValueError):
+            manifest = None
+        # Um manifesto de outro servidor/dataset não vale para este: tudo é reenviado
+        if not manifest or manifest.get('target') != target:
+            manifest = {'version': 1, 'target': target, 'files': {}}
+        return manifest
+
+    @staticmethod
+    def _save_manifest(manifest_path: str, manifest: dict):
+        # Grava em um arquivo temporário e renomeia, para nunca deixar um manifesto pela metade
+        tmp_path = f'{manifest_path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            json.dump(manifest, file, indent=2, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+
+    @instrumented('load_from_file')
+    def load_from_file(self, file_path: str, graph_uri: Optional[str] = None,
+                       rdf_format: Optional[str] = None, replace: bool = False,
+                       enrich: Optional[DateTimeEnricher] = None) -> dict:
+        """
+        Carrega um arquivo RDF (.ttl, .nt, .nq, .trig, .jsonld, .rdf ou suas versões .gz) no Fuseki.
+
+        O arquivo não é lido para a memória: os bytes são enviados em streaming direto do disco,
+        sem decodificar/recodificar. Arquivos .gz são enviados ainda comprimidos, com
+        Content-Encoding: gzip, e descomprimidos pelo Fuseki.
+
+        Com enrich, o arquivo (Turtle, N-Triples ou N-Quads) é lido em blocos, Turtle é
+        convertido para N-Triples, e as triplas derivadas são acrescentadas a cada bloco antes do
+        envio, ainda em streaming.
+
+        Args:
+            file_path: Caminho para o arquivo
+            graph_uri: URI do grafo nomeado (opcional, se None usa o grafo padrão). Não use com
+                formatos de quads (nq, trig), que já informam o grafo de cada tripla
+            rdf_format: Formato do arquivo (se None, detectado pela extensão ou pelo conteúdo)
+            replace: Substitui o conteúdo do grafo (PUT) em vez de acrescentar (POST)
+            enrich: Enriquecedor aplicado durante o envio (ex.: DateTimeEnricher())
 
         Returns:
             dict com status da operação
         """
+        content_encoding = 'gzip' if file_path.endswith('.gz') else None
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                ttl_content = file.read()
-                self.print('Arquivo lido!')
-            return self.load_from_string(ttl_content, graph_uri)
+            rdf_format = rdf_format or detect_format(file_path)
+            if rdf_format is None:
+                return {
+                    "success": False,
+                    "message": f"Formato RDF não reconhecido: {file_path}"
+                }
+            if enrich is not None:
+                if rdf_format not in ENRICH_FORMATS:
+                    return {
+                        "success": False,
+                        "message": f"Enriquecimento não suportado para o formato {rdf_format}: {file_path}"
+                    }
+                self.log.debug('Enviando arquivo enriquecido em streaming: %s (%s)', file_path, rdf_format)
+                return self._post_data(self._enriched_blocks(file_path, rdf_format, enrich), graph_uri,
+                                       content_type=content_type('nq' if rdf_format == 'nq' else 'nt'),
+                                       method='PUT' if replace else 'POST', source=file_path)
+            with open(file_path, 'rb') as file:
+                self.log.debug('Enviando arquivo em streaming: %s (%s)', file_path, rdf_format)
+                return self._post_data(file, graph_uri, content_type=content_type(rdf_format),
+                                       content_encoding=content_encoding, method='PUT' if replace else 'POST',
+                                       source=file_path)
 
         except FileNotFoundError:
             return {
@@ -98,21 +542,111 @@ class TurtleLoader:
                 "message": f"Erro ao ler arquivo: {str(e)}"
             }
 
-    def load_from_string(self, ttl_content: str, graph_uri: Optional[str] = None) -> dict:
+    @staticmethod
+    def _enriched_blocks(file_path: str, rdf_format: str, enrich: DateTimeEnricher) -> Iterator[bytes]:
+        """Lê o arquivo em blocos N-Triples/N-Quads já enriquecidos (Turtle é convertido)."""
+        with open_rdf(file_path) as file:
+            if rdf_format == 'ttl':
+                blocks = TurtleToNTriples().convert_lines(file)
+            else:
+                blocks = iter_line_blocks(file)
+            yield from enrich(blocks)
+
+    @instrumented('load_from_string')
+    def load_from_string(self, ttl_content: str, graph_uri: Optional[str] = None,
+                         rdf_format: Optional[str] = None) -> dict:
+        """
+        Carrega conteúdo RDF (string) no Fuseki.
+
+        Args:
+            ttl_content: Conteúdo RDF como string (Turtle, N-Triples, N-Quads, TriG ou JSON-LD)
+            graph_uri: URI do grafo nomeado (opcional)
+            rdf_format: Formato do conteúdo (se None, detectado pelos primeiros 8 KB, com Turtle
+                como padrão; se o início parecer N-Triples mas o Fuseki recusar o conteúdo, ele
+                é reenviado como Turtle)
+
+        Returns:
+            dict com status da operação
+        """
+        self.log.debug('String lida %.300s', ttl_content)
+        data = ttl_content.encode('utf-8')
+        sniffed = rdf_format is None
+        rdf_format = rdf_format or sniff_format(data[:8192]) or 'ttl'
+        result = self._post_data(data, graph_uri, content_type=content_type(rdf_format))
+        if sniffed and rdf_format == 'nt' and result.get('status_code') == 400:
+            # Só o início foi examinado: o restante pode ser Turtle, que aceita N-Triples
+            self.log.debug('Conteúdo recusado como N-Triples, reenviando como Turtle')
+            result = self._post_data(data, graph_uri, content_type=content_type('ttl'))
+        return result
+
+    def batch_writer(self, graph_uri: Optional[str] = None, max_bytes: int = 4 * 1024 * 1024,
+                     max_snippets: int = 10000, max_delay: Optional[float] = 2.0,
+                     max_pending: int = 4) -> TurtleBatchWriter:
+        """
+        Cria um writer que junta muitos trechos Turtle pequenos em poucas requisições grandes.
+
+        Ex.:
+            with loader.batch_writer(max_delay=1.0) as writer:
+                for metar in metars:
+                    writer.write(metar_para_turtle(metar))
+
+        Args:
+            graph_uri: URI do grafo nomeado (opcional)
+            max_bytes: Tamanho máximo de cada requisição em bytes
+            max_snippets: Número máximo de trechos por requisição
+            max_delay: Tempo máximo em segundos que um trecho espera antes de ser enviado
+            max_pending: Lotes aguardando envio antes de write() bloquear
+
+        Returns:
+            TurtleBatchWriter (use com "with" ou chame close() ao final)
         """
-        Carrega conteúdo Turtle (string) no Fuseki.
+        return TurtleBatchWriter(self, graph_uri, max_bytes=max_bytes, max_snippets=max_snippets,
+                                 max_delay=max_delay, max_pending=max_pending)
+
+    @instrumented('load_from_stream')
+    def load_from_stream(self, chunks: Iterable[bytes], graph_uri: Optional[str] = None,
+                         content_type: str = 'text/turtle; charset=utf-8') -> dict:
+        """
+        Carrega dados RDF produzidos sob demanda (ex.: por um gerador) em uma única requisição.
+
+        O corpo é enviado com Transfer-Encoding: chunked à medida que os pedaços são produzidos,
+        sem montar o conteúdo inteiro em memória.
 
         Args:
-            ttl_content: Conteúdo Turtle como string
+            chunks: Iterável de pedaços já codificados (bytes)
             graph_uri: URI do grafo nomeado (opcional)
+            content_type: Content-Type dos dados (ex.: application/n-triples)
 
         Returns:
             dict com status da operação
         """
-        self.print(f'String lida {ttl_content[:300]}')
+        self.log.debug('Enviando dados em streaming')
+        return self._post_data(iter(chunks), graph_uri, content_type=content_type)
+
+    @instrumented('upload')
+    def _post_data(self, data, graph_uri: Optional[str] = None,
+                   content_type: str = 'text/turtle; charset=utf-8',
+                   content_encoding: Optional[str] = None, method: str = 'POST',
+                   source: Optional[str] = None) -> dict:
+        """
+        Envia um corpo RDF já codificado para o endpoint Graph Store (/data) do Fuseki.
+
+        Args:
+            data: Corpo da requisição (bytes, arquivo aberto em modo binário ou iterável de bytes)
+            graph_uri: URI do grafo nomeado (opcional)
+            content_type: Content-Type do corpo
+            content_encoding: Content-Encoding do corpo (ex.: gzip), se houver
+            method: POST acrescenta as triplas ao grafo; PUT substitui o conteúdo do grafo
+            source: Caminho do arquivo de origem, repassado aos listeners
+
+        Returns:
+            dict com status da operação e, se o Fuseki informar, o número de triplas inseridas
+        """
         headers = {
-            'Content-Type': 'text/turtle; charset=utf-8'
+            'Content-Type': content_type
         }
+        if content_encoding:
+            headers['Content-Encoding'] = content_encoding
 
         # Se especificar graph_uri, usa named graph
         params = {}
@@ -120,24 +654,37 @@ class TurtleLoader:
             params['graph'] = graph_uri
 
         try:
-            self.print('Fazendo a requisição!')
-            response = requests.post(
+            self.log.debug('Fazendo a requisição %s %s', method, self.data_endpoint)
+            self._cache_invalidate()
+            response = self.session.request(
+                method,
                 self.data_endpoint,
-                data=ttl_content.encode('utf-8'),
+                data=data,
                 headers=headers,
                 params=params,
                 auth=self.auth
             )
+            observe_response(response)
+            self._cache_invalidate()
 
             if response.status_code in [200, 201, 204]:
-                self.print('Dados carregados com sucesso!')
+                self.log.debug('Dados carregados com sucesso!')
+                if self.listeners:
+                    self._notify({
+                        "operation": 'replace' if method == 'PUT' else 'load',
+                        "graph_uri": graph_uri,
+                        "source": source,
+                        "data": data if isinstance(data, bytes) else None,
+                        "content_type": content_type
+                    })
                 return {
                     "success": True,
                     "message": "Dados carregados com sucesso",
-                    "status_code": response.status_code
+                    "status_code": response.status_code,
+                    "triple_count": self._triple_count(response)
                 }
             else:
-                self.print(f'Código de resposta não positivo. Código: {response.status_code}')
+                self.log.warning('Código de resposta não positivo. Código: %d', response.status_code)
                 return {
                     "success": False,
                     "message": f"Erro ao carregar dados: {response.text}",
@@ -145,14 +692,14 @@ class TurtleLoader:
                 }
 
         except requests.exceptions.ConnectionError as e:
-            self.print('Não foi possivel conectar ao Fuseki')
+            self.log.warning('Não foi possivel conectar ao Fuseki: %s', e)
             return {
                 "success": False,
                 "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
                 "error": str(e)
             }
         except Exception as e:
-            self.print('Erro inesperado!!')
+            self.log.warning('Erro inesperado ao enviar dados', exc_info=True)
             import traceback
             return {
                 "success": False,
@@ -161,67 +708,203 @@ class TurtleLoader:
                 "traceback": traceback.format_exc()
             }
 
-    def clear_dataset(self, graph_uri: Optional[str] = None) -> dict:
+    @staticmethod
+    def _triple_count(response: requests.Response) -> Optional[int]:
+        """Lê a contagem de triplas/quads que o Fuseki devolve no corpo da resposta de upload."""
+        try:
+            body = response.json()
+            return body.get('tripleCount', 0) + body.get('quadCount', 0)
+        except (ValueError, AttributeError):
+            return None
+
+    @instrumented('delete_graph')
+    def delete_graph(self, graph_uri: str) -> dict:
+        """
+        Remove um grafo nomeado pelo endpoint Graph Store (DELETE).
+
+        Args:
+            graph_uri: URI do grafo
+
+        Returns:
+            dict com status da operação (status_code 404 se o grafo não existir)
+        """
+        try:
+            self.log.debug('Removendo o grafo <%s>', graph_uri)
+            self._cache_invalidate()
+            response = self.session.delete(self.data_endpoint, params={'graph': graph_uri}, auth=self.auth)
+            observe_response(response)
+            self._cache_invalidate()
+
+            if response.status_code in [200, 204]:
+                self._notify({"operation": 'delete', "graph_uri": graph_uri})
+                return {
+                    "success": True,
+                    "message": f"Grafo <{graph_uri}> removido com sucesso",
+                    "status_code": response.status_code
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": f"Erro ao remover grafo: {response.text}",
+                    "status_code": response.status_code
+                }
+
+        except requests.exceptions.ConnectionError as e:
+            return {
+                "success": False,
+                "message": "Não foi possível conectar ao Fuseki. Verifique se está rodando.",
+                "error": str(e)
+            }
+        except Exception as e:
+            import traceback
+            return {
+                "success": False,
+                "message": f"Erro inesperado: {str(e)}",
+                "error": str(e),
+                "traceback": traceback.format_exc()
+            }
+
+    @instrumented('clear_dataset')
+    def clear_dataset(self, graph_uri: Optional[str] = None, all_graphs: bool = False) -> dict:
         """
         Limpa todos os dados do dataset ou de um grafo específico usando SPARQL UPDATE.
 
+        Usa CLEAR, que o Fuseki executa removendo as triplas direto dos índices, em vez de
+        DELETE WHERE, que materializa cada tripla como resultado de uma consulta antes de apagá-la.
+
         Args:
             graph_uri: URI do grafo para limpar (se None, limpa o grafo padrão)
+            all_graphs: Limpa o grafo padrão e todos os grafos nomeados (CLEAR ALL)
 
         Returns:
             dict com status da operação
         """
-        # Endpoint de update (não de data)
-        update_endpoint = f"{self.fuseki_url}/{self.dataset}/update"
+        if all_graphs:
+            self.log.debug('Limpando todos os grafos do dataset')
+            sparql_update = 'CLEAR ALL'
+            msg = "Dataset (todos os grafos) limpo com sucesso"
+        elif graph_uri:
+            self.log.debug('Limpando um grafo especifico')
+            sparql_update = f'CLEAR SILENT GRAPH <{graph_uri}>'
+            msg = f"Grafo <{graph_uri}> limpo com sucesso"
+        else:
+            sparql_update = 'CLEAR DEFAULT'
+            msg = "Dataset (grafo padrão) limpo com sucesso"
 
-        # Construir a query SPARQL DELETE apropriada
-        if graph_uri:
-            # Limpar um grafo nomeado específico
-            self.print('Limpando um grafo especifico')
-            sparql_update = f"""
-            DELETE WHERE {{
-                GRAPH <{graph_uri}> {{
-                    ?s ?p ?o .
-                }}
-            }}
-            """
+        result = self._update(sparql_update, msg)
+        if not result['success']:
+            result['message'] = f"Erro ao limpar dataset: {result['message']}"
+        self.log.info('%s', result['message'])
+        return result
+
+    @instrumented('drop_graph')
+    def drop_graph(self, graph_uri: str) -> dict:
+        """
+        Remove um grafo nomeado com DROP SILENT GRAPH (não falha se o grafo não existir).
+
+        Args:
+            graph_uri: URI do grafo
+
+        Returns:
+            dict com status da operação
+        """
+        self.log.debug('Removendo o grafo <%s>', graph_uri)
+        return self._update(f'DROP SILENT GRAPH <{graph_uri}>', f"Grafo <{graph_uri}> removido com sucesso")
+
+    @instrumented('swap_graph')
+    def swap_graph(self, staging_graph: str, graph_uri: str, backup_graph: Optional[str] = None) -> dict:
+        """
+        Coloca o conteúdo de um grafo de staging no lugar de um grafo nomeado, atomicamente.
+
+        Executa MOVE GRAPH em uma única requisição de update, ou seja, em uma única transação:
+        leitores continuam vendo o conteúdo antigo até o commit e nunca veem o grafo vazio ou
+        parcialmente carregado. Ao final o grafo de staging deixa de existir.
+
+        Args:
+            staging_graph: URI do grafo já carregado
+            graph_uri: URI do grafo de destino (o conteúdo atual é descartado)
+            backup_graph: Se informado, o conteúdo atual do destino é movido para este grafo
+                na mesma transação, em vez de descartado
+
+        Returns:
+            dict com status da operação
+        """
+        operations = []
+        if backup_graph:
+            operations.append(f'MOVE SILENT GRAPH <{graph_uri}> TO <{backup_graph}>')
+        operations.append(f'MOVE GRAPH <{staging_graph}> TO <{graph_uri}>')
+        self.log.debug('Trocando o grafo <%s> pelo staging <%s>', graph_uri, staging_graph)
+        return self._update(' ;\n'.join(operations), f"Grafo <{graph_uri}> substituído por <{staging_graph}>")
+
+    @instrumented('replace_graph')
+    def replace_graph(self, source: str, graph_uri: str, staging_graph: Optional[str] = None,
+                      backup_graph: Optional[str] = None, workers: int = 4, **kwargs) -> dict:
+        """
+        Recarrega um grafo nomeado a partir de um arquivo ou diretório sem bloquear leitores.
+
+        Os dados são carregados primeiro em um grafo de staging (por load_from_file com PUT ou
+        por bulk_load_directory, em várias transações pequenas); só se a carga inteira der certo
+        o staging é colocado no lugar do grafo com swap_graph(). Se a carga falhar, o staging é
+        removido e o grafo original permanece intacto. Não use com formatos de quads (nq, trig).
+
+        Args:
+            source: Caminho de um arquivo RDF ou de um diretório
+            graph_uri: URI do grafo a substituir
+            staging_graph: URI do grafo de staging (padrão: graph_uri + "#staging")
+            backup_graph: Repassado a swap_graph() para guardar o conteúdo anterior
+            workers: Uploads simultâneos quando source é um diretório
+            **kwargs: Repassados a load_from_file ou bulk_load_directory
+
+        Returns:
+            dict com status da carga e da troca
+        """
+        staging_graph = staging_graph or f'{graph_uri}#staging'
+        self.drop_graph(staging_graph)
+
+        if os.path.isdir(source):
+            load = self.bulk_load_directory(source, graph_uri=staging_graph, workers=workers, **kwargs)
         else:
-            # Limpar o grafo padrão (default graph)
-            sparql_update = """
-            DELETE WHERE {
-                ?s ?p ?o .
+            load = self.load_from_file(source, graph_uri=staging_graph, replace=True, **kwargs)
+
+        if not load.get('success'):
+            self.drop_graph(staging_graph)
+            return {
+                "success": False,
+                "message": f"Carga no staging <{staging_graph}> falhou; <{graph_uri}> não foi alterado",
+                "load": load
             }
-            """
 
+        swap = self.swap_graph(staging_graph, graph_uri, backup_graph=backup_graph)
+        swap['load'] = load
+        return swap
+
+    def _update(self, sparql_update: str, success_message: str) -> dict:
         headers = {
             'Content-Type': 'application/sparql-update'
         }
 
         try:
-            self.print('Realizando a requisição da limpeza do dataset')
-            self.print(f'Query:\n{sparql_update}')
-            response = requests.post(
-                update_endpoint,
+            self.log.debug('Query:\n%s', sparql_update)
+            self._cache_invalidate()
+            response = self.session.post(
+                self.update_endpoint,
                 data=sparql_update.encode('utf-8'),
                 headers=headers,
                 auth=self.auth
             )
+            observe_response(response)
+            self._cache_invalidate()
 
             if response.status_code in [200, 204]:
-                if graph_uri:
-                    msg = f"Grafo <{graph_uri}> limpo com sucesso"
-                else:
-                    msg = "Dataset (grafo padrão) limpo com sucesso"
-                self.print(f'{msg}')
+                self._notify({"operation": 'update', "graph_uri": None, "update": sparql_update})
                 return {
                     "success": True,
-                    "message": msg
+                    "message": success_message
                 }
             else:
-                self.print(f"Erro ao limpar dataset: {response.text}")
                 return {
                     "success": False,
-                    "message": f"Erro ao limpar dataset: {response.text}",
+                    "message": f"Erro no update: {response.text}",
                     "status_code": response.status_code
                 }
 
@@ -229,7 +912,7 @@ class TurtleLoader:
             import traceback
             return {
                 "success": False,
-                "message": f"Erro ao limpar dataset ({type(e)}): {str(e)}",
+                "message": f"Erro inesperado ({type(e)}): {str(e)}",
                 "error": str(e),
                 "traceback": traceback.format_exc()
             }
@@ -238,7 +921,7 @@ class TurtleLoader:
 # Exemplo de uso
 if __name__ == "__main__":
     # Inicializa o loader
-    loader = TurtleLoader(dataset='airdata')
+    loader = TurtleLoader(dataset='airdata', verbose=True)
 
     result = loader.clear_dataset()
     print(result)
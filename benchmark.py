@@ -0,0 +1,177 @@
+"""
+Benchmark do TurtleLoader e do SparqlQuery contra um Fuseki simulado (MockFuseki)
+
+Mede vazão de carga, latência (p50/p95/p99) de SELECT e memória por tamanho de resultado.
+Os dados são gerados pelo AirdataGenerator com semente fixa, para que execuções em commits
+diferentes sejam comparáveis. Não precisa do Fuseki rodando.
+
+Uso: python benchmark.py [--rows 100 1000 10000] [--repeat 20] [--latency 0] [--json saida.json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+from AirdataGenerator import AirdataGenerator
+from MockFuseki import MockFuseki
+from SparqlQuery import SparqlQuery
+from TurtleLoader import TurtleLoader
+
+
+QUERY = """
+PREFIX : <http://airdata.org/ontology#>
+
+SELECT ?metar ?hora ?ventoKt ?vis ?qnh
+WHERE {
+  ?metar a :AerodromeCondition ;
+         :WeatherCondition-aerodrome :Aerodrome_SBGR ;
+         :WeatherCondition-time ?t ;
+         :WeatherCondition-visibility ?v ;
+         :WeatherCondition-wind ?w ;
+         :AerodromeCondition-qnhHpa ?qnh .
+
+  ?t :DateTime-value ?hora .
+  ?v :Visibility-prevailingVisibilityMeters ?vis .
+  ?w :Wind-windSpeedKt ?ventoKt .
+}
+ORDER BY ?hora
+"""
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Retorna p50/p95/p99, média e mínimo das amostras, em milissegundos."""
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, round(p * (len(ordered) - 1)))] * 1000
+
+    return {"p50_ms": pick(0.50), "p95_ms": pick(0.95), "p99_ms": pick(0.99),
+            "mean_ms": statistics.fmean(ordered) * 1000, "min_ms": ordered[0] * 1000}
+
+
+def peak_memory(func: Callable[[], Any]) -> int:
+    """Executa func e retorna o pico de memória alocada (bytes) medido pelo tracemalloc."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_load(mock: MockFuseki, days: int, workers: int) -> Dict[str, Any]:
+    """Mede a carga de arquivos gerados com load_from_file e bulk_load_directory."""
+    gerador = AirdataGenerator(days=days)
+    with tempfile.TemporaryDirectory() as tmp:
+        total_bytes = 0
+        for codigo in gerador.aerodromos:
+            total_bytes += gerador.write(os.path.join(tmp, f'airdata_{codigo}.ttl'), icao=codigo)
+        files = sorted(os.listdir(tmp))
+        triples = gerador.total_triples()
+
+        with TurtleLoader(mock.url, mock.dataset, verbose=False) as loader:
+            start = time.perf_counter()
+            for name in files:
+                loader.load_from_file(os.path.join(tmp, name))
+            sequential = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bulk = loader.bulk_load_directory(tmp, workers=workers)
+            parallel = time.perf_counter() - start
+
+    return {
+        "files": len(files),
+        "bytes": total_bytes,
+        "triples": triples,
+        "load_from_file": {"seconds": sequential, "mb_per_second": total_bytes / sequential / 1e6,
+                           "triples_per_second": triples / sequential},
+        "bulk_load_directory": {"seconds": parallel, "workers": workers, "success": bulk.get('success'),
+                                "mb_per_second": total_bytes / parallel / 1e6,
+                                "triples_per_second": triples / parallel},
+    }
+
+
+def bench_select(mock: MockFuseki, rows: int, repeat: int) -> Dict[str, Any]:
+    """Mede latência e memória de select, select_iter e select_columns para um tamanho de resultado."""
+    mock.rows = rows
+    report: Dict[str, Any] = {"rows": rows}
+    with SparqlQuery(mock.url, mock.dataset) as sparql:
+        for fmt in ('json', 'tsv'):
+            sparql.select(QUERY, result_format=fmt)
+            samples = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = sparql.select(QUERY, result_format=fmt)
+                samples.append(time.perf_counter() - start)
+                assert result['success'] and result['count'] == rows, result.get('message')
+            report[f"select_{fmt}"] = percentiles(samples)
+
+        report["memory_bytes"] = {
+            "select_json": peak_memory(lambda: sparql.select(QUERY, result_format='json')),
+            "select_tsv": peak_memory(lambda: sparql.select(QUERY, result_format='tsv')),
+            "select_iter_tsv": peak_memory(lambda: sum(1 for _ in sparql.select_iter(QUERY, result_format='tsv'))),
+            "select_columns_tsv": peak_memory(lambda: sparql.select_columns(QUERY)),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    load = report["load"]
+    print(f"\nCarga: {load['files']} arquivos, {load['bytes'] / 1e6:.1f} MB, {load['triples']} triplas")
+    for name in ('load_from_file', 'bulk_load_directory'):
+        item = load[name]
+        print(f"  {name:<22} {item['seconds']:8.3f} s  {item['mb_per_second']:8.1f} MB/s  "
+              f"{item['triples_per_second']:12.0f} triplas/s")
+
+    print(f"\nSELECT (latência em ms, {report['config']['repeat']} repetições, "
+          f"latência simulada {report['config']['latency'] * 1000:.0f} ms)")
+    print(f"  {'linhas':>8} {'formato':<6} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for item in report["select"]:
+        for fmt in ('json', 'tsv'):
+            lat = item[f"select_{fmt}"]
+            print(f"  {item['rows']:>8} {fmt:<6} {lat['p50_ms']:9.2f} {lat['p95_ms']:9.2f} {lat['p99_ms']:9.2f}")
+
+    print("\nMemória (pico em KB)")
+    print(f"  {'linhas':>8} {'select json':>12} {'select tsv':>12} {'iter tsv':>12} {'columns':>12}")
+    for item in report["select"]:
+        mem = item["memory_bytes"]
+        print(f"  {item['rows']:>8} {mem['select_json'] / 1024:12.0f} {mem['select_tsv'] / 1024:12.0f} "
+              f"{mem['select_iter_tsv'] / 1024:12.0f} {mem['select_columns_tsv'] / 1024:12.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark do TurtleLoader e do SparqlQuery com um Fuseki simulado')
+    parser.add_argument('--rows', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='Tamanhos de resultado do SELECT')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetições por medida de latência')
+    parser.add_argument('--latency', type=float, default=0.0, help='Latência simulada do servidor em segundos')
+    parser.add_argument('--days', type=int, default=2, help='Dias de dados gerados para o teste de carga')
+    parser.add_argument('--workers', type=int, default=4, help='Workers do bulk_load_directory')
+    parser.add_argument('--json', dest='json_path', help='Grava o relatório completo em JSON neste arquivo')
+    args = parser.parse_args(argv)
+
+    report: Dict[str, Any] = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "config": {"rows": args.rows, "repeat": args.repeat, "latency": args.latency,
+                   "days": args.days, "workers": args.workers},
+    }
+    with MockFuseki(latency=args.latency) as mock:
+        report["load"] = bench_load(mock, args.days, args.workers)
+        report["select"] = [bench_select(mock, rows, args.repeat) for rows in args.rows]
+
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f"\nRelatório gravado em {args.json_path}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
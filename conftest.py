@@ -0,0 +1,14 @@
+import pytest
+
+from MockFuseki import MockFuseki
+
+
+# test_jena.py é um script para rodar contra um Fuseki de verdade (docker-compose up -d)
+collect_ignore = ['test_jena.py']
+
+
+@pytest.fixture
+def mock_fuseki():
+    """MockFuseki no ar durante o teste."""
+    with MockFuseki(rows=10) as mock:
+        yield mock
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+import pytest
+
+from AirdataGenerator import AERODROMOS, MAX_AERODROMOS, AirdataGenerator, codigos_icao
+from TurtleLoader import TurtleLoader
+
+
+def generator():
+    return AirdataGenerator(aerodromos=['SBGR', 'SBAF'], days=3, flights_per_day=4, metars_per_hour=1)
+
+
+def count_nt(data: str) -> int:
+    return sum(1 for line in data.splitlines() if line.strip())
+
+
+def test_total_triples_matches_generated_data():
+    gerador = generator()
+    assert count_nt(gerador.to_string(fmt='nt')) == gerador.total_triples()
+
+
+def test_shards_do_not_repeat_aerodrome_triple():
+    gerador = generator()
+    shards = [gerador.to_string(icao=icao, day=day, fmt='nt') for icao, day in gerador.shards()]
+    assert [count_nt(shard) for shard in shards] == [gerador.shard_triples(day) for _, day in gerador.shards()]
+    assert sum(count_nt(shard) for shard in shards) == gerador.total_triples()
+    assert sorted(''.join(shards).splitlines()) == sorted(gerador.to_string(fmt='nt').splitlines())
+    aerodrome_type = '<http://airdata.org/ontology#Aerodrome> .'
+    assert aerodrome_type in gerador.to_string(icao='SBGR', day=gerador.start, fmt='nt')
+    assert aerodrome_type not in gerador.to_string(icao='SBGR', day=gerador.start + timedelta(days=1), fmt='nt')
+
+
+def test_write_shards_reports_total_triples(tmp_path):
+    gerador = generator()
+    result = gerador.write_shards(str(tmp_path), fmt='nt', processes=2)
+    assert result['total_files'] == 6
+    assert result['total_triples'] == gerador.total_triples()
+    written = 0
+    for item in result['files']:
+        with open(item['file'], encoding='utf-8') as file:
+            lines = count_nt(file.read())
+        assert lines == item['triples']
+        written += lines
+    assert written == gerador.total_triples()
+
+
+def test_load_into_reports_total_triples(mock_fuseki):
+    gerador = generator()
+    with TurtleLoader(mock_fuseki.url, circuit_breaker=False) as loader:
+        result = gerador.load_into(loader, processes=2, batch_bytes=4096)
+    assert result['success']
+    assert result['total_triples'] == gerador.total_triples()
+
+
+def test_shard_without_start_day_is_still_valid_turtle():
+    rdflib = pytest.importorskip('rdflib')
+    gerador = generator()
+    day = gerador.start + timedelta(days=2)
+    graph = rdflib.Graph().parse(data=gerador.to_string(icao='SBAF', day=day), format='turtle')
+    assert len(graph) == gerador.shard_triples(day)
+
+
+def test_codigos_icao_beyond_two_letter_codes():
+    codigos = codigos_icao(MAX_AERODROMOS)
+    assert len(codigos) == len(set(codigos)) == MAX_AERODROMOS
+    assert codigos[:len(AERODROMOS)] == list(AERODROMOS)
+    assert codigos[len(AERODROMOS):len(AERODROMOS) + 2] == ['SXAA', 'SXAB']
+    assert codigos_icao(698)[-4:] == ['SXZY', 'SXZZ', 'SYAA', 'SYAB']
+    with pytest.raises(ValueError):
+        codigos_icao(MAX_AERODROMOS + 1)
+    with pytest.raises(ValueError):
+        codigos_icao(-1)
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from AsyncSparqlQuery import AsyncSparqlQuery
+from MockFuseki import MockFuseki
+from QueryTemplate import aerodrome
+from SparqlQuery import CONDICAO_AERODROMO
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_concurrent_select_respects_max_concurrency():
+    async def main(url):
+        async with AsyncSparqlQuery(url, max_concurrency=3) as sparql:
+            queries = [CONDICAO_AERODROMO.bind(aerodromo=aerodrome(codigo), prefixo_hora='2025-07-01T10')
+                       for codigo in ('SBGR', 'SBSP', 'SBRJ', 'SBGL', 'SBBR', 'SBAF', 'SBKP', 'SBCF', 'SBPA')]
+            return await asyncio.gather(*(sparql.select(query) for query in queries))
+
+    with MockFuseki(rows=5, latency=0.05) as mock:
+        results = run(main(mock.url))
+    assert all(result['success'] and result['count'] == 5 for result in results)
+    assert len(mock.requests) == 9
+    assert mock.max_in_flight == 3
+
+
+def test_ask_construct_update(mock_fuseki):
+    async def main():
+        async with AsyncSparqlQuery(mock_fuseki.url) as sparql:
+            return (await sparql.ask('ASK { ?s ?p ?o }'),
+                    await sparql.update('INSERT DATA { <urn:s> <urn:p> 1 }'))
+
+    ask, update = run(main())
+    assert ask == {"success": True, "result": True}
+    assert update['success']
+    assert mock_fuseki.update_bodies == ['INSERT DATA { <urn:s> <urn:p> 1 }']
+
+
+def test_error_dicts_have_the_same_shape():
+    with MockFuseki() as mock:
+        url = mock.url
+    # Mock já parado: nada escutando na porta
+
+    async def main():
+        async with AsyncSparqlQuery(url) as sparql:
+            return [await sparql.select('SELECT * { ?s ?p ?o }'), await sparql.ask('ASK { ?s ?p ?o }'),
+                    await sparql.construct('CONSTRUCT WHERE { ?s ?p ?o }'), await sparql.update('CLEAR DEFAULT')]
+
+    for result in run(main()):
+        assert not result['success']
+        assert result['message'].startswith('Não foi possível conectar')
+        assert result['error']
+
+
+def test_unexpected_errors_carry_traceback(mock_fuseki):
+    async def main():
+        async with AsyncSparqlQuery(mock_fuseki.url) as sparql:
+            return await sparql.update(None)
+
+    result = run(main())
+    assert not result['success']
+    assert result['error'] and 'Traceback' in result['traceback']
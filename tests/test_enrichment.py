@@ -0,0 +1,35 @@
+import pytest
+
+from Enrichment import AIRDATA, XSD, DateTimeEnricher, utc_parts
+from MaterializedViews import DIMENSIONS, VOOS_POR_DIA, scan_changes
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('2025-07-01T10:25:00', ('2025-07-01', '10')),
+    ('2025-07-01T10:25:00Z', ('2025-07-01', '10')),
+    ('2025-07-01T10:25:00.5+00:00', ('2025-07-01', '10')),
+    ('2025-07-01T23:10:00-03:00', ('2025-07-02', '02')),
+    ('2025-07-01T01:00:00+05:30', ('2025-06-30', '19')),
+    ('2025-13-01T10:00:00Z', None),
+    ('ontem', None),
+])
+def test_utc_parts(value, expected):
+    assert utc_parts(value) == expected
+
+
+def test_derived_date_matches_view_partition():
+    derived = DateTimeEnricher().derive('2025-07-01T10:25:00Z')
+    assert derived[AIRDATA + 'DateTime-date'] == f'"2025-07-01"^^<{XSD}date>'
+    assert derived[AIRDATA + 'DateTime-hourBucket'] == f'"2025-07-01T10:00:00"^^<{XSD}dateTime>'
+    assert VOOS_POR_DIA.partition_keys(['2025-07-01']) == ['"2025-07-01"^^<http://www.w3.org/2001/XMLSchema#date>']
+
+
+def test_scan_changes_uses_the_derived_utc_date():
+    data = (f'<urn:t1> <{AIRDATA}DateTime-value> "2025-07-01T23:10:00-03:00"^^<{XSD}dateTime> .\n'
+            f'<urn:t2> <{AIRDATA}DateTime-value> "2025-07-03T08:00:00"^^<{XSD}dateTime> .\n').encode()
+    event = {'operation': 'load', 'content_type': 'application/n-triples', 'data': data}
+    changes = scan_changes(event, DIMENSIONS)
+    assert changes['date'] == {'2025-07-02', '2025-07-03'}
+    enriched = DateTimeEnricher().enrich(data).decode()
+    for day in changes['date']:
+        assert f'<{AIRDATA}DateTime-date> "{day}"^^<{XSD}date>' in enriched
@@ -0,0 +1,151 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from AirdataGenerator import AirdataGenerator
+from FlightWeather import FlightWeather, _parse_time, asof_join, hour_join
+
+
+def series(*times):
+    return [{'time': datetime(2025, 7, 1, *t), 'id': i} for i, t in enumerate(times)]
+
+
+def ids(pairs):
+    return [(left['id'], right['id'] if right else None) for left, right in pairs]
+
+
+METARS = series((10, 0), (10, 30), (11, 0), (13, 0))
+LANDINGS = series((9, 50), (10, 30), (10, 40), (12, 50), (14, 30))
+
+
+def test_asof_backward():
+    assert ids(asof_join(LANDINGS, METARS)) == [(0, None), (1, 1), (2, 1), (3, 2), (4, 3)]
+
+
+def test_asof_forward():
+    assert ids(asof_join(LANDINGS, METARS, direction='forward')) == [(0, 0), (1, 1), (2, 2), (3, 3), (4, None)]
+
+
+def test_asof_nearest_with_tolerance():
+    pairs = asof_join(LANDINGS, METARS, direction='nearest', tolerance=timedelta(minutes=30))
+    assert ids(pairs) == [(0, 0), (1, 1), (2, 1), (3, 3), (4, None)]
+
+
+def test_asof_invalid_direction():
+    with pytest.raises(ValueError):
+        list(asof_join(LANDINGS, METARS, direction='sideways'))
+
+
+def test_hour_join_matches_nested_loop():
+    landings = series((9, 50), (10, 5), (10, 59), (11, 0), (15, 0))
+    metars = series((10, 0), (10, 30), (11, 0), (11, 30), (12, 0))
+    expected = [(left['id'], right['id']) for left in landings for right in metars
+                if left['time'].strftime('%Y-%m-%dT%H') == right['time'].strftime('%Y-%m-%dT%H')]
+    assert [(left['id'], right['id']) for left, right in hour_join(landings, metars)] == expected
+
+
+class RdflibSparql:
+    """Executa as queries do FlightWeather em um grafo rdflib, no formato de SparqlQuery.select()."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        # O parser de SPARQL do rdflib (pyparsing) não pode ser usado por várias threads ao mesmo tempo
+        self.lock = threading.Lock()
+
+    def select(self, query, result_format=None):
+        rows = []
+        with self.lock:
+            results = list(self.graph.query(str(query)))
+        for row in results:
+            rows.append({var: {'type': 'literal', 'value': str(value)}
+                         for var, value in row.asdict().items()})
+        return {"success": True, "results": rows}
+
+
+OLD_QUERY = """
+PREFIX : <http://airdata.org/ontology#>
+SELECT ?flight ?horaVoo ?horaMetar ?ventoKt ?qnh ?vis
+WHERE {
+  ?flight a :ArrivalOperations ;
+          :ArrivalOperations-landing ?landing .
+  ?landing :Landing-time ?tVoo .
+  ?tVoo :DateTime-value ?horaVoo .
+  ?flight :Flight-destinationAerodrome :Aerodrome_SBAF .
+
+  ?metar a :AerodromeCondition ;
+         :WeatherCondition-aerodrome :Aerodrome_SBAF ;
+         :WeatherCondition-time ?tMetar ;
+         :WeatherCondition-wind ?w ;
+         :WeatherCondition-visibility ?v ;
+         :AerodromeCondition-qnhHpa ?qnh .
+  ?tMetar :DateTime-value ?horaMetar .
+  ?w :Wind-windSpeedKt ?ventoKt .
+  ?v :Visibility-prevailingVisibilityMeters ?vis .
+
+  FILTER(SUBSTR(STR(?horaVoo), 1, 13) = SUBSTR(STR(?horaMetar), 1, 13))
+}
+"""
+
+
+def test_same_hour_correlation_matches_old_query():
+    rdflib = pytest.importorskip('rdflib')
+    generator = AirdataGenerator(aerodromos=['SBAF', 'SBGR'], days=2, flights_per_day=6)
+    graph = rdflib.Graph().parse(data=generator.to_string(), format='turtle')
+    expected = sorted((str(row.flight), row.horaVoo.toPython(), row.horaMetar.toPython())
+                      for row in graph.query(OLD_QUERY))
+
+    flight_weather = FlightWeather(RdflibSparql(graph), window=timedelta(days=1))
+    result = flight_weather.correlate('SBAF', generator.start, generator.start + timedelta(days=generator.days),
+                                      mode='same_hour')
+    assert result['success']
+    actual = sorted((row['flight'], row['horaVoo'], row['horaMetar']) for row in result['results'])
+    assert len(expected) == 2 * 6 * 2  # dois METARs por hora para cada pouso
+    assert actual == expected
+
+
+def test_landing_range_covers_every_landing():
+    rdflib = pytest.importorskip('rdflib')
+    generator = AirdataGenerator(aerodromos=['SBAF', 'SBGR'], days=3, flights_per_day=4)
+    graph = rdflib.Graph().parse(data=generator.to_string(), format='turtle')
+    flight_weather = FlightWeather(RdflibSparql(graph), window=timedelta(days=1))
+
+    interval = flight_weather.landing_range('SBAF')
+    assert interval['success']
+    everything = flight_weather.landing_series('SBAF', generator.start - timedelta(days=1),
+                                               generator.start + timedelta(days=generator.days + 1))
+    times = [row['time'] for row in everything['results']]
+    assert interval['start'] == min(times)
+    assert interval['end'] == max(times) + timedelta(seconds=1)
+    assert flight_weather.landing_series('SBAF', interval['start'], interval['end'])['count'] == len(times) == 3 * 4
+
+
+def test_landing_range_without_landings():
+    rdflib = pytest.importorskip('rdflib')
+    flight_weather = FlightWeather(RdflibSparql(rdflib.Graph()))
+    assert flight_weather.landing_range('SBAF') == {"success": True, "start": None, "end": None}
+
+
+def test_times_are_normalized_to_naive_utc():
+    assert _parse_time('2025-07-01T10:00:00Z') == datetime(2025, 7, 1, 10)
+    assert _parse_time('2025-07-01T07:00:00-03:00') == datetime(2025, 7, 1, 10)
+    assert _parse_time('2025-07-01T10:00:00') == datetime(2025, 7, 1, 10)
+
+
+@pytest.mark.parametrize('zoned_times', [False, True])
+def test_correlate_with_aware_bounds(zoned_times):
+    rdflib = pytest.importorskip('rdflib')
+    generator = AirdataGenerator(aerodromos=['SBAF'], days=1, flights_per_day=6)
+    data = generator.to_string()
+    if zoned_times:
+        data = data.replace('"^^xsd:dateTime', 'Z"^^xsd:dateTime')
+    graph = rdflib.Graph().parse(data=data, format='turtle')
+
+    flight_weather = FlightWeather(RdflibSparql(graph), zoned_times=zoned_times)
+    # 21h do dia anterior em Brasília = início do dia em UTC
+    start = generator.start.replace(tzinfo=timezone(timedelta(hours=-3))) - timedelta(hours=3)
+    result = flight_weather.correlate('SBAF', start, generator.start + timedelta(days=1))
+    assert result['success']
+    assert result['landings'] == 6
+    assert all(row['horaVoo'].tzinfo is None and row['horaMetar'].tzinfo is None for row in result['results'])
+    assert all(row['horaMetar'] <= row['horaVoo'] for row in result['results'])
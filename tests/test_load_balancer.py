@@ -0,0 +1,79 @@
+import pytest
+
+from LoadBalancer import ReplicaPool
+from MockFuseki import MockFuseki
+from SparqlQuery import SparqlQuery
+
+QUERY = 'SELECT * WHERE { ?s ?p ?o } LIMIT 10'
+
+
+@pytest.fixture
+def cluster():
+    with MockFuseki(rows=10) as primary, MockFuseki(rows=10) as r1, MockFuseki(rows=10) as r2:
+        sparql = SparqlQuery(primary.url, read_urls=[r1.url, r2.url], health_check_interval=None,
+                             circuit_breaker=False)
+        yield sparql, primary, r1, r2
+        sparql.close()
+
+
+def queries(mock):
+    return sum(1 for _, path, _ in mock.requests if '/query' in path)
+
+
+def test_reads_go_to_replicas_and_updates_to_primary(cluster):
+    sparql, primary, r1, r2 = cluster
+    for _ in range(10):
+        assert sparql.select(QUERY)['success']
+    assert sparql.update('INSERT DATA { <urn:s> <urn:p> <urn:o> }')['success']
+    assert queries(primary) == 0
+    assert queries(r1) + queries(r2) == 10
+    assert (primary.updates, r1.updates, r2.updates) == (1, 0, 0)
+
+
+def test_unavailable_replica_fails_over(cluster):
+    sparql, primary, r1, r2 = cluster
+    r1.fail_next(10)
+    r2.fail_next(1)
+    result = sparql.select(QUERY)
+    assert result['success']
+    # Uma tentativa em cada réplica e a última, sem réplica disponível, no primário
+    assert queries(r1) + queries(r2) == 2
+    assert queries(primary) == 1
+
+
+def test_query_error_is_not_repeated(cluster):
+    sparql, primary, r1, r2 = cluster
+    # 503 de timeout da query, produzido pelo próprio Fuseki: executar em outra réplica só repete o custo
+    r1.fail_next(1, answered=True)
+    r2.fail_next(1, answered=True)
+    result = sparql.select(QUERY)
+    assert not result['success']
+    assert result['status_code'] == 503
+    assert queries(r1) + queries(r2) + queries(primary) == 1
+    assert all(replica['circuit'] == 'closed' and replica['errors'] == 0 for replica in sparql.replicas.stats())
+
+
+def test_failing_replica_leaves_rotation(cluster):
+    sparql, primary, r1, r2 = cluster
+    r1.fail_next(100)
+    for _ in range(10):
+        assert sparql.select(QUERY)['success']
+    stats = {replica['url']: replica for replica in sparql.replicas.stats()}
+    assert stats[r1.url]['circuit'] == 'open'
+    assert stats[r1.url]['errors'] == 3
+    assert queries(r2) == 10
+
+
+def test_health_check_marks_unreachable_replica():
+    with MockFuseki() as replica:
+        pool = ReplicaPool(['http://127.0.0.1:1', replica.url], 'airdata')
+        sparql = SparqlQuery(replica.url, circuit_breaker=False)
+        health = pool.check_health(sparql.session, timeout=1)
+        assert health == {'http://127.0.0.1:1': False, replica.url: True}
+        assert [r.fuseki_url for r in pool.replicas if r.available()] == [replica.url]
+        sparql.close()
+
+
+def test_invalid_strategy():
+    with pytest.raises(ValueError):
+        ReplicaPool(['http://localhost:3030'], 'airdata', strategy='round_robin')
@@ -0,0 +1,75 @@
+import logging
+
+import pytest
+
+from Metrics import Metrics
+from SparqlQuery import SparqlQuery
+from TurtleLoader import TurtleLoader
+
+TTL = '@prefix : <http://ex.org/> .\n:a :b "{}" .\n'
+
+
+@pytest.fixture
+def events():
+    return []
+
+
+@pytest.fixture
+def sparql(mock_fuseki, events):
+    with SparqlQuery(mock_fuseki.url, circuit_breaker=False, metrics=Metrics(hooks=[events.append])) as sparql:
+        yield sparql
+
+
+@pytest.fixture
+def loader(mock_fuseki, events):
+    with TurtleLoader(mock_fuseki.url, circuit_breaker=False, verbose=False,
+                      metrics=Metrics(hooks=[events.append])) as loader:
+        yield loader
+
+
+def test_update_batch_workers_count_in_one_call(sparql, mock_fuseki, events):
+    operations = [f'INSERT DATA {{ <urn:s> <urn:p> {i} }}' for i in range(8)]
+    result = sparql.update_batch(operations, batch_size=2, workers=4, ordered=False)
+    assert result['success']
+    assert len(events) == 1
+    assert events[0]['operation'] == 'update_batch'
+    assert events[0]['requests'] == mock_fuseki.updates == 4
+    assert events[0]['bytes_sent'] > 0
+    assert '_lock' not in events[0]
+
+
+def test_bulk_load_uploads_count_in_one_call(tmp_path, loader, mock_fuseki, events):
+    for i in range(3):
+        (tmp_path / f'{i}.ttl').write_text(TTL.format(i), encoding='utf-8')
+    result = loader.bulk_load_directory(str(tmp_path), workers=3)
+    assert result['success']
+    assert [event['operation'] for event in events] == ['bulk_load_directory']
+    assert events[0]['requests'] == 3
+
+
+def test_select_iter_is_measured_until_close(sparql, mock_fuseki, events):
+    stream = sparql.select_iter('SELECT * WHERE { ?s ?p ?o }')
+    assert events == []
+    rows = list(stream)
+    assert len(rows) == mock_fuseki.rows
+    assert len(events) == 1
+    assert events[0]['operation'] == 'select_iter'
+    assert events[0]['rows'] == mock_fuseki.rows
+    assert events[0]['success']
+    assert events[0]['parse_seconds'] is not None
+
+
+def test_slow_log_does_not_include_payload(loader, caplog):
+    loader.slow_query_seconds = 0
+    with caplog.at_level(logging.WARNING, logger='fuseki.loader'):
+        assert loader.load_from_string(TTL.format('segredo'))['success']
+    messages = [record.getMessage() for record in caplog.records if 'Chamada lenta' in record.getMessage()]
+    assert messages
+    assert all('segredo' not in message for message in messages)
+
+
+def test_slow_log_includes_query(sparql, caplog):
+    sparql.slow_query_seconds = 0
+    with caplog.at_level(logging.WARNING, logger='fuseki.query'):
+        sparql.ask('ASK { ?s ?p ?o }')
+    assert any('ASK { ?s ?p ?o }' in record.getMessage() for record in caplog.records)
@@ -0,0 +1,52 @@
+import time
+
+from QueryCache import QueryCache, normalize_query
+from SparqlQuery import SparqlQuery
+
+
+def test_normalize_query_keeps_literals():
+    assert normalize_query('SELECT  *\n WHERE { ?s ?p "a   b" }') == 'SELECT * WHERE { ?s ?p "a   b" }'
+
+
+def test_get_returns_independent_copy():
+    cache = QueryCache()
+    key = QueryCache.make_key('ds', 'select', 'SELECT * WHERE { ?s ?p ?o }')
+    original = {"success": True, "results": [{'s': {'type': 'uri', 'value': 'urn:b'}},
+                                             {'s': {'type': 'uri', 'value': 'urn:a'}}]}
+    cache.put(key, original)
+    original['results'].clear()
+
+    first = cache.get(key)
+    first['results'].sort(key=lambda row: row['s']['value'])
+    first['results'][0]['s']['value'] = 'alterado'
+    first['results'].append({})
+
+    second = cache.get(key)
+    assert [row['s']['value'] for row in second['results']] == ['urn:b', 'urn:a']
+
+
+def test_lru_and_ttl():
+    cache = QueryCache(max_entries=2, ttl=0.1)
+    cache.put('a', {"n": 1})
+    cache.put('b', {"n": 2})
+    cache.get('a')
+    cache.put('c', {"n": 3})
+    assert cache.get('b') is None
+    assert cache.evictions == 1
+    cache.put('d', {"n": 4}, ttl=60)
+    time.sleep(0.15)
+    assert cache.get('a') is None
+    assert cache.get('d') == {"n": 4}
+
+
+def test_select_cache_hit_and_invalidation(mock_fuseki):
+    cache = QueryCache()
+    with SparqlQuery(mock_fuseki.url, cache=cache, circuit_breaker=False) as sparql:
+        query = 'SELECT * WHERE { ?s ?p ?o } LIMIT 10'
+        sparql.select(query)['results'].clear()
+        assert len(sparql.select(query)['results']) == mock_fuseki.rows
+        assert cache.hits == 1
+        sparql.update('INSERT DATA { <urn:s> <urn:p> 1 }')
+        sparql.select(query)
+        assert cache.hits == 1
+    assert sum(1 for _, path, _ in mock_fuseki.requests if '/query' in path) == 2
@@ -0,0 +1,58 @@
+from QueryProfiler import format_profile, lint_query
+
+
+def rules(query):
+    return [issue['rule'] for issue in lint_query(query)]
+
+
+def test_string_join():
+    issues = lint_query("""
+        SELECT * WHERE {
+          ?a :t ?x . ?b :t ?y .
+          FILTER(SUBSTR(STR(?x), 1, 13) = SUBSTR(STR(?y), 1, 13))
+        }""")
+    assert issues[0]['rule'] == 'string-join'
+    assert issues[0]['severity'] == 'error'
+    assert issues[0]['snippet'] == 'FILTER(SUBSTR(STR(?x), 1, 13) = SUBSTR(STR(?y), 1, 13))'
+    assert 'cross-product' in [issue['rule'] for issue in issues]
+
+
+def test_filter_and_bind_str():
+    query = 'SELECT * WHERE { ?s :t ?x . FILTER(STRSTARTS(STR(?x), "2025-07")) BIND(SUBSTR(STR(?x), 1, 10) AS ?d) }'
+    assert rules(query) == ['filter-str', 'bind-str']
+
+
+def test_unbounded_scan():
+    assert rules('SELECT * WHERE { ?s ?p ?o }') == ['unbounded-scan']
+    assert rules('SELECT * WHERE { ?s ?p ?o } LIMIT 10') == []
+
+
+def test_cross_product_ignores_filters_values_and_graphs():
+    assert rules('SELECT * WHERE { ?a :p ?b . ?c :q ?d }') == ['cross-product']
+    assert rules('SELECT * WHERE { VALUES ?x { 1 2 } ?a :p ?x . ?a :q ?b }') == []
+    assert rules('SELECT * WHERE { GRAPH ?g { ?a :p ?b . ?b :q 1.5 } }') == []
+    # Um subselect só expõe as variáveis projetadas
+    assert rules('SELECT * WHERE { ?a :p ?b . { SELECT ?b WHERE { ?b :q ?c } LIMIT 1 } }') == []
+
+
+def test_strings_iris_and_comments_are_masked():
+    query = '''SELECT * WHERE {
+      ?s :p "FILTER(STR(?x) = STR(?y))" .  # ?a ?b ?c
+      ?s :q <http://ex.org/?a?b?c> .
+    } LIMIT 5'''
+    assert lint_query(query) == []
+
+
+def test_format_profile():
+    profile = {
+        "success": True, "query_name": 'q', "format": 'json', "rows": 2, "bytes": 10,
+        "phases": {"prepare": 0.001, "ttfb": 0.2, "download": 0.01, "parse": 0.001, "total": 0.25},
+        "network_rtt_seconds": 0.05, "server_seconds": 0.15, "bottleneck": 'servidor (execução da query)',
+        "request_id": '7', "lint": lint_query('SELECT * WHERE { ?s ?p ?o }'),
+        "plan": {"success": True, "algebra_opt": '(bgp (triple ?s ?p ?o))\n'}
+    }
+    report = format_profile(profile)
+    assert 'Gargalo: servidor' in report
+    assert '[warning] unbounded-scan' in report
+    assert '(bgp (triple ?s ?p ?o))' in report
+    assert format_profile({"success": False, "message": 'x'}) == 'Falha no profile: x'
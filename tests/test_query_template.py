@@ -0,0 +1,88 @@
+from datetime import date, datetime
+from decimal import Decimal
+from urllib.parse import quote_plus, unquote_plus
+
+import pytest
+
+from QueryTemplate import IRI, Literal, QueryTemplate, Values, aerodrome, render_term
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+TEMPLATE = QueryTemplate("""
+PREFIX : <http://airdata.org/ontology#>
+SELECT ?metar WHERE {
+  ?metar :WeatherCondition-aerodrome %{aerodromo} ;
+         :nome %{nome} .
+  FILTER(?hora >= %{inicio})
+}""", name='teste')
+
+
+def test_render_terms():
+    assert render_term('abc') == '"abc"'
+    assert render_term(10) == '10'
+    assert render_term(True) == 'true'
+    assert render_term(1.5) == f'"1.5"^^<{XSD}double>'
+    assert render_term(float('inf')) == f'"INF"^^<{XSD}double>'
+    assert render_term(Decimal('1.10')) == f'"1.10"^^<{XSD}decimal>'
+    assert render_term(datetime(2025, 7, 1, 12)) == f'"2025-07-01T12:00:00"^^<{XSD}dateTime>'
+    assert render_term(date(2025, 7, 1)) == f'"2025-07-01"^^<{XSD}date>'
+    assert render_term(None) == 'UNDEF'
+    assert render_term(Literal('oi', lang='pt-BR')) == '"oi"@pt-BR'
+    with pytest.raises(TypeError):
+        render_term(object())
+
+
+def test_string_cannot_escape_literal():
+    injection = 'x" } ; DROP ALL ; SELECT * WHERE { "\\'
+    query = TEMPLATE.bind(aerodromo=aerodrome('SBGR'), nome=injection, inicio=datetime(2025, 7, 1))
+    rendered = render_term(injection)
+    assert rendered == '"x\\" } ; DROP ALL ; SELECT * WHERE { \\"\\\\"'
+    assert f':nome {rendered} .' in query
+    assert render_term('a\nb\r\tc') == '"a\\nb\\r\\tc"'
+
+
+@pytest.mark.parametrize('value', ['http://ex.org/a> } DROP ALL { <x', 'http://ex.org/a b', 'http://ex.org/"a"',
+                                   'http://ex.org/{a}', 'http://ex.org/a\\b'])
+def test_invalid_iri(value):
+    with pytest.raises(ValueError):
+        IRI(value)
+
+
+def test_invalid_lang_and_variable():
+    with pytest.raises(ValueError):
+        Literal('oi', lang='pt"@en')
+    with pytest.raises(ValueError):
+        Literal('1', datatype='http://ex.org/> x')
+    with pytest.raises(ValueError):
+        Values('x } DROP ALL {', [1])
+
+
+def test_bind_encodings():
+    query = TEMPLATE.bind(aerodromo=aerodrome('SBGR'), nome='São Paulo & cia', inicio=datetime(2025, 7, 1))
+    assert query.name == 'teste'
+    assert ':WeatherCondition-aerodrome <http://airdata.org/ontology#Aerodrome_SBGR> ;' in query
+    assert query.url_encoded == quote_plus(str(query))
+    assert unquote_plus(query.url_encoded) == str(query)
+    assert query.body == str(query).encode('utf-8')
+
+
+def test_missing_parameter():
+    with pytest.raises(ValueError, match='inicio'):
+        TEMPLATE.bind(aerodromo=aerodrome('SBGR'), nome='x')
+
+
+def test_placeholder_in_prologue_is_not_a_parameter():
+    template = QueryTemplate('PREFIX ex: <http://ex.org/%{x}>\nSELECT * WHERE { ?s ?p %{o} }')
+    assert template.params == ['o']
+    assert template.bind(o=1) == 'PREFIX ex: <http://ex.org/%{x}>\nSELECT * WHERE { ?s ?p 1 }'
+
+
+def test_values_and_batches():
+    assert Values('a', [aerodrome('SBGR'), 'x']).n3() == \
+        'VALUES ?a { <http://airdata.org/ontology#Aerodrome_SBGR> "x" }'
+    assert Values(['a', 'n'], [('x', 1), (None, 2)]).n3() == 'VALUES (?a ?n) { ("x" 1) (UNDEF 2) }'
+
+    template = QueryTemplate('SELECT * WHERE { %{valores} ?s ?p ?o }')
+    batches = list(template.bind_batches('valores', 's', [IRI(f'http://ex.org/{i}') for i in range(5)], batch_size=2))
+    assert len(batches) == 3
+    assert batches[-1] == 'SELECT * WHERE { VALUES ?s { <http://ex.org/4> } ?s ?p ?o }'
@@ -0,0 +1,111 @@
+import gzip
+import os
+
+import pytest
+
+from AirdataGenerator import AirdataGenerator
+from RdfFormats import (TurtleToNTriples, convert_turtle_file, detect_format, rename_bnodes,
+                        split_prefixes, split_turtle_file)
+
+rdflib = pytest.importorskip('rdflib')
+from rdflib.compare import isomorphic  # noqa: E402
+
+ONTOLOGY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'turtles', 'ontology_airdata.ttl')
+
+SAMPLE = '''@base <http://ex.org/base/> .
+@prefix : <http://ex.org/> .
+PREFIX xsd: <http://www.w3.org/2001/XMLSchema#>
+
+:a a :Coisa ;
+   :nome "café"@pt, 'single' , """longa
+com "aspas" e \\"escape\\\"""" ;
+   :n 1, -2.5, 3e2, true ;
+   :data "2025-07-01"^^xsd:date ;
+   :rel <relativo>, <#frag> ;
+   :lista ( 1 "dois" :tres ) ;
+   :vazia () ;
+   :anon [ :p "x" ; :q [ :r :s ] ] ;
+   :esc "tab\\tnova\\nlinha \\u00e9" .
+
+_:b1 :liga _:b2 .
+_:b2 :liga _:b1 .
+[] :solto "sim" .
+:local\\-escapado :x :y .
+'''
+
+
+def to_graph(data: bytes, fmt: str) -> 'rdflib.Graph':
+    graph = rdflib.Graph()
+    graph.parse(data=data.decode('utf-8'), format=fmt)
+    return graph
+
+
+def test_sample_is_isomorphic_to_rdflib():
+    converter = TurtleToNTriples()
+    nt = converter.convert_text(SAMPLE)
+    assert converter.bnode_labels
+    assert converter.triples == len(nt.splitlines())
+    assert isomorphic(to_graph(nt, 'nt'), to_graph(SAMPLE.encode(), 'turtle'))
+
+
+def test_streaming_conversion_across_batches():
+    text = SAMPLE * 3
+    lines = text.encode().splitlines(keepends=True)
+    blocks = list(TurtleToNTriples().convert_lines(lines, batch_bytes=64))
+    assert len(blocks) > 1
+    # Cada cópia do SAMPLE tem os próprios blank nodes anônimos, mas os rótulos _:b1/_:b2 são os mesmos
+    assert len(to_graph(b''.join(blocks), 'nt')) == len(to_graph(text.encode(), 'turtle'))
+
+
+def test_ontology_is_isomorphic_to_rdflib(tmp_path):
+    nt_path = str(tmp_path / 'ontology.nt.gz')
+    triples = convert_turtle_file(ONTOLOGY, nt_path)
+    with gzip.open(nt_path, 'rb') as file:
+        nt = file.read()
+    expected = rdflib.Graph().parse(ONTOLOGY, format='turtle')
+    assert triples == len(expected)
+    assert isomorphic(to_graph(nt, 'nt'), expected)
+
+
+def test_generated_airdata_is_isomorphic_to_rdflib():
+    turtle = AirdataGenerator(aerodromos=['SBGR'], flights_per_day=5).to_string().encode()
+    nt = TurtleToNTriples().convert_text(turtle.decode())
+    assert isomorphic(to_graph(nt, 'nt'), to_graph(turtle, 'turtle'))
+
+
+def test_split_turtle_file_keeps_statements(tmp_path):
+    path = tmp_path / 'sample.ttl'
+    path.write_text(SAMPLE * 4, encoding='utf-8')
+    chunks = list(split_turtle_file(str(path), 200))
+    assert len(chunks) > 1
+    converter = TurtleToNTriples()
+    nt = b''.join(converter.convert_text(chunk.decode('utf-8')) for chunk in chunks)
+    assert len(to_graph(nt, 'nt')) == len(to_graph((SAMPLE * 4).encode(), 'turtle'))
+
+
+def test_invalid_turtle():
+    with pytest.raises(ValueError):
+        TurtleToNTriples().convert_text(':a :b :c .')  # prefixo não declarado
+    with pytest.raises(ValueError):
+        TurtleToNTriples().convert_text('<http://ex.org/a> <http://ex.org/b> ')
+
+
+def test_detect_format(tmp_path):
+    nt = tmp_path / 'sem_extensao'
+    nt.write_bytes(b'<http://ex.org/a> <http://ex.org/b> <http://ex.org/c> .\n')
+    ttl = tmp_path / 'dados.ttl.gz'
+    with gzip.open(ttl, 'wb') as file:
+        file.write(b'@prefix : <http://ex.org/> .\n:a :b :c .\n')
+    assert detect_format(str(nt)) == 'nt'
+    assert detect_format(str(ttl)) == 'ttl'
+
+
+def test_split_prefixes_and_rename_bnodes():
+    prefixes, base, body = split_prefixes('@prefix : <http://ex.org/> .\n:a :b "@prefix x" .\n')
+    assert prefixes == {'': 'http://ex.org/'}
+    assert base is None
+    assert body.strip() == ':a :b "@prefix x" .'
+    with pytest.raises(ValueError):
+        split_prefixes('@prefix : <http://ex.org/> .\n@prefix : <http://outro.org/> .')
+
+    assert rename_bnodes('_:x :p "_:y" ; :q _:z .', 'u1_') == '_:u1_x :p "_:y" ; :q _:u1_z .'
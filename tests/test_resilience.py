@@ -0,0 +1,150 @@
+import time
+
+import pytest
+import requests
+
+from FusekiSession import FusekiSession
+from Resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+def make_session(breaker=False, **policy):
+    policy.setdefault('backoff_factor', 0)
+    return FusekiSession(retry_policy=RetryPolicy(**policy), circuit_breaker=breaker)
+
+
+def test_retries_until_success(mock_fuseki):
+    session = make_session(retries=3)
+    mock_fuseki.fail_next(2)
+    response = session.get(f'{mock_fuseki.url}/$/ping')
+    assert response.status_code == 200
+    assert response.retries == 2
+    assert [status for _, _, status in mock_fuseki.requests] == [503, 503, 200]
+
+
+def test_gives_up_after_retries(mock_fuseki):
+    session = make_session(retries=2)
+    mock_fuseki.fail_next(5)
+    response = session.get(f'{mock_fuseki.url}/$/ping')
+    assert response.status_code == 503
+    assert response.retries == 2
+    assert len(mock_fuseki.requests) == 3
+
+
+def test_retry_budget_denies_retries(mock_fuseki):
+    # Um único token: a primeira nova tentativa passa, a segunda é negada pelo orçamento
+    session = make_session(retries=5, retry_budget=0.1, budget_min_tokens=1)
+    mock_fuseki.fail_next(10)
+    response = session.get(f'{mock_fuseki.url}/$/ping')
+    assert response.status_code == 503
+    assert response.retries == 1
+    assert session.retry_policy.retries_done == 1
+    assert session.retry_policy.retries_denied == 1
+    assert len(mock_fuseki.requests) == 2
+
+
+def test_retry_after_is_respected(mock_fuseki):
+    session = make_session(retries=1)
+    mock_fuseki.fail_next(1, retry_after=1)
+    start = time.monotonic()
+    response = session.get(f'{mock_fuseki.url}/$/ping')
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 1
+
+
+def test_retry_after_is_capped_by_backoff_max():
+    policy = RetryPolicy(backoff_factor=0, backoff_max=2)
+    response = requests.Response()
+    response.headers['Retry-After'] = '120'
+    assert policy.delay(0, response) == 2
+    assert RetryPolicy(backoff_factor=0, respect_retry_after=False).delay(0, response) == 0
+
+
+def test_post_is_not_retried(mock_fuseki):
+    session = make_session(retries=3)
+    mock_fuseki.fail_next(1)
+    response = session.post(f'{mock_fuseki.url}/airdata/update', data={'update': 'CLEAR DEFAULT'})
+    assert response.status_code == 503
+    assert response.retries == 0
+    assert len(mock_fuseki.requests) == 1
+
+
+def test_idempotent_post_is_retried(mock_fuseki):
+    session = make_session(retries=3)
+    mock_fuseki.fail_next(1)
+    response = session.post(f'{mock_fuseki.url}/airdata/update', data={'update': 'CLEAR DEFAULT'}, idempotent=True)
+    assert response.status_code == 204
+    assert response.retries == 1
+
+
+def test_generator_body_is_never_retried(mock_fuseki):
+    # Um gerador não pode ser reenviado, nem com idempotent=True
+    session = make_session(retries=3)
+    mock_fuseki.fail_next(1)
+    body = (line for line in [b'<urn:s> <urn:p> <urn:o> .\n'])
+    response = session.put(f'{mock_fuseki.url}/airdata/data', data=body, idempotent=True,
+                           headers={'Content-Type': 'application/n-triples'})
+    assert response.status_code == 503
+    assert response.retries == 0
+    assert len(mock_fuseki.requests) == 1
+
+
+def test_circuit_breaker_open_half_open_closed(mock_fuseki):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    session = make_session(breaker=breaker, retries=0)
+    mock_fuseki.fail_next(2)
+    assert session.get(f'{mock_fuseki.url}/$/ping').status_code == 503
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert session.get(f'{mock_fuseki.url}/$/ping').status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # Aberto: recusa no cliente, sem chegar ao servidor
+    with pytest.raises(CircuitOpenError):
+        session.get(f'{mock_fuseki.url}/$/ping')
+    assert len(mock_fuseki.requests) == 2
+    assert breaker.is_open()
+
+    # Depois de reset_timeout a requisição de teste passa e, com sucesso, fecha o circuito
+    time.sleep(0.25)
+    assert not breaker.is_open()
+    assert session.get(f'{mock_fuseki.url}/$/ping').status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.stats()['opened_count'] == 1
+
+
+def test_circuit_breaker_half_open_failure_reopens(mock_fuseki):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    session = make_session(breaker=breaker, retries=0)
+    mock_fuseki.fail_next(2)
+    session.get(f'{mock_fuseki.url}/$/ping')
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.25)
+    assert session.get(f'{mock_fuseki.url}/$/ping').status_code == 503
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['opened_count'] == 2
+
+
+def test_half_open_slot_released_on_client_error(mock_fuseki):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+    session = make_session(breaker=breaker, retries=0)
+    mock_fuseki.fail_next(1)
+    session.get(f'{mock_fuseki.url}/$/ping')
+    time.sleep(0.25)
+
+    def body():
+        yield b'<urn:s> <urn:p> <urn:o> .\n'
+        raise ValueError('erro ao gerar o corpo')
+
+    # A requisição de teste termina com um erro do cliente: a vaga de teste é devolvida
+    with pytest.raises(ValueError):
+        session.put(f'{mock_fuseki.url}/airdata/data', data=body(), headers={'Content-Type': 'application/n-triples'})
+    assert session.get(f'{mock_fuseki.url}/$/ping').status_code == 200
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_connection_error_opens_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    session = make_session(breaker=breaker, retries=0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get('http://127.0.0.1:1/$/ping', timeout=1)
+    with pytest.raises(CircuitOpenError):
+        session.get('http://127.0.0.1:1/$/ping', timeout=1)
@@ -0,0 +1,93 @@
+import logging
+
+import pytest
+import requests
+
+from SparqlQuery import SparqlQuery
+
+
+@pytest.fixture
+def sparql(mock_fuseki):
+    with SparqlQuery(mock_fuseki.url, circuit_breaker=False) as sparql:
+        yield sparql
+
+
+def test_update_batch_renames_bnodes(sparql, mock_fuseki):
+    operations = [f'INSERT DATA {{ _:b <urn:p> {i} . _:b <urn:q> "_:b" }}' for i in range(5)]
+    result = sparql.update_batch(operations, batch_size=2)
+    assert result['success']
+    assert result['applied_operations'] == 5
+    assert [batch['operations'] for batch in result['batches']] == [[0, 2], [2, 4], [4, 5]]
+
+    bodies = sorted(mock_fuseki.update_bodies)
+    assert len(bodies) == 3
+    for i in range(5):
+        body = next(body for body in bodies if f'<urn:p> {i} ' in body)
+        assert f'_:u{i}_b <urn:p> {i} . _:u{i}_b <urn:q> "_:b"' in body
+    assert bodies[0].count(' ;\n') == 1
+
+
+def test_update_batch_ordered_stops_at_first_failure(sparql, mock_fuseki):
+    operations = ['DELETE WHERE { ?s <urn:p> ?o }', 'INSERT DATA { <urn:s> <urn:p> 1 }', 'CLEAR DEFAULT']
+    mock_fuseki.fail_next(1, status=400, answered=True)
+    result = sparql.update_batch(operations, batch_size=1)
+    assert not result['success']
+    assert len(result['batches']) == 1
+    assert mock_fuseki.updates == 1
+
+
+def test_profile(sparql, mock_fuseki):
+    profile = sparql.profile('SELECT * WHERE { ?s ?p ?o }', query_name='tudo')
+    assert profile['success']
+    assert profile['rows'] == mock_fuseki.rows
+    assert profile['network_rtt_seconds'] is not None
+    assert profile['request_id'] is not None
+    assert [issue['rule'] for issue in profile['lint']] == ['unbounded-scan']
+    assert profile['plan']['algebra_opt'] == '(bgp)'
+
+
+def test_profile_survives_failed_ping(sparql, mock_fuseki, monkeypatch):
+    get = sparql.session.get
+
+    def get_without_ping(url, **kwargs):
+        if url.endswith('/$/ping'):
+            raise requests.exceptions.ConnectionError('ping recusado')
+        return get(url, **kwargs)
+
+    monkeypatch.setattr(sparql.session, 'get', get_without_ping)
+    profile = sparql.profile('SELECT * WHERE { ?s ?p ?o } LIMIT 10', explain=False)
+    assert profile['success']
+    assert profile['network_rtt_seconds'] is None
+    assert profile['server_seconds'] == profile['phases']['ttfb']
+
+
+def test_profile_failed_query_skips_ping(sparql, mock_fuseki):
+    mock_fuseki.fail_next(1, status=400, answered=True)
+    profile = sparql.profile('SELECT * WHERE { ?s ?p ?o } LIMIT 10', explain=False)
+    assert not profile['success']
+    assert profile['status_code'] == 400
+    assert [path for _, path, _ in mock_fuseki.requests if path == '/$/ping'] == []
+
+
+def test_update_batch_renames_only_insert_data(sparql, mock_fuseki):
+    template = 'INSERT { _:n <urn:p> ?o } WHERE { ?s <urn:q> ?o FILTER(?o != "_:x") }'
+    operations = ['PREFIX : <urn:>\nINSERT DATA { _:b :p 1 }', template, template,
+                  'INSERT DATA { _:b <urn:p> 2 }', 'DELETE WHERE { ?s <urn:p> "sem rótulos" }']
+    result = sparql.update_batch(operations, batch_size=10)
+    assert result['success']
+    # Operações com "_:" que não são INSERT DATA vão sozinhas e sem alteração
+    assert [batch['operations'] for batch in result['batches']] == [[0, 1], [1, 2], [2, 3], [3, 5]]
+    assert mock_fuseki.update_bodies == [
+        'PREFIX : <urn:>\nINSERT DATA { _:u0_b :p 1 }', template, template,
+        'INSERT DATA { _:u3_b <urn:p> 2 } ;\nDELETE WHERE { ?s <urn:p> "sem rótulos" }']
+
+
+def test_verbose_is_per_instance(mock_fuseki, capsys):
+    with SparqlQuery(mock_fuseki.url, circuit_breaker=False, verbose=True) as verbose, \
+            SparqlQuery(mock_fuseki.url, circuit_breaker=False) as quiet:
+        assert not quiet.log.isEnabledFor(logging.DEBUG)
+        quiet.ask('ASK { <urn:quiet> ?p ?o }')
+        verbose.ask('ASK { <urn:verbose> ?p ?o }')
+    out = capsys.readouterr().out
+    assert '<urn:verbose>' in out
+    assert '<urn:quiet>' not in out
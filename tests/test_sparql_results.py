@@ -0,0 +1,217 @@
+import json
+import struct
+
+import pytest
+
+from SparqlQuery import SparqlQuery
+from SparqlResults import SelectStream, parse_csv_term, parse_tsv_term
+
+XSD = 'http://www.w3.org/2001/XMLSchema#'
+
+
+class FakeResponse:
+    """Resposta HTTP mínima para o SelectStream, entregando o corpo em pedaços pequenos."""
+
+    status_code = 200
+
+    def __init__(self, body: bytes, chunk: int = 7):
+        self.body = body
+        self.chunk = chunk
+        self.closed = False
+
+    def iter_content(self, chunk_size):
+        for i in range(0, len(self.body), self.chunk):
+            yield self.body[i:i + self.chunk]
+
+    def close(self):
+        self.closed = True
+
+
+def read(body: bytes, result_format: str):
+    stream = SelectStream(FakeResponse(body), result_format=result_format)
+    rows = list(stream)
+    assert stream.success, stream.message
+    return stream.variables, rows
+
+
+def test_json_stream():
+    body = json.dumps({
+        'head': {'vars': ['s', 'label', 'n']},
+        'results': {'bindings': [
+            {'s': {'type': 'uri', 'value': 'http://ex.org/a'},
+             'label': {'type': 'literal', 'value': 'café "quente"', 'xml:lang': 'pt'},
+             'n': {'type': 'literal', 'value': '1', 'datatype': XSD + 'integer'}},
+            {'s': {'type': 'bnode', 'value': 'b0'}},
+        ]}
+    }, ensure_ascii=True).encode()
+    variables, rows = read(body, 'json')
+    assert variables == ['s', 'label', 'n']
+    assert rows[0]['label'] == {'type': 'literal', 'value': 'café "quente"', 'xml:lang': 'pt'}
+    assert rows[0]['n']['datatype'] == XSD + 'integer'
+    assert rows[1] == {'s': {'type': 'bnode', 'value': 'b0'}}
+
+
+def test_json_stream_error_is_reported():
+    stream = SelectStream(FakeResponse(b'{"head": {"vars": ["s"]}, "results": {"bindings": [{"s": '), 'json')
+    assert list(stream) == []
+    assert not stream.success
+
+
+def test_tsv_terms():
+    assert parse_tsv_term('') is None
+    assert parse_tsv_term('<http://ex.org/a>') == {'type': 'uri', 'value': 'http://ex.org/a'}
+    assert parse_tsv_term('"a\\tb\\"c"@pt-BR') == {'type': 'literal', 'value': 'a\tb"c', 'xml:lang': 'pt-BR'}
+    assert parse_tsv_term(f'"2025-07-01T00:00:00"^^<{XSD}dateTime>') == \
+        {'type': 'literal', 'value': '2025-07-01T00:00:00', 'datatype': XSD + 'dateTime'}
+    assert parse_tsv_term('_:b1') == {'type': 'bnode', 'value': 'b1'}
+    assert parse_tsv_term('42')['datatype'] == XSD + 'integer'
+    assert parse_tsv_term('4.2')['datatype'] == XSD + 'decimal'
+    assert parse_tsv_term('4.2e1')['datatype'] == XSD + 'double'
+    assert parse_tsv_term('true')['datatype'] == XSD + 'boolean'
+    assert parse_tsv_term('"\\u00e9"')['value'] == 'é'
+
+
+def test_tsv_stream_unbound_cells():
+    body = '?s\t?o\n<http://ex.org/a>\t"x"\n<http://ex.org/b>\t\n'.encode()
+    variables, rows = read(body, 'tsv')
+    assert variables == ['s', 'o']
+    assert rows == [{'s': {'type': 'uri', 'value': 'http://ex.org/a'}, 'o': {'type': 'literal', 'value': 'x'}},
+                    {'s': {'type': 'uri', 'value': 'http://ex.org/b'}}]
+
+
+def test_csv_terms():
+    assert parse_csv_term('') is None
+    assert parse_csv_term('http://ex.org/a') == {'type': 'uri', 'value': 'http://ex.org/a'}
+    assert parse_csv_term('_:b1') == {'type': 'bnode', 'value': 'b1'}
+    assert parse_csv_term('12.5') == {'type': 'literal', 'value': '12.5'}
+
+
+def test_csv_stream_quoted_fields():
+    body = 's,o\r\nhttp://ex.org/a,"linha 1\nlinha 2, com vírgula"\r\nhttp://ex.org/b,\r\n'.encode()
+    variables, rows = read(body, 'csv')
+    assert variables == ['s', 'o']
+    assert rows[0]['o'] == {'type': 'literal', 'value': 'linha 1\nlinha 2, com vírgula'}
+    assert rows[1] == {'s': {'type': 'uri', 'value': 'http://ex.org/b'}}
+
+
+# Codificação Thrift compacta, para montar respostas application/sparql-results+thrift
+
+
+def varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        if n < 0x80:
+            out.append(n)
+            return bytes(out)
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+
+
+def zigzag(n: int) -> bytes:
+    return varint((n << 1) ^ (n >> 63))
+
+
+def string(text: str) -> bytes:
+    data = text.encode('utf-8')
+    return varint(len(data)) + data
+
+
+def thrift_struct(*fields) -> bytes:
+    """fields: (id, tipo compacto, valor já codificado), em ordem crescente de id."""
+    out = b''
+    previous = 0
+    for field_id, ctype, value in fields:
+        out += bytes([(field_id - previous) << 4 | ctype]) + value
+        previous = field_id
+    return out + b'\x00'
+
+
+def thrift_list(ctype: int, items) -> bytes:
+    return bytes([len(items) << 4 | ctype]) + b''.join(items)
+
+
+def iri(value):
+    return thrift_struct((1, 12, thrift_struct((1, 8, string(value)))))
+
+
+def literal(value, lang=None, datatype=None):
+    fields = [(1, 8, string(value))]
+    if lang:
+        fields.append((2, 8, string(lang)))
+    if datatype:
+        fields.append((3, 8, string(datatype)))
+    return thrift_struct((3, 12, thrift_struct(*fields)))
+
+
+def test_thrift_stream():
+    header = thrift_struct((1, 9, thrift_list(12, [thrift_struct((1, 8, string(var))) for var in ('s', 'o')])))
+    rows = [
+        [iri('http://ex.org/a'), literal('olá', lang='pt')],
+        [thrift_struct((8, 12, b'\x00')), thrift_struct((10, 6, zigzag(-42)))],
+        [iri('http://ex.org/b'), thrift_struct((11, 7, struct.pack('<d', 2.5)))],
+        [thrift_struct((2, 12, thrift_struct((1, 8, string('b0'))))),
+         thrift_struct((12, 12, thrift_struct((1, 6, zigzag(-1234)), (2, 5, zigzag(2)))))],
+        [iri('http://ex.org/c'), thrift_struct((7, 12, b'\x00'))],
+        [iri('http://ex.org/d'), literal('2025-07-01', datatype=XSD + 'date')],
+    ]
+    body = header + b''.join(thrift_struct((1, 9, thrift_list(12, row))) for row in rows)
+    variables, bindings = read(body, 'thrift')
+    assert variables == ['s', 'o']
+    assert bindings == [
+        {'s': {'type': 'uri', 'value': 'http://ex.org/a'}, 'o': {'type': 'literal', 'value': 'olá', 'xml:lang': 'pt'}},
+        # RDF_REPEAT repete o termo da linha anterior
+        {'s': {'type': 'uri', 'value': 'http://ex.org/a'}, 'o': {'type': 'literal', 'value': '-42', 'datatype': XSD + 'integer'}},
+        {'s': {'type': 'uri', 'value': 'http://ex.org/b'}, 'o': {'type': 'literal', 'value': '2.5', 'datatype': XSD + 'double'}},
+        {'s': {'type': 'bnode', 'value': 'b0'}, 'o': {'type': 'literal', 'value': '-12.34', 'datatype': XSD + 'decimal'}},
+        {'s': {'type': 'uri', 'value': 'http://ex.org/c'}},
+        {'s': {'type': 'uri', 'value': 'http://ex.org/d'}, 'o': {'type': 'literal', 'value': '2025-07-01', 'datatype': XSD + 'date'}},
+    ]
+
+
+def test_stream_close_releases_response():
+    response = FakeResponse(b'?s\n<http://ex.org/a>\n<http://ex.org/b>\n')
+    with SelectStream(response, result_format='tsv') as stream:
+        next(stream)
+    assert response.closed
+
+
+@pytest.mark.parametrize('result_format', ['tsv', 'csv'])
+def test_select_formats_agree_with_json(mock_fuseki, result_format):
+    with SparqlQuery(mock_fuseki.url, circuit_breaker=False) as sparql:
+        expected = sparql.select('SELECT * WHERE { ?s ?p ?o }', result_format='json')['results']
+        result = sparql.select('SELECT * WHERE { ?s ?p ?o }', result_format=result_format)
+    assert result['success']
+    if result_format == 'csv':
+        # CSV não carrega tipos: só os valores podem ser comparados
+        expected = [{var: term['value'] for var, term in row.items()} for row in expected]
+        result['results'] = [{var: term['value'] for var, term in row.items()} for row in result['results']]
+    assert result['results'] == expected
+    assert len(expected) == mock_fuseki.rows
+
+
+def test_break_closes_response():
+    response = FakeResponse(b'?s\n<http://ex.org/a>\n<http://ex.org/b>\n')
+    stream = SelectStream(response, result_format='tsv')
+    for row in stream:
+        break
+    assert response.closed
+    assert stream.response is None
+
+
+def test_exception_in_loop_closes_response():
+    response = FakeResponse(b'?s\n<http://ex.org/a>\n<http://ex.org/b>\n')
+    stream = SelectStream(response, result_format='tsv')
+    with pytest.raises(RuntimeError):
+        for row in stream:
+            raise RuntimeError('erro do chamador')
+    assert response.closed
+
+
+def test_auto_format_uses_json_for_bindings_and_tsv_for_columns(mock_fuseki):
+    with SparqlQuery(mock_fuseki.url, circuit_breaker=False, result_format='auto') as sparql:
+        # Mesmo sem LIMIT: o json em C monta os dicts de binding mais rápido que o TSV em Python
+        assert sparql.select('SELECT * WHERE { ?s ?p ?o }')['format'] == 'json'
+        assert sum(1 for _ in sparql.select_iter('SELECT * WHERE { ?s ?p ?o }', result_format='auto')) == 10
+        columns = sparql.select_columns('SELECT * WHERE { ?s ?p ?o }', result_format='auto')
+    assert columns['success'] and columns['count'] == 10
+    assert SparqlQuery._choose_format('auto', columnar=True) == 'tsv'
@@ -0,0 +1,205 @@
+import json
+import os
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from TurtleLoader import TurtleLoader
+
+TTL = '@prefix : <http://ex.org/> .\n:a :b "{}" .\n'
+
+
+@pytest.fixture
+def loader(mock_fuseki):
+    with TurtleLoader(mock_fuseki.url, circuit_breaker=False) as loader:
+        yield loader
+
+
+def uploads(mock):
+    """(método, grafo) de cada envio GSP recebido pelo mock."""
+    return sorted((method, parse_qs(urlparse(path).query).get('graph', [None])[0])
+                  for method, path, _ in mock.requests if urlparse(path).path.endswith('/data'))
+
+
+def write(path, text, mtime=None):
+    path.write_text(text, encoding='utf-8')
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_sync_manifest(tmp_path, loader, mock_fuseki):
+    data = tmp_path / 'dados'
+    (data / 'sub').mkdir(parents=True)
+    write(data / 'a.ttl', TTL.format('a'))
+    write(data / 'sub' / 'b c.ttl', TTL.format('b'))
+    write(data / 'leia-me.txt', 'não é RDF')
+    manifest_path = tmp_path / 'manifest.json'
+
+    result = loader.sync_directory(str(data), manifest_path=str(manifest_path))
+    assert result['success']
+    assert sorted(result['uploaded']) == ['a.ttl', 'sub/b c.ttl']
+    assert result['skipped'] == ['leia-me.txt']
+    assert uploads(mock_fuseki) == [('PUT', 'urn:airdata:file:a.ttl'), ('PUT', 'urn:airdata:file:sub/b%20c.ttl')]
+
+    manifest = json.loads(manifest_path.read_text())
+    assert manifest['target'] == f'{mock_fuseki.url}/airdata'
+    entry = manifest['files']['a.ttl']
+    assert entry['size'] == len(TTL.format('a'))
+    assert entry['graph'] == 'urn:airdata:file:a.ttl'
+    assert len(entry['sha256']) == 64
+
+    # Nada mudou: nenhum envio
+    mock_fuseki.requests.clear()
+    result = loader.sync_directory(str(data), manifest_path=str(manifest_path))
+    assert result['uploaded'] == [] and result['unchanged'] == 2
+    assert uploads(mock_fuseki) == []
+
+    # Só o mtime mudou: o hash é igual, nada é enviado
+    write(data / 'a.ttl', TTL.format('a'), mtime=1_000_000)
+    result = loader.sync_directory(str(data), manifest_path=str(manifest_path))
+    assert result['uploaded'] == [] and result['unchanged'] == 2
+    assert json.loads(manifest_path.read_text())['files']['a.ttl']['mtime'] == 1_000_000
+
+    # Conteúdo alterado: reenviado com PUT, substituindo o grafo do arquivo
+    write(data / 'a.ttl', TTL.format('alterado'))
+    result = loader.sync_directory(str(data), manifest_path=str(manifest_path))
+    assert result['uploaded'] == ['a.ttl']
+    assert uploads(mock_fuseki) == [('PUT', 'urn:airdata:file:a.ttl')]
+
+    # Arquivo removido: o grafo só é apagado com delete_missing
+    os.remove(data / 'sub' / 'b c.ttl')
+    mock_fuseki.requests.clear()
+    assert loader.sync_directory(str(data), manifest_path=str(manifest_path))['deleted'] == []
+    result = loader.sync_directory(str(data), manifest_path=str(manifest_path), delete_missing=True)
+    assert result['deleted'] == ['sub/b c.ttl']
+    assert uploads(mock_fuseki) == [('DELETE', 'urn:airdata:file:sub/b%20c.ttl')]
+    assert list(json.loads(manifest_path.read_text())['files']) == ['a.ttl']
+
+
+def test_sync_failure_is_retried_next_run(tmp_path, loader, mock_fuseki):
+    write(tmp_path / 'a.ttl', TTL.format('a'))
+    manifest_path = tmp_path / 'manifest.json'
+    mock_fuseki.fail_next(1, status=500, answered=True)
+    result = loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path))
+    assert not result['success']
+    assert result['failed'][0]['file'] == 'a.ttl'
+    assert json.loads(manifest_path.read_text())['files'] == {}
+
+    assert loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path))['uploaded'] == ['a.ttl']
+
+
+def test_manifest_of_other_target_is_ignored(tmp_path, loader, mock_fuseki):
+    write(tmp_path / 'a.ttl', TTL.format('a'))
+    manifest_path = tmp_path / 'manifest.json'
+    loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path))
+    manifest = json.loads(manifest_path.read_text())
+    manifest['target'] = 'http://outro:3030/airdata'
+    manifest_path.write_text(json.dumps(manifest))
+    assert loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path))['uploaded'] == ['a.ttl']
+
+
+@pytest.mark.parametrize('chunk_bytes', [None, 64])
+def test_bulk_load_reports_enrichment_errors_per_file(tmp_path, loader, mock_fuseki, chunk_bytes):
+    from Enrichment import DateTimeEnricher
+    good = ('<urn:t{}> <http://airdata.org/ontology#DateTime-value> '
+            '"2025-07-01T10:30:00"^^<http://www.w3.org/2001/XMLSchema#dateTime> .\n')
+    (tmp_path / 'bom.nt').write_text(''.join(good.format(i) for i in range(5)), encoding='utf-8')
+    # Lexical em Latin-1, não UTF-8: o enriquecedor falha ao decodificá-lo
+    (tmp_path / 'ruim.nt').write_bytes(good.format(9).encode()
+                                       + b'<urn:t> <http://airdata.org/ontology#DateTime-value> "\xe9" .\n')
+
+    result = loader.bulk_load_directory(str(tmp_path), chunk_bytes=chunk_bytes, enrich=DateTimeEnricher())
+    files = {os.path.basename(status['file']): status for status in result['files']}
+    assert files['bom.nt']['success']
+    assert not files['ruim.nt']['success']
+    assert any("can't decode" in message for message in files['ruim.nt']['message'])
+    assert result['message'] == '1/2 arquivos carregados'
+    assert result['enrichment']['added'] >= 10
+
+
+def test_load_from_string_resends_as_turtle_when_ntriples_sniff_is_wrong(loader, mock_fuseki):
+    # Os primeiros 8 KB parecem N-Triples; o prefixo só aparece depois
+    lines = ''.join(f'<http://ex.org/s{i}> <http://ex.org/p> "{i}" .\n' for i in range(300))
+    content = lines + '@prefix : <http://ex.org/> .\n:a :b :c .\n'
+    mock_fuseki.fail_next(1, status=400, answered=True)
+    result = loader.load_from_string(content)
+    assert result['success']
+    assert [t.split(';')[0] for t in mock_fuseki.upload_types] == ['application/n-triples', 'text/turtle']
+
+
+def test_load_from_string_keeps_explicit_format(loader, mock_fuseki):
+    mock_fuseki.fail_next(1, status=400, answered=True)
+    result = loader.load_from_string('<http://ex.org/s> <http://ex.org/p> 1 .\n', rdf_format='nt')
+    assert not result['success'] and result['status_code'] == 400
+    assert len(mock_fuseki.upload_types) == 1
+
+
+def test_sync_mirrors_files_into_default_graph(tmp_path, loader, mock_fuseki):
+    write(tmp_path / 'a.ttl', TTL.format('a'))
+    manifest_path = tmp_path / 'manifest.json'
+    assert loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path))['success']
+    delete, add = mock_fuseki.update_bodies
+    assert 'GRAPH <urn:airdata:file:a.ttl> { ?s ?p ?o }' in delete
+    assert 'STRSTARTS(STR(?g), "urn:airdata:file:")' in delete
+    assert add == 'ADD SILENT GRAPH <urn:airdata:file:a.ttl> TO DEFAULT'
+
+    # Arquivo removido: as triplas saem do grafo padrão antes de o grafo do arquivo ser apagado
+    os.remove(tmp_path / 'a.ttl')
+    mock_fuseki.update_bodies.clear()
+    mock_fuseki.requests.clear()
+    result = loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path), delete_missing=True)
+    assert result['deleted'] == ['a.ttl']
+    assert [body.split()[0] for body in mock_fuseki.update_bodies] == ['DELETE']
+    assert uploads(mock_fuseki) == [('DELETE', 'urn:airdata:file:a.ttl')]
+
+
+def test_sync_into_named_graphs_only(tmp_path, loader, mock_fuseki):
+    write(tmp_path / 'a.ttl', TTL.format('a'))
+    result = loader.sync_directory(str(tmp_path), manifest_path=str(tmp_path / 'm.json'), default_graph=False)
+    assert result['uploaded'] == ['a.ttl']
+    assert mock_fuseki.update_bodies == []
+
+
+def test_sync_checkpoints_manifest(tmp_path, loader, mock_fuseki, monkeypatch):
+    for i in range(5):
+        write(tmp_path / f'{i}.ttl', TTL.format(i))
+    saves = []
+    save = TurtleLoader._save_manifest
+    monkeypatch.setattr(TurtleLoader, '_save_manifest',
+                        staticmethod(lambda path, manifest: (saves.append(len(manifest['files'])), save(path, manifest))))
+    manifest_path = tmp_path / 'manifest.json'
+    result = loader.sync_directory(str(tmp_path), manifest_path=str(manifest_path), workers=1,
+                                   checkpoint_every=2, checkpoint_seconds=3600)
+    assert len(result['uploaded']) == 5
+    assert saves == [2, 4, 5]
+    assert len(json.loads(manifest_path.read_text())['files']) == 5
+
+
+def test_unmirror_keeps_triples_of_other_synced_files(loader, monkeypatch):
+    rdflib = pytest.importorskip('rdflib')
+    updates = []
+    monkeypatch.setattr(loader, '_update', lambda update, message: updates.append(update))
+    loader._unmirror_graph('urn:airdata:file:a.ttl', 'urn:airdata:file:')
+
+    ex = rdflib.Namespace('http://ex.org/')
+    dataset = rdflib.Dataset()
+    comum, so_a, outro = (ex.s, ex.p, ex.comum), (ex.s, ex.p, ex.a), (ex.s, ex.p, ex.outro)
+    for triple in (comum, so_a):
+        dataset.graph(rdflib.URIRef('urn:airdata:file:a.ttl')).add(triple)
+    dataset.graph(rdflib.URIRef('urn:airdata:file:b.ttl')).add(comum)
+    dataset.graph(rdflib.URIRef('urn:x-fuseki-client:views')).add(so_a)
+    for triple in (comum, so_a, outro):
+        dataset.default_graph.add(triple)
+
+    dataset.update(updates[0])
+    assert set(dataset.default_graph) == {comum, outro}
+
+
+def test_print_is_kept_for_compatibility(mock_fuseki, capsys):
+    with TurtleLoader(mock_fuseki.url, circuit_breaker=False) as verbose, \
+            TurtleLoader(mock_fuseki.url, circuit_breaker=False, verbose=False) as quiet:
+        verbose.print('carga', 1)
+        quiet.print('silenciosa')
+    out = capsys.readouterr().out
+    assert 'carga 1' in out
+    assert 'silenciosa' not in out